@@ -0,0 +1,171 @@
+"""
+MODE APERÇU - PROJET ID IMMOBILIER
+Estimation rapide des chiffres clés d'un nouveau dump avant le nettoyage complet :
+- Échantillon de N lignes tiré en une seule passe (reservoir sampling)
+- Lecture arrêtée au bout d'un budget de temps (durée bornée quelle que soit la taille)
+- Nettoyage de l'échantillon seul, statistiques avec intervalles de confiance bootstrap
+"""
+
+import contextlib
+import csv
+import io
+import random
+import sys
+import time
+
+
+TAILLE_ECHANTILLON = 1000
+NB_BOOTSTRAP = 1000
+BUDGET_LECTURE_S = 10.0
+
+
+def _lignes_source(chemin, champs=None):
+    """Itérer sur les lignes brutes (dict) d'un CSV ou d'un dataset Apify"""
+    if chemin.lower().endswith(('.json', '.jsonl')):
+        from ingestion_apify import compiler_chemin, extraire, iterer_enregistrements
+        chemins = [(c, compiler_chemin(c)) for c in champs]
+        for enregistrement in iterer_enregistrements(chemin):
+            yield {c: extraire(enregistrement, chemin_compile) for c, chemin_compile in chemins}
+        return
+
+    # Champs multi-lignes entre guillemets : le module csv gère les retours à la ligne
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    with open(chemin, encoding='utf-8-sig', errors='replace', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def echantillonner(lignes, taille=TAILLE_ECHANTILLON, budget_s=BUDGET_LECTURE_S, graine=None):
+    """
+    Reservoir sampling (algorithme R) sur un flux de lignes
+    Retourne (échantillon, nb lignes lues, lecture complète ?)
+    """
+    aleatoire = random.Random(graine)
+    reservoir = []
+    limite = time.monotonic() + budget_s
+    nb = 0
+
+    for ligne in lignes:
+        if nb < taille:
+            reservoir.append(ligne)
+        else:
+            j = aleatoire.randrange(nb + 1)
+            if j < taille:
+                reservoir[j] = ligne
+        nb += 1
+        # Vérification de l'horloge toutes les 1024 lignes seulement
+        if nb & 1023 == 0 and time.monotonic() > limite:
+            return reservoir, nb, False
+
+    return reservoir, nb, True
+
+
+def _intervalle(estimations, niveau=0.95):
+    """Intervalle percentile d'une distribution bootstrap"""
+    import numpy as np
+    alpha = (1 - niveau) / 2 * 100
+    bas, haut = np.percentile(estimations, [alpha, 100 - alpha])
+    return float(bas), float(haut)
+
+
+def statistiques_bootstrap(df_valide, nb_echantillon, nb_bootstrap=NB_BOOTSTRAP, graine=None):
+    """
+    Chiffres clés du rapport de nettoyer_dataset + IC à 95 % (bootstrap percentile)
+    Retourne un dict {indicateur: (estimation, borne basse, borne haute)}
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(graine)
+    resultats = {}
+
+    # Taux de validité : indicatrice sur tout l'échantillon
+    valide = np.zeros(nb_echantillon)
+    valide[:len(df_valide)] = 1
+    tirages = rng.integers(0, nb_echantillon, (nb_bootstrap, nb_echantillon))
+    resultats['taux_validite_%'] = (valide.mean() * 100,
+                                    *(b * 100 for b in _intervalle(valide[tirages].mean(axis=1))))
+
+    m = len(df_valide)
+    if m == 0:
+        return resultats
+
+    tirages = rng.integers(0, m, (nb_bootstrap, m))
+    prix_m2 = df_valide['prix_m2'].to_numpy(dtype=float)
+    surface = df_valide['surface_m2'].to_numpy(dtype=float)
+    echantillons_prix = prix_m2[tirages]
+    resultats['prix_m2_moyen'] = (prix_m2.mean(), *_intervalle(echantillons_prix.mean(axis=1)))
+    resultats['prix_m2_median'] = (float(np.median(prix_m2)),
+                                   *_intervalle(np.median(echantillons_prix, axis=1)))
+    resultats['surface_moyenne'] = (surface.mean(), *_intervalle(surface[tirages].mean(axis=1)))
+
+    # Répartitions : proportion de chaque modalité, même matrice de tirages
+    for colonne, prefixe, limite in (('type_bien', 'type', None), ('quartier', 'quartier', 10)):
+        codes, modalites = df_valide[colonne].factorize()
+        proportions = codes[tirages]
+        comptes = df_valide[colonne].value_counts()
+        if colonne == 'quartier':
+            comptes = comptes.drop('Non spécifié', errors='ignore')
+        for modalite in comptes.index[:limite]:
+            code = modalites.get_loc(modalite)
+            part = (proportions == code).mean(axis=1) * 100
+            resultats[f'{prefixe}:{modalite}'] = ((codes == code).mean() * 100, *_intervalle(part))
+
+    return resultats
+
+
+def apercu(chemin, taille=TAILLE_ECHANTILLON, budget_s=BUDGET_LECTURE_S, graine=None, cleaner=None):
+    """Échantillonner, nettoyer l'échantillon et afficher les estimations"""
+    import pandas as pd
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+
+    debut = time.perf_counter()
+    cleaner = cleaner or IDImmobilierCleanerV2()
+    from ingestion_apify import champs_utilises
+    lignes = _lignes_source(chemin, champs_utilises(cleaner.niveaux_champs))
+    echantillon, nb_lues, complet = echantillonner(lignes, taille, budget_s, graine)
+
+    print("=" * 70)
+    print("🔎 APERÇU - ESTIMATION SUR ÉCHANTILLON")
+    print("=" * 70)
+    if not echantillon:
+        print("⚠️ Fichier vide")
+        return {}
+
+    # Le CSV lu par le module csv est en texte : on retrouve les types comme pd.read_csv
+    df = pd.DataFrame(echantillon)
+    if not chemin.lower().endswith(('.json', '.jsonl')):
+        df = pd.read_csv(io.StringIO(df.to_csv(index=False)))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_valide = cleaner.nettoyer_dataset(df)
+    resultats = statistiques_bootstrap(df_valide, len(df), graine=graine)
+    duree = time.perf_counter() - debut
+
+    lecture = "fichier complet" if complet else f"budget de {budget_s:g} s atteint, début du fichier seulement"
+    print(f"📊 Échantillon: {len(df)} lignes sur {nb_lues} lues ({lecture})")
+    print(f"⏱️  Durée: {duree:.2f} s — IC à 95 % par bootstrap ({NB_BOOTSTRAP} tirages)\n")
+
+    libelles = {
+        'taux_validite_%': ("Taux de validité", "%", "{:.1f}"),
+        'prix_m2_moyen': ("Prix moyen au m²", "FCFA", "{:,.0f}"),
+        'prix_m2_median': ("Prix médian au m²", "FCFA", "{:,.0f}"),
+        'surface_moyenne': ("Surface moyenne", "m²", "{:.0f}"),
+    }
+    for cle, (libelle, unite, fmt) in libelles.items():
+        if cle in resultats:
+            est, bas, haut = resultats[cle]
+            print(f"{libelle + ':':<22}{fmt.format(est):>10} {unite}  [{fmt.format(bas)} ; {fmt.format(haut)}]")
+
+    if 'taux_validite_%' in resultats:
+        est, bas, haut = resultats['taux_validite_%']
+        print(f"{'Valides estimées:':<22}{nb_lues * est / 100:>10,.0f}     "
+              f"[{nb_lues * bas / 100:,.0f} ; {nb_lues * haut / 100:,.0f}]")
+
+    for prefixe, titre in (('type', "\n📊 Répartition par type (% des valides):"),
+                           ('quartier', "\n🏙️ Top 10 quartiers (% des valides):")):
+        print(titre)
+        for cle, (est, bas, haut) in resultats.items():
+            if cle.startswith(prefixe + ':'):
+                print(f"   {cle.split(':', 1)[1]:<20}{est:6.1f} %  [{bas:.1f} ; {haut:.1f}]")
+
+    print("=" * 70)
+    return resultats
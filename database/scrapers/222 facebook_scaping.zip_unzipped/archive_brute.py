@@ -0,0 +1,373 @@
+"""
+ARCHIVE DES DUMPS BRUTS - PROJET ID IMMOBILIER
+Conserve chaque dump de scraper tel quel, compressé, et retrouve n'importe quelle
+annonce brute par son `id` en quelques millisecondes :
+- Les enregistrements (colonnes non vides, valeurs brutes en texte) sont regroupés
+  en blocs d'environ TAILLE_BLOC octets, compressés un par un avec un dictionnaire
+  entraîné sur des annonces Marketplace (les clés et valeurs répétées d'une annonce
+  à l'autre se compressent même dans un petit bloc)
+- Un index SQLite à côté des blocs : id -> (fichier, bloc, décalage dans le bloc)
+- Une lecture = un seul bloc décompressé, jamais le fichier entier
+- Un dump déjà archivé (même empreinte SHA-256) n'est pas réingéré
+
+zstandard est utilisé s'il est installé (pip install zstandard) ; sinon zlib
+(bibliothèque standard) avec un dictionnaire prédéfini prend le relais. Le codec
+est enregistré dans l'archive.
+
+    python archive_brute.py ingerer dataset_facebook-marketplace-scraper_*.csv
+    python archive_brute.py lire 1234567890123456
+    python archive_brute.py benchmark dataset_facebook-marketplace-scraper_*.csv
+"""
+
+import argparse
+import codecs
+import csv
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+DOSSIER_DEFAUT = 'archive_brute'
+
+# Taille visée d'un bloc avant compression : assez grand pour bien compresser,
+# assez petit pour qu'une lecture reste de l'ordre de la milliseconde
+TAILLE_BLOC = 64 * 1024
+
+# Dictionnaire : taille et nombre d'annonces d'entraînement
+TAILLE_DICTIONNAIRE = 64 * 1024
+ECHANTILLON_DICTIONNAIRE = 2000
+
+# zlib n'utilise que les 32 derniers Ko d'un dictionnaire prédéfini
+TAILLE_DICTIONNAIRE_ZLIB = 32 * 1024
+
+SCHEMA_INDEX = """
+CREATE TABLE IF NOT EXISTS meta (cle TEXT PRIMARY KEY, valeur TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS fichiers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nom TEXT NOT NULL,
+    empreinte TEXT NOT NULL UNIQUE,
+    encodage TEXT NOT NULL,
+    lignes INTEGER NOT NULL,
+    octets_bruts INTEGER NOT NULL,
+    octets_archives INTEGER NOT NULL,
+    ingere_le TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocs (
+    fichier INTEGER NOT NULL,
+    bloc INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    taille INTEGER NOT NULL,
+    PRIMARY KEY (fichier, bloc)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS annonces (
+    id TEXT NOT NULL,
+    fichier INTEGER NOT NULL,
+    bloc INTEGER NOT NULL,
+    decalage INTEGER NOT NULL,
+    longueur INTEGER NOT NULL,
+    PRIMARY KEY (id, fichier)
+) WITHOUT ROWID;
+"""
+
+
+def empreinte_fichier(chemin):
+    h = hashlib.sha256()
+    with open(chemin, 'rb') as f:
+        for morceau in iter(lambda: f.read(1 << 20), b''):
+            h.update(morceau)
+    return h.hexdigest()
+
+
+def detecter_encodage(chemin):
+    """utf-8-sig si tout le fichier est de l'UTF-8 valide, sinon latin-1 (aucun octet perdu)"""
+    decodeur = codecs.getincrementaldecoder('utf-8-sig')()
+    try:
+        with open(chemin, 'rb') as f:
+            for morceau in iter(lambda: f.read(1 << 20), b''):
+                decodeur.decode(morceau)
+            decodeur.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return 'latin-1'
+    return 'utf-8-sig'
+
+
+def enregistrements(chemin, encodage='utf-8-sig'):
+    """(id, annonce sérialisée) de chaque ligne : colonnes non vides, texte brut du CSV"""
+    with open(chemin, encoding=encodage, newline='') as f:
+        for ligne in csv.DictReader(f):
+            annonce = {cle: valeur for cle, valeur in ligne.items() if cle and valeur not in ('', None)}
+            yield annonce.get('id', ''), json.dumps(annonce, ensure_ascii=False,
+                                                    separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class Codec:
+    """Compression d'un bloc avec le dictionnaire de l'archive (zstd, ou zlib en repli)"""
+
+    def __init__(self, nom, dictionnaire):
+        self.nom = nom
+        self.dictionnaire = dictionnaire
+        if nom == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Archive compressée avec zstd : pip install zstandard")
+            donnees = zstandard.ZstdCompressionDict(dictionnaire)
+            self._compresseur = zstandard.ZstdCompressor(level=10, dict_data=donnees)
+            self._decompresseur = zstandard.ZstdDecompressor(dict_data=donnees)
+
+    @staticmethod
+    def entrainer(echantillons):
+        """Codec disponible et dictionnaire appris sur des annonces sérialisées"""
+        if zstandard is not None:
+            dictionnaire = zstandard.train_dictionary(TAILLE_DICTIONNAIRE, echantillons)
+            return Codec('zstd', dictionnaire.as_bytes())
+        # zlib : dictionnaire = contenu fréquent, le plus utile en dernier. On garde
+        # les annonces d'entraînement les plus récentes jusqu'à 32 Ko.
+        dictionnaire = b''
+        for echantillon in reversed(echantillons):
+            if len(dictionnaire) + len(echantillon) > TAILLE_DICTIONNAIRE_ZLIB:
+                break
+            dictionnaire = echantillon + dictionnaire
+        return Codec('zlib', dictionnaire)
+
+    def compresser(self, donnees):
+        if self.nom == 'zstd':
+            return self._compresseur.compress(donnees)
+        compresseur = zlib.compressobj(9, zdict=self.dictionnaire)
+        return compresseur.compress(donnees) + compresseur.flush()
+
+    def decompresser(self, donnees):
+        if self.nom == 'zstd':
+            return self._decompresseur.decompress(donnees)
+        decompresseur = zlib.decompressobj(zdict=self.dictionnaire)
+        return decompresseur.decompress(donnees) + decompresseur.flush()
+
+
+class ArchiveBrute:
+    """Dossier d'archive : un fichier de blocs par dump, index SQLite, dictionnaire"""
+
+    def __init__(self, dossier=DOSSIER_DEFAUT):
+        self.dossier = dossier
+        os.makedirs(dossier, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(dossier, 'index.sqlite'))
+        self.conn.executescript(SCHEMA_INDEX)
+        self.codec = self._charger_codec()
+        # Dernier bloc lu : lectures successives dans le même bloc sans redécompresser
+        self._bloc_courant = (None, None)
+
+    def _charger_codec(self):
+        ligne = self.conn.execute("SELECT valeur FROM meta WHERE cle = 'codec'").fetchone()
+        if ligne is None:
+            return None
+        with open(os.path.join(self.dossier, 'dictionnaire.bin'), 'rb') as f:
+            return Codec(ligne[0], f.read())
+
+    def _creer_codec(self, chemin, encodage):
+        """Premier dump : dictionnaire entraîné sur un échantillon de ses annonces"""
+        echantillons = [s for _, s in enregistrements(chemin, encodage)]
+        if len(echantillons) > ECHANTILLON_DICTIONNAIRE:
+            echantillons = random.Random(0).sample(echantillons, ECHANTILLON_DICTIONNAIRE)
+        self.codec = Codec.entrainer(echantillons)
+        with open(os.path.join(self.dossier, 'dictionnaire.bin'), 'wb') as f:
+            f.write(self.codec.dictionnaire)
+        self.conn.execute("INSERT INTO meta VALUES ('codec', ?)", (self.codec.nom,))
+
+    def ingerer(self, chemin):
+        """Archiver un dump CSV ; retourne le nombre d'annonces (0 si déjà archivé)"""
+        empreinte = empreinte_fichier(chemin)
+        if self.conn.execute('SELECT 1 FROM fichiers WHERE empreinte = ?', (empreinte,)).fetchone():
+            return 0
+        encodage = detecter_encodage(chemin)
+        if self.codec is None:
+            self._creer_codec(chemin, encodage)
+
+        with self.conn:
+            curseur = self.conn.execute(
+                "INSERT INTO fichiers (nom, empreinte, encodage, lignes, octets_bruts, octets_archives, "
+                "ingere_le) VALUES (?, ?, ?, 0, ?, 0, datetime('now'))",
+                (os.path.basename(chemin), empreinte, encodage, os.path.getsize(chemin)))
+            fichier = curseur.lastrowid
+            chemin_blocs = os.path.join(self.dossier, f'{fichier:06d}.blocs')
+
+            blocs, annonces = [], []
+            tampon, position, lignes = [], 0, 0
+            with open(chemin_blocs, 'wb') as sortie:
+                def vider():
+                    nonlocal tampon, position
+                    compresse = self.codec.compresser(b''.join(tampon))
+                    sortie.write(compresse)
+                    blocs.append((fichier, len(blocs), position, len(compresse)))
+                    position += len(compresse)
+                    tampon = []
+
+                taille_tampon = 0
+                for id_annonce, donnees in enregistrements(chemin, encodage):
+                    annonces.append((id_annonce, fichier, len(blocs), taille_tampon, len(donnees)))
+                    tampon.append(donnees)
+                    taille_tampon += len(donnees)
+                    lignes += 1
+                    if taille_tampon >= TAILLE_BLOC:
+                        vider()
+                        taille_tampon = 0
+                if tampon:
+                    vider()
+
+            self.conn.executemany('INSERT INTO blocs VALUES (?, ?, ?, ?)', blocs)
+            # Même id deux fois dans un dump : la dernière ligne fait foi
+            self.conn.executemany('INSERT OR REPLACE INTO annonces VALUES (?, ?, ?, ?, ?)', annonces)
+            self.conn.execute('UPDATE fichiers SET lignes = ?, octets_archives = ? WHERE id = ?',
+                              (lignes, position, fichier))
+        return lignes
+
+    def _bloc(self, fichier, bloc):
+        if self._bloc_courant[0] == (fichier, bloc):
+            return self._bloc_courant[1]
+        position, taille = self.conn.execute(
+            'SELECT position, taille FROM blocs WHERE fichier = ? AND bloc = ?', (fichier, bloc)).fetchone()
+        with open(os.path.join(self.dossier, f'{fichier:06d}.blocs'), 'rb') as f:
+            f.seek(position)
+            donnees = self.codec.decompresser(f.read(taille))
+        self._bloc_courant = ((fichier, bloc), donnees)
+        return donnees
+
+    def lire(self, id_annonce, historique=False):
+        """
+        Annonce brute (dict colonne -> texte) du dump le plus récent qui la contient,
+        ou toutes ses versions [(nom du dump, annonce), ...] avec historique=True ;
+        None si l'annonce est absente de l'archive
+        """
+        lignes = self.conn.execute(
+            'SELECT a.fichier, a.bloc, a.decalage, a.longueur, f.nom FROM annonces a '
+            'JOIN fichiers f ON f.id = a.fichier WHERE a.id = ? ORDER BY a.fichier DESC',
+            (str(id_annonce),)).fetchall()
+        versions = []
+        for fichier, bloc, decalage, longueur, nom in lignes:
+            donnees = self._bloc(fichier, bloc)[decalage:decalage + longueur]
+            versions.append((nom, json.loads(donnees)))
+            if not historique:
+                return versions[0][1]
+        return versions or None
+
+    def resume(self):
+        """Dumps archivés, annonces indexées et taux de compression"""
+        fichiers, lignes, bruts, archives = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(lignes), 0), COALESCE(SUM(octets_bruts), 0), '
+            'COALESCE(SUM(octets_archives), 0) FROM fichiers').fetchone()
+        ids = self.conn.execute('SELECT COUNT(DISTINCT id) FROM annonces').fetchone()[0]
+        return {
+            'codec': self.codec.nom if self.codec else None,
+            'fichiers': fichiers,
+            'lignes': lignes,
+            'annonces_distinctes': ids,
+            'octets_bruts': bruts,
+            'octets_archives': archives,
+            'ratio': round(bruts / archives, 2) if archives else None,
+        }
+
+    def fermer(self):
+        self.conn.close()
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def benchmark(fichiers, nb_lectures=2000):
+    """Taux de compression (par rapport au CSV et à une compression du fichier entier)
+    et latence d'une lecture par id"""
+    import shutil
+    import tempfile
+
+    dossier = tempfile.mkdtemp(prefix='id_immobilier_archive_')
+    try:
+        archive = ArchiveBrute(dossier)
+        debut = time.perf_counter()
+        for chemin in fichiers:
+            archive.ingerer(chemin)
+        duree_ingestion = time.perf_counter() - debut
+        resume = archive.resume()
+
+        # Référence : chaque dump compressé d'un seul tenant, sans dictionnaire
+        entier = 0
+        for chemin in fichiers:
+            with open(chemin, 'rb') as f:
+                entier += len(zstandard.ZstdCompressor(level=10).compress(f.read()) if zstandard
+                              else zlib.compress(f.read(), 9))
+
+        ids = [ligne[0] for ligne in archive.conn.execute('SELECT id FROM annonces')]
+        tirage = random.Random(0).choices(ids, k=nb_lectures)
+        latences = []
+        for id_annonce in tirage:
+            archive._bloc_courant = (None, None)   # lecture à froid : bloc non mis en cache
+            debut = time.perf_counter()
+            archive.lire(id_annonce)
+            latences.append((time.perf_counter() - debut) * 1000)
+        latences.sort()
+        archive.fermer()
+
+        print("=" * 70)
+        print(f"🗜️  ARCHIVE DES DUMPS BRUTS - codec {resume['codec']}")
+        print("=" * 70)
+        print(f"   Dumps: {resume['fichiers']}, annonces: {resume['lignes']} "
+              f"({resume['annonces_distinctes']} ids distincts), ingestion {duree_ingestion:.2f} s")
+        print(f"   CSV bruts:            {resume['octets_bruts']:>12,} octets")
+        print(f"   Archive (blocs):      {resume['octets_archives']:>12,} octets  "
+              f"ratio x{resume['ratio']}")
+        print(f"   Fichier entier:       {entier:>12,} octets  "
+              f"ratio x{resume['octets_bruts'] / entier:.2f} (sans accès direct)")
+        print(f"   Lecture par id ({nb_lectures} tirages, bloc non mis en cache): "
+              f"p50 {latences[len(latences) // 2]:.3f} ms, "
+              f"p95 {latences[int(len(latences) * 0.95)]:.3f} ms, max {latences[-1]:.3f} ms")
+        print("=" * 70)
+        return resume, latences
+    finally:
+        shutil.rmtree(dossier)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive compressée des dumps bruts ID Immobilier")
+    parser.add_argument('--dossier', default=DOSSIER_DEFAUT)
+    sous = parser.add_subparsers(dest='commande', required=True)
+
+    p = sous.add_parser('ingerer', help="Archiver des dumps CSV")
+    p.add_argument('fichiers', nargs='+')
+    p = sous.add_parser('lire', help="Annonce brute par id")
+    p.add_argument('id')
+    p.add_argument('--historique', action='store_true', help="Toutes les versions archivées")
+    sous.add_parser('resume', help="Contenu et taux de compression de l'archive")
+    p = sous.add_parser('benchmark', help="Taux de compression et latence de lecture")
+    p.add_argument('fichiers', nargs='+')
+    p.add_argument('--lectures', type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.commande == 'benchmark':
+        benchmark(args.fichiers, args.lectures)
+        return
+
+    archive = ArchiveBrute(args.dossier)
+    if args.commande == 'ingerer':
+        for chemin in args.fichiers:
+            nb = archive.ingerer(chemin)
+            print(f"   {'✓' if nb else '='} {os.path.basename(chemin)}: "
+                  f"{f'{nb} annonces archivées' if nb else 'déjà archivé'}")
+        print(json.dumps(archive.resume(), indent=2, ensure_ascii=False))
+    elif args.commande == 'lire':
+        annonce = archive.lire(args.id, historique=args.historique)
+        if annonce is None:
+            print(f"⚠️ Annonce {args.id} absente de l'archive")
+        else:
+            print(json.dumps(annonce, indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(archive.resume(), indent=2, ensure_ascii=False))
+    archive.fermer()
+
+
+if __name__ == "__main__":
+    main()
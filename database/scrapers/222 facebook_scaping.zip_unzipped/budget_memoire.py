@@ -0,0 +1,347 @@
+"""
+NETTOYAGE SOUS BUDGET MÉMOIRE - PROJET ID IMMOBILIER
+Pour les conteneurs à mémoire limitée : un gros dump Marketplace ne doit pas faire
+tuer le processus (OOM) mais ralentir.
+- Premier morceau de taille fixe : coût mesuré en octets par ligne (pic de RSS
+  pendant le nettoyage, au-dessus de la mémoire déjà occupée)
+- Morceaux suivants dimensionnés sur la mémoire restante sous le budget,
+  réduits si le RSS approche la limite
+- Résultats nettoyés gardés en mémoire, déversés sur disque (CSV d'export en
+  cours d'écriture) quand le RSS dépasse SEUIL_DEVERSEMENT du budget
+- Pic de mémoire atteint comparé au budget en fin de run
+
+Mesure du RSS : psutil si installé, sinon /proc/self/status (VmRSS, VmHWM remis à
+zéro par /proc/self/clear_refs avant chaque morceau), sinon le module resource.
+
+    python id_immobilier_cli.py clean gros_dump.csv --memory-budget 512M
+    python id_immobilier_cli.py clean gros_dump.csv --memory-budget auto --format csv excel
+"""
+
+import contextlib
+import gc
+import io
+import os
+import sys
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Taille du premier morceau (mesure des octets par ligne)
+MORCEAU_INITIAL = 2000
+MORCEAU_MIN = 200
+MORCEAU_MAX = 200000
+# Lecture de la source par paquets de cette taille, regroupés à la taille demandée
+GRANULARITE = 500
+# Croissance maximale de la taille d'un morceau au suivant
+CROISSANCE_MAX = 2.0
+# Fraction du budget visée par le pic d'un morceau
+MARGE = 0.85
+# Au-delà de cette fraction du budget, les résultats en mémoire sont déversés
+SEUIL_DEVERSEMENT = 0.7
+
+UNITES = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+# ============================================
+# MESURE DU RSS
+# ============================================
+
+def _status(champ):
+    """Valeur (octets) d'un champ de /proc/self/status (None hors Linux)"""
+    try:
+        with open('/proc/self/status') as f:
+            for ligne in f:
+                if ligne.startswith(champ + ':'):
+                    return int(ligne.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _pic_resource():
+    """Pic de RSS du processus depuis son démarrage (ru_maxrss : Ko sous Linux, octets sous macOS)"""
+    if resource is None:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pic if sys.platform == 'darwin' else pic * 1024
+
+
+def rss_courant():
+    """Mémoire résidente actuelle du processus (octets)"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    rss = _status('VmRSS')
+    return rss if rss is not None else (_pic_resource() or 0)
+
+
+def reinitialiser_pic():
+    """Remettre le pic du noyau (VmHWM) au RSS courant ; False si impossible"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def pic_rss():
+    """Pic de RSS depuis la dernière remise à zéro (ou depuis le démarrage)"""
+    pic = _status('VmHWM')
+    return pic if pic is not None else (_pic_resource() or rss_courant())
+
+
+def limite_conteneur():
+    """Limite mémoire du cgroup (v2 puis v1), None si aucune"""
+    for chemin in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(chemin) as f:
+                valeur = f.read().strip()
+        except OSError:
+            continue
+        if valeur.isdigit() and int(valeur) < 1 << 60:
+            return int(valeur)
+    return None
+
+
+def lire_taille(texte):
+    """'512M', '2G', '256Mo', '750000000' ou 'auto' (limite du conteneur) -> octets"""
+    texte = str(texte).strip().upper()
+    if texte[-2:] in ('KO', 'MO', 'GO', 'KB', 'MB', 'GB'):
+        texte = texte[:-1]
+    if texte == 'AUTO':
+        limite = limite_conteneur()
+        if limite is None:
+            raise ValueError("Aucune limite mémoire de conteneur détectée : préciser le budget (ex: 512M)")
+        return limite
+    try:
+        if texte and texte[-1] in UNITES:
+            return int(float(texte[:-1]) * UNITES[texte[-1]])
+        return int(float(texte))
+    except ValueError:
+        raise ValueError(f"Taille mémoire invalide: {texte!r} (ex: 512M, 2G, auto)") from None
+
+
+def _mo(octets):
+    return f"{octets / 1024 ** 2:,.0f} Mo"
+
+
+# ============================================
+# BUDGET
+# ============================================
+
+class BudgetMemoire:
+    """Octets par ligne mesurés, taille des morceaux et pic de mémoire sous un budget"""
+
+    def __init__(self, budget_octets, marge=MARGE, seuil_deversement=SEUIL_DEVERSEMENT):
+        self.budget = budget_octets
+        self.marge = marge
+        self.seuil_deversement = seuil_deversement
+        self.rss_depart = rss_courant()
+        self.pic_exact = reinitialiser_pic()
+        self.octets_par_ligne = None
+        self.pic = self.rss_depart
+        self.tailles = []
+        self.deversements = 0
+        self.lignes_deversees = 0
+
+    def avant_morceau(self):
+        """RSS avant lecture d'un morceau ; remet le pic du noyau à zéro"""
+        if self.pic_exact:
+            reinitialiser_pic()
+        return rss_courant()
+
+    def apres_morceau(self, nb_lignes, rss_avant):
+        """
+        Pic du morceau (lecture + nettoyage) ; le coût par ligne retenu est le plus
+        élevé observé, les morceaux suivants ne peuvent pas le sous-estimer
+        """
+        pic = pic_rss() if self.pic_exact else rss_courant()
+        self.pic = max(self.pic, pic)
+        self.tailles.append(nb_lignes)
+        if nb_lignes > 0:
+            cout = max(pic - rss_avant, 1) / nb_lignes
+            self.octets_par_ligne = max(self.octets_par_ligne or 0, cout)
+
+    def taille_suivante(self):
+        """Lignes du prochain morceau pour que son pic tienne sous marge × budget"""
+        if self.octets_par_ligne is None:
+            return MORCEAU_INITIAL
+        disponible = self.budget * self.marge - rss_courant()
+        taille = int(disponible / self.octets_par_ligne)
+        if self.tailles:
+            taille = min(taille, int(self.tailles[-1] * CROISSANCE_MAX))
+        return max(MORCEAU_MIN, min(MORCEAU_MAX, taille))
+
+    def doit_deverser(self):
+        return rss_courant() > self.budget * self.seuil_deversement
+
+    def pic_final(self):
+        """Pic du run : max des pics par morceau et du pic noyau courant"""
+        return max(self.pic, pic_rss() if self.pic_exact else rss_courant())
+
+    def afficher(self):
+        pic = self.pic_final()
+        print("=" * 70)
+        print("🧮 MÉMOIRE")
+        print("=" * 70)
+        print(f"   Budget:            {_mo(self.budget)}")
+        print(f"   Pic atteint:       {_mo(pic)} ({pic / self.budget * 100:.0f}% du budget) "
+              f"{'✅' if pic <= self.budget else '⚠️  budget dépassé'}")
+        print(f"   Au démarrage:      {_mo(self.rss_depart)}")
+        if self.octets_par_ligne:
+            print(f"   Coût mesuré:       {self.octets_par_ligne / 1024:,.1f} Ko par ligne")
+        if self.tailles:
+            print(f"   Morceaux:          {len(self.tailles)} de {min(self.tailles):,} à "
+                  f"{max(self.tailles):,} lignes")
+        if self.deversements:
+            print(f"   Déversements:      {self.deversements} ({self.lignes_deversees:,} lignes sur disque)")
+        if not self.pic_exact:
+            print("   (pic par morceau estimé sur le RSS après nettoyage : VmHWM non réinitialisable)")
+        print("=" * 70)
+
+
+class MorceauxAdaptatifs:
+    """Morceaux de taille variable à partir d'un lecteur de morceaux de taille fixe"""
+
+    def __init__(self, lecteur):
+        self.lecteur = iter(lecteur)
+        self.reste = None
+
+    def suivant(self, taille):
+        """Morceau de `taille` lignes au plus (None en fin de source)"""
+        import pandas as pd
+
+        paquets = []
+        nb = 0
+        if self.reste is not None:
+            paquets.append(self.reste)
+            nb = len(self.reste)
+            self.reste = None
+        while nb < taille:
+            paquet = next(self.lecteur, None)
+            if paquet is None:
+                break
+            paquets.append(paquet)
+            nb += len(paquet)
+        if not paquets:
+            return None
+        morceau = paquets[0] if len(paquets) == 1 else pd.concat(paquets, ignore_index=True)
+        if len(morceau) > taille:
+            self.reste = morceau.iloc[taille:].reset_index(drop=True)
+            morceau = morceau.iloc[:taille]
+        return morceau
+
+
+# ============================================
+# NETTOYAGE
+# ============================================
+
+def _deverser(retenus, chemin, entete):
+    """Ajouter les résultats gardés en mémoire au CSV d'export en cours d'écriture"""
+    from id_immobilier_FINAL import COLONNES_BDD
+
+    with open(chemin, 'a', encoding='utf-8-sig' if entete else 'utf-8', newline='') as f:
+        for df_valide in retenus:
+            df_valide[COLONNES_BDD].to_csv(f, index=False, header=entete)
+            entete = False
+    return entete
+
+
+def nettoyer_sous_budget(cleaner, source, budget_octets, formats=('csv',), dossier='.',
+                         adaptateur=None):
+    """
+    Nettoyer `source` et écrire les exports sans dépasser `budget_octets` de RSS
+    Retourne (fichiers écrits, BudgetMemoire)
+    """
+    import pandas as pd
+    from id_immobilier_FINAL import COLONNES_BDD, chemin_export, ecrire_excel
+
+    for format in formats:
+        if format not in ('csv', 'excel'):
+            raise ValueError(f"Format d'export inconnu: {format}")
+
+    budget = BudgetMemoire(budget_octets)
+    horodatage = time.strftime('%Y%m%d_%H%M%S')
+    chemin_csv = chemin_export('csv', dossier, horodatage)
+    temporaire = chemin_csv + '.tmp'
+    lecteur = MorceauxAdaptatifs(cleaner.lire_morceaux(source, GRANULARITE, adaptateur))
+
+    print("=" * 70)
+    print(f"🧮 NETTOYAGE SOUS BUDGET MÉMOIRE ({_mo(budget_octets)}, départ {_mo(budget.rss_depart)})")
+    print("=" * 70)
+    if budget.rss_depart > budget_octets * budget.marge:
+        print(f"⚠️  Mémoire au démarrage déjà proche du budget : morceaux de {MORCEAU_MIN} lignes")
+
+    retenus = []
+    entete = True
+    nb_lignes = nb_valides = 0
+    debut = time.perf_counter()
+    try:
+        while True:
+            rss_avant = budget.avant_morceau()
+            morceau = lecteur.suivant(budget.taille_suivante())
+            if morceau is None:
+                break
+            # Rapport détaillé de chaque morceau inutile : seul le total est affiché
+            with contextlib.redirect_stdout(io.StringIO()):
+                df_valide = cleaner.nettoyer_dataset(morceau, sauvegarder_tables=False)[COLONNES_BDD]
+            budget.apres_morceau(len(morceau), rss_avant)
+            nb_lignes += len(morceau)
+            nb_valides += len(df_valide)
+            del morceau
+            retenus.append(df_valide)
+
+            if budget.doit_deverser():
+                entete = _deverser(retenus, temporaire, entete)
+                budget.deversements += 1
+                budget.lignes_deversees += sum(len(r) for r in retenus)
+                retenus = []
+                gc.collect()
+
+        fichiers = []
+        if budget.deversements:
+            # Une partie est déjà sur disque : le reste y est ajouté, le CSV devient l'export
+            entete = _deverser(retenus, temporaire, entete)
+            retenus = []
+            if 'excel' in formats:
+                print("⚠️  Excel : la table complète est relue en mémoire pour écrire le classeur")
+                fichiers.append(ecrire_excel(pd.read_csv(temporaire, encoding='utf-8-sig'),
+                                             chemin_export('excel', dossier, horodatage)))
+            if 'csv' in formats:
+                os.replace(temporaire, chemin_csv)
+                fichiers.insert(0, chemin_csv)
+        else:
+            df_export = (pd.concat(retenus, ignore_index=True) if retenus
+                         else pd.DataFrame(columns=COLONNES_BDD))
+            retenus = []
+            if 'csv' in formats:
+                df_export.to_csv(chemin_csv, index=False, encoding='utf-8-sig')
+                fichiers.append(chemin_csv)
+            if 'excel' in formats:
+                fichiers.append(ecrire_excel(df_export, chemin_export('excel', dossier, horodatage)))
+    finally:
+        # Pas de déversement partiel laissé derrière une erreur (ou CSV non demandé)
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+
+    duree = time.perf_counter() - debut
+    if nb_lignes > 0:
+        print(f"   ✓ {nb_valides}/{nb_lignes} lignes valides ({nb_valides / nb_lignes * 100:.1f}%, "
+              f"{nb_lignes / duree:,.0f} lignes/s)")
+    for fichier in fichiers:
+        print(f"✅ Export: {fichier}")
+    if cleaner.profileur is not None:
+        cleaner.profileur.afficher()
+    if cleaner.tables_surface is not None:
+        cleaner.tables_surface.sauvegarder()
+    budget.afficher()
+    return fichiers, budget
@@ -0,0 +1,234 @@
+"""
+PUBLICATION DES STATISTIQUES - PROJET ID IMMOBILIER
+Écrit les agrégats de chaque nettoyage dans la table `cache` de Laravel
+(migration create_cache_table) pour que l'application web les lise via Cache::get :
+- Prix au m² par quartier, répartition par type, moyennes globales
+- Valeurs sérialisées au format PHP serialize() avec expiration
+- Clés versionnées + pointeur de version basculé dans la même transaction
+
+Lecture côté Laravel :
+    $v = Cache::get('id_immobilier:stats:version');
+    $quartiers = Cache::get("id_immobilier:stats:v{$v}:quartiers");
+"""
+
+import argparse
+import math
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+
+# Schéma SQLite équivalent à database/migrations/0001_01_01_000001_create_cache_table.php
+SCHEMA_CACHE = """
+CREATE TABLE IF NOT EXISTS cache (
+    key VARCHAR NOT NULL PRIMARY KEY,
+    value TEXT NOT NULL,
+    expiration INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_expiration_index ON cache (expiration);
+"""
+
+ESPACE_CLES = 'id_immobilier:stats'
+
+# Durée de vie d'une version publiée (7 jours), pointeur compris : un pointeur
+# ne doit jamais survivre aux statistiques qu'il désigne
+TTL_STATISTIQUES = 7 * 24 * 3600
+
+
+def fichier_env_laravel(depart=None):
+    """.env du projet Laravel : premier dossier contenant `artisan` en remontant depuis `depart`"""
+    dossier = os.path.abspath(depart or os.path.dirname(os.path.abspath(__file__)))
+    while True:
+        if os.path.exists(os.path.join(dossier, 'artisan')):
+            chemin = os.path.join(dossier, '.env')
+            return chemin if os.path.exists(chemin) else None
+        parent = os.path.dirname(dossier)
+        if parent == dossier:
+            return None
+        dossier = parent
+
+
+def lire_env_laravel(chemin):
+    """Variables d'un .env (KEY=valeur, guillemets et commentaires retirés, ${VAR} substitué)"""
+    variables = {}
+    if not chemin:
+        return variables
+    with open(chemin, encoding='utf-8') as f:
+        for ligne in f:
+            ligne = ligne.strip()
+            if not ligne or ligne.startswith('#') or '=' not in ligne:
+                continue
+            cle, valeur = ligne.split('=', 1)
+            cle, valeur = cle.strip().removeprefix('export ').strip(), valeur.strip()
+            if valeur[:1] in ('"', "'") and valeur.find(valeur[0], 1) > 0:
+                valeur = valeur[1:valeur.find(valeur[0], 1)]
+            else:
+                valeur = valeur.split(' #', 1)[0].strip()
+            valeur = re.sub(r'\$\{(\w+)\}',
+                            lambda m: variables.get(m.group(1), os.environ.get(m.group(1), '')), valeur)
+            variables[cle] = valeur
+    return variables
+
+
+def prefixe_laravel(chemin_env=None):
+    """
+    Préfixe des clés tel que le calcule config/cache.php :
+    env('CACHE_PREFIX', Str::slug(env('APP_NAME', 'laravel')) . '-cache-')
+    Comme Laravel, les variables d'environnement priment sur le .env du projet,
+    lu ici car un processus Python (cron, CLI) ne le charge pas
+    """
+    variables = lire_env_laravel(chemin_env or fichier_env_laravel())
+    variables.update(os.environ)
+    if 'CACHE_PREFIX' in variables:
+        return variables['CACHE_PREFIX']
+    nom = unicodedata.normalize('NFKD', variables.get('APP_NAME', 'laravel'))
+    nom = nom.encode('ascii', 'ignore').decode('ascii').lower()
+    return re.sub(r'[^a-z0-9]+', '-', nom).strip('-') + '-cache-'
+
+
+def serialiser_php(valeur):
+    """Sérialiser une valeur Python au format PHP serialize()"""
+    if valeur is None:
+        return 'N;'
+    if isinstance(valeur, bool):
+        return f'b:{int(valeur)};'
+    if isinstance(valeur, int):
+        return f'i:{valeur};'
+    if isinstance(valeur, float):
+        if math.isnan(valeur):
+            return 'd:NAN;'
+        if math.isinf(valeur):
+            return 'd:INF;' if valeur > 0 else 'd:-INF;'
+        return f'd:{valeur!r};'
+    if isinstance(valeur, str):
+        return f's:{len(valeur.encode("utf-8"))}:"{valeur}";'
+    if isinstance(valeur, (list, tuple)):
+        valeur = dict(enumerate(valeur))
+    if isinstance(valeur, dict):
+        elements = ''.join(serialiser_php(k) + serialiser_php(v) for k, v in valeur.items())
+        return f'a:{len(valeur)}:{{{elements}}}'
+
+    # Types numpy (int64, float64...) : conversion vers le type Python natif
+    if hasattr(valeur, 'item'):
+        return serialiser_php(valeur.item())
+    raise TypeError(f"Type non sérialisable: {type(valeur).__name__}")
+
+
+def calculer_statistiques(df_valide, nb_lignes_initiales=None):
+    """
+    Calculer les agrégats publiés (mêmes indicateurs que le rapport de nettoyer_dataset)
+    Retourne un dict {nom: valeur} ; chaque nom devient une clé de cache
+    """
+    import id_immobilier_FINAL  # noqa: F401 (dossier commun de resume_statistique sur sys.path)
+    from resume_statistique import resumer
+    return resumer(df_valide, nb_lignes_initiales).en_dict()
+
+
+class PublicateurCache:
+    """Écriture versionnée des statistiques dans la table `cache`"""
+
+    def __init__(self, chemin_db, prefixe=None, espace=ESPACE_CLES, ttl=TTL_STATISTIQUES):
+        self.prefixe = prefixe_laravel() if prefixe is None else prefixe
+        self.espace = espace
+        self.ttl = ttl
+        self.conn = sqlite3.connect(chemin_db, timeout=30, isolation_level=None)
+
+    def creer_schema(self):
+        """Créer la table (base de test uniquement, en production : php artisan migrate)"""
+        self.conn.executescript(SCHEMA_CACHE)
+
+    def _cle(self, nom):
+        return f'{self.prefixe}{self.espace}:{nom}'
+
+    def _cle_version(self, version, nom):
+        return self._cle(f'v{version}:{nom}')
+
+    def version_courante(self):
+        """Version pointée actuellement (0 si aucune publication)"""
+        ligne = self.conn.execute(
+            "SELECT value FROM cache WHERE key = ? AND expiration > ?",
+            (self._cle('version'), int(time.time()))
+        ).fetchone()
+        return int(ligne[0][2:-1]) if ligne else 0
+
+    def publier(self, statistiques):
+        """
+        Écrire une nouvelle version puis basculer le pointeur, en une transaction
+        Les entrées de la version précédente restent lisibles jusqu'à la suivante,
+        pour les lecteurs qui ont lu le pointeur juste avant la bascule
+        """
+        maintenant = int(time.time())
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = self.version_courante() + 1
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, expiration) VALUES (?, ?, ?)",
+                [(self._cle_version(version, nom), serialiser_php(valeur), maintenant + self.ttl)
+                 for nom, valeur in statistiques.items()]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expiration) VALUES (?, ?, ?)",
+                (self._cle('version'), serialiser_php(version), maintenant + self.ttl)
+            )
+
+            # Nettoyage : versions antérieures à la précédente et entrées expirées
+            self.conn.execute(
+                "DELETE FROM cache WHERE key LIKE ? AND key NOT LIKE ? AND key NOT LIKE ?",
+                (self._cle('v%:%'), self._cle_version(version, '%'), self._cle_version(version - 1, '%'))
+            )
+            self.conn.execute(
+                "DELETE FROM cache WHERE key LIKE ? AND expiration <= ?",
+                (self._cle('%'), maintenant)
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+        return version
+
+    def lire_brut(self, nom):
+        """Valeur sérialisée de la version courante (comme la lirait Laravel)"""
+        ligne = self.conn.execute(
+            "SELECT value FROM cache WHERE key = ? AND expiration > ?",
+            (self._cle_version(self.version_courante(), nom), int(time.time()))
+        ).fetchone()
+        return ligne[0] if ligne else None
+
+    def fermer(self):
+        self.conn.close()
+
+
+def publier_statistiques(chemin_db, df_valide, nb_lignes_initiales=None, creer_schema=False,
+                         prefixe=None):
+    """Calculer et publier les statistiques d'un nettoyage ; retourne la version publiée"""
+    publicateur = PublicateurCache(chemin_db, prefixe=prefixe)
+    try:
+        if creer_schema:
+            publicateur.creer_schema()
+        return publicateur.publier(calculer_statistiques(df_valide, nb_lignes_initiales))
+    finally:
+        publicateur.fermer()
+
+
+def main():
+    """Publier les statistiques d'un export nettoyé (CSV) dans la table cache"""
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Publier les statistiques ID Immobilier dans le cache Laravel")
+    parser.add_argument('export', help="Export nettoyé (id_immobilier_optimise_*.csv)")
+    parser.add_argument('--db', default='database/database.sqlite', help="Base SQLite Laravel")
+    parser.add_argument('--creer-schema', action='store_true', help="Créer la table cache si absente")
+    parser.add_argument('--prefixe', default=None,
+                        help="Préfixe des clés Laravel (défaut : CACHE_PREFIX, sinon slug(APP_NAME)-cache-)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.export)
+    version = publier_statistiques(args.db, df, creer_schema=args.creer_schema, prefixe=args.prefixe)
+    print(f"✅ Statistiques publiées: version {version} ({len(df)} annonces)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+CLASSIFICATION DES TITRES PAR MOTS-CLÉS - PROJET ID IMMOBILIER
+Un seul parcours de chaque titre donne ensemble :
+- type_bien (Terrain, Villa, Maison, Appartement, Immeuble, Commercial) et type_offre
+  (Vente, Location), chacun avec un score de confiance
+- le nombre de pièces (F1–F6, studio, "2 chambres salon", "3 pièces")
+- les mots-clés de location trouvés (louer, loyer, meublé, caution...)
+
+Le titre est découpé en mots (minuscules, sans accents) : un mot n'est reconnu que
+s'il est entier ("f1" ne correspond plus à "f150"). La table de mots-clés (MOTS_CLES,
+remplaçable par un dict ou un fichier JSON de même forme) est compilée en un
+dictionnaire mot -> actions : une recherche par mot, les expressions de deux mots
+("chambre salon") étant suivies depuis leur premier mot.
+
+Score d'un type = somme des poids de ses mots-clés distincts ; confiance = score du
+type retenu / somme des scores de tous les types (égalités : ordre de la table). Sans
+aucun mot-clé : Terrain / Vente avec une confiance de 0.
+
+    python classification_types.py "Appartement F3 meublé à louer à Bè" "Villa duplex sur 1 lot"
+    python classification_types.py --benchmark 200000
+"""
+
+import json
+import re
+import time
+import unicodedata
+from collections import namedtuple
+
+from recherche_quartiers import normaliser
+
+
+# Type -> {mot-clé ou expression de deux mots: poids} ; l'ordre des types départage les égalités
+MOTS_CLES = {
+    'type_bien': {
+        'Terrain': {'terrain': 1.0, 'parcelle': 1.0, 'lot': 0.5, 'plot': 0.5, 'hectare': 0.5},
+        'Villa': {'villa': 1.0, 'duplex': 1.0},
+        'Maison': {'maison': 1.0},
+        'Appartement': {'appartement': 1.0, 'appart': 1.0, 'studio': 1.0, 'condominium': 1.0,
+                        'f1': 1.0, 'f2': 1.0, 'f3': 1.0, 'f4': 1.0, 'f5': 1.0, 'f6': 1.0,
+                        'chambre salon': 0.5},
+        'Immeuble': {'immeuble': 1.0},
+        'Commercial': {'bureau': 1.0, 'commercial': 1.0, 'magasin': 1.0, 'boutique': 1.0,
+                       'entrepot': 1.0},
+    },
+    'type_offre': {
+        'Location': {'louer': 1.0, 'location': 1.0, 'loue': 1.0, 'loyer': 1.0, 'bail': 1.0,
+                     'meuble': 0.5, 'caution': 0.5, 'mensuel': 0.5},
+        'Vente': {'vendre': 1.0, 'vente': 1.0, 'vends': 1.0, 'vend': 1.0, 'cession': 1.0},
+    },
+    # Nombre de pièces annoncé par le mot lui-même
+    'pieces': {'studio': 1, 'f1': 1, 'f2': 2, 'f3': 3, 'f4': 4, 'f5': 5, 'f6': 6,
+               'chambre salon': 2},
+}
+
+# Type retenu sans aucun mot-clé (confiance 0)
+DEFAUTS = {'type_bien': 'Terrain', 'type_offre': 'Vente'}
+# Titre absent
+DEFAUTS_MANQUANT = {'type_bien': 'Inconnu', 'type_offre': 'Vente'}
+
+# Mots comptés avec le nombre qui les précède ("3 chambres", "4 pièces")
+MOTS_COMPTES = {'chambre': 'chambres', 'chambres': 'chambres', 'piece': 'pieces', 'pieces': 'pieces'}
+
+DECOUPAGE = re.compile(r'[a-z0-9]+')
+
+Classement = namedtuple('Classement', [
+    'type_bien', 'type_bien_confiance', 'type_offre', 'type_offre_confiance',
+    'nb_pieces', 'mots_location'])
+
+COLONNES_CLASSEMENT = list(Classement._fields)
+
+
+def charger_mots_cles(source=None):
+    """Table de mots-clés : MOTS_CLES, un dict de même forme ou un fichier JSON"""
+    if source is None:
+        return MOTS_CLES
+    if isinstance(source, dict):
+        return source
+    with open(source, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def decouper(titre):
+    """
+    Mots d'un titre, minuscules sans accents : décomposition NFD puis encodage ASCII
+    (accents, emojis et autres caractères hors ASCII supprimés en une opération)
+    """
+    texte = unicodedata.normalize('NFD', str(titre).lower()).encode('ascii', 'ignore').decode('ascii')
+    return DECOUPAGE.findall(texte)
+
+
+def _formes(mot):
+    """Mot-clé normalisé et son pluriel (terrains, parcelles...)"""
+    mot = normaliser(mot)
+    return (mot,) if mot.endswith(('s', 'x')) or mot[-1:].isdigit() else (mot, mot + 's')
+
+
+class ClassifieurTypes:
+    """Table de mots-clés compilée : mot -> (actions, expressions commençant par ce mot)"""
+
+    def __init__(self, mots_cles=None):
+        self.mots_cles = charger_mots_cles(mots_cles)
+        self.champs = [champ for champ in ('type_bien', 'type_offre') if champ in self.mots_cles]
+        self.types = {champ: list(self.mots_cles[champ]) for champ in self.champs}
+        self.table = {}
+
+        # Action : (indice du champ, indice du type, poids, mot-clé), ('pieces', n)
+        # ou ('compte', chambres) pour les mots précédés d'un nombre
+        for i, champ in enumerate(self.champs):
+            for j, (type_, mots) in enumerate(self.mots_cles[champ].items()):
+                for mot, poids in mots.items():
+                    self._ajouter(mot, (i, j, float(poids), normaliser(mot)))
+        for mot, nb in self.mots_cles.get('pieces', {}).items():
+            self._ajouter(mot, ('pieces', int(nb)))
+        for mot, unite in MOTS_COMPTES.items():
+            self._ajouter(mot, ('compte', unite == 'chambres'))
+        self.vides = [[0.0] * len(self.types[champ]) for champ in self.champs]
+
+        champ_location = self.types.get('type_offre', [])
+        self.indice_location = (self.champs.index('type_offre'), champ_location.index('Location')) \
+            if 'Location' in champ_location else None
+        # Mots-clés de location, dans l'ordre de la table (rang = bit du masque)
+        self.mots_location = [normaliser(mot) for mot in self.mots_cles.get('type_offre', {}).get('Location', {})]
+        if len(self.mots_location) > 63:
+            raise ValueError("Au plus 63 mots-clés de location (masque sur 64 bits)")
+        self.rang_location = {mot: k for k, mot in enumerate(self.mots_location)}
+
+    def _ajouter(self, mot, action):
+        mots = normaliser(mot).split()
+        if len(mots) > 2:
+            raise ValueError(f"Mot-clé de plus de deux mots: {mot!r}")
+        for premier in _formes(mots[0]):
+            actions, suites = self.table.get(premier, ((), None))
+            if len(mots) == 1:
+                self.table[premier] = (actions + (action,), suites)
+            else:
+                suites = dict(suites or {})
+                for second in _formes(mots[1]):
+                    suites[second] = suites.get(second, ()) + (action,)
+                self.table[premier] = (actions, suites)
+
+    def classer(self, titre):
+        """Classement d'un titre (un parcours de ses mots)"""
+        if not isinstance(titre, str):
+            try:
+                manquant = titre is None or bool(titre != titre)
+            except TypeError:   # pd.NA
+                manquant = True
+            titre = '' if manquant else str(titre)
+        if not titre:
+            return Classement(DEFAUTS_MANQUANT['type_bien'], 0.0, DEFAUTS_MANQUANT['type_offre'], 0.0,
+                              None, '')
+
+        mots = decouper(titre)
+        scores = None
+        vus = set()
+        location = []
+        nb_pieces = pieces_comptees = None
+        table = self.table
+        for k, mot in enumerate(mots):
+            entree = table.get(mot)
+            if entree is None:
+                continue
+            actions, suites = entree
+            if suites is not None and k + 1 < len(mots):
+                actions = actions + suites.get(mots[k + 1], ())
+            for action in actions:
+                genre = action[0]
+                if genre == 'pieces':
+                    nb_pieces = nb_pieces or action[1]
+                elif genre == 'compte':
+                    # "2 chambres salon" : 3 pièces ; "4 pièces" : 4 (prime sur "chambre salon")
+                    if k > 0 and mots[k - 1].isdigit() and 0 < int(mots[k - 1]) < 20:
+                        n = int(mots[k - 1])
+                        salon = action[1] and k + 1 < len(mots) and mots[k + 1] == 'salon'
+                        pieces_comptees = pieces_comptees or (n + 1 if salon else n)
+                elif action[3] not in vus:
+                    # Chaque mot-clé compte une fois
+                    vus.add(action[3])
+                    if scores is None:
+                        scores = [list(ligne) for ligne in self.vides]
+                    scores[genre][action[1]] += action[2]
+                    if action[:2] == self.indice_location:
+                        location.append(action[3])
+        nb_pieces = pieces_comptees or nb_pieces
+
+        resultat = []
+        for champ, scores_champ in zip(self.champs, scores or self.vides):
+            total = sum(scores_champ)
+            if total == 0:
+                resultat += [DEFAUTS[champ], 0.0]
+            else:
+                j = scores_champ.index(max(scores_champ))
+                resultat += [self.types[champ][j], round(scores_champ[j] / total, 2)]
+        return Classement(*resultat, nb_pieces, ','.join(sorted(location, key=self.rang_location.get)))
+
+    def modalites(self, champ):
+        """Valeurs possibles d'un champ (types de la table et valeurs par défaut)"""
+        valeurs = list(self.types.get(champ, []))
+        for defaut in (DEFAUTS[champ], DEFAUTS_MANQUANT[champ]):
+            if defaut not in valeurs:
+                valeurs.append(defaut)
+        return valeurs
+
+    def masque_location(self, mots_location):
+        """Mots-clés de location -> masque de bits (transport en mémoire partagée)"""
+        return sum(1 << self.rang_location[mot] for mot in mots_location.split(',') if mot)
+
+    def mots_du_masque(self, masque):
+        return ','.join(mot for k, mot in enumerate(self.mots_location) if masque >> k & 1)
+
+    def classer_colonne(self, titres):
+        """
+        Classement d'une colonne de titres : chaque titre distinct est classé une fois,
+        puis les résultats sont répartis sur les lignes (DataFrame aligné sur `titres`)
+        """
+        import numpy as np
+        import pandas as pd
+
+        titres = pd.Series(titres)
+        codes, distincts = pd.factorize(titres)
+        lignes = [self.classer(titre) for titre in distincts]
+        lignes.append(self.classer(None))   # code -1 : titre manquant
+        colonnes = list(zip(*lignes))
+        resultat = pd.DataFrame(index=titres.index)
+        for nom, valeurs in zip(COLONNES_CLASSEMENT, colonnes):
+            if nom == 'nb_pieces':
+                valeurs = [np.nan if v is None else v for v in valeurs]
+            resultat[nom] = np.asarray(valeurs, dtype=object if nom in
+                                       ('type_bien', 'type_offre', 'mots_location') else float)[codes]
+        return resultat
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def _type_bien_historique(titre):
+    """Règles d'origine (tests de sous-chaînes en cascade), pour comparaison"""
+    titre_lower = str(titre).lower()
+    if 'terrain' in titre_lower:
+        return 'Terrain'
+    elif any(word in titre_lower for word in ['villa', 'duplex']):
+        return 'Villa'
+    elif 'maison' in titre_lower:
+        return 'Maison'
+    elif any(word in titre_lower for word in ['appartement', 'studio', 'f1', 'f2', 'f3', 'f4']):
+        return 'Appartement'
+    elif 'immeuble' in titre_lower:
+        return 'Immeuble'
+    elif 'bureau' in titre_lower or 'commercial' in titre_lower:
+        return 'Commercial'
+    return 'Terrain'
+
+
+def _type_offre_historique(titre):
+    titre_lower = str(titre).lower()
+    if any(word in titre_lower for word in ['louer', 'location', 'à louer', 'en location']):
+        return 'Location'
+    return 'Vente'
+
+
+def benchmark(nb=200000, fichier_csv=None):
+    """Débit (titres/s) et accord avec les règles d'origine, sur un dump synthétique ou réel"""
+    import pandas as pd
+    from parallele_memoire import generer_dump
+
+    if fichier_csv:
+        titres = pd.read_csv(fichier_csv)['marketplace_listing_title'].dropna().astype(str)
+    else:
+        titres = generer_dump(nb)['marketplace_listing_title']
+    classifieur = ClassifieurTypes()
+
+    debut = time.perf_counter()
+    historique_bien = titres.map(_type_bien_historique)
+    historique_offre = titres.map(_type_offre_historique)
+    duree_historique = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    par_ligne = [classifieur.classer(titre) for titre in titres]
+    duree_ligne = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    resultat = classifieur.classer_colonne(titres)
+    duree_colonne = time.perf_counter() - debut
+
+    assert [c.type_bien for c in par_ligne] == resultat['type_bien'].tolist()
+    differents = (resultat['type_bien'] != historique_bien) | (resultat['type_offre'] != historique_offre)
+
+    print("=" * 70)
+    print(f"⏱️  CLASSIFICATION - {len(titres):,} titres ({titres.nunique():,} distincts)")
+    print("=" * 70)
+    for nom, duree, detail in (
+            ("règles d'origine (2 parcours)", duree_historique, "type_bien + type_offre"),
+            ("classer, ligne par ligne", duree_ligne, "+ pièces, location, confiance"),
+            ("classer_colonne", duree_colonne, "titres distincts classés une fois")):
+        print(f"   {nom:<32}{len(titres) / duree:>12,.0f} titres/s  ({detail})")
+    print(f"\n   Accord avec les règles d'origine: {(~differents).mean() * 100:.1f}%")
+    print(f"   Sans mot-clé de type (confiance 0): {(resultat['type_bien_confiance'] == 0).mean() * 100:.1f}%")
+    print(f"   Nombre de pièces trouvé: {resultat['nb_pieces'].notna().mean() * 100:.1f}%")
+    if differents.any():
+        print("\n   Exemples de différences (origine -> nouveau):")
+        exemples = pd.DataFrame({'titre': titres, 'avant': historique_bien + '/' + historique_offre,
+                                 'apres': resultat['type_bien'] + '/' + resultat['type_offre']})[differents]
+        for ligne in exemples.drop_duplicates('titre').head(8).itertuples():
+            print(f"   {ligne.titre[:50]!r:<54} {ligne.avant} -> {ligne.apres}")
+    print("=" * 70)
+    return resultat
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Classification des titres par mots-clés")
+    parser.add_argument('titres', nargs='*')
+    parser.add_argument('--mots-cles', metavar='JSON', help="Table de mots-clés (forme de MOTS_CLES)")
+    parser.add_argument('--benchmark', type=int, nargs='?', const=200000, metavar='N',
+                        help="Débit et accord avec les règles d'origine sur N titres synthétiques")
+    parser.add_argument('--csv', help="Benchmark sur les titres d'un dump réel")
+    args = parser.parse_args()
+
+    if args.benchmark or args.csv:
+        benchmark(args.benchmark or 0, args.csv)
+        return
+    classifieur = ClassifieurTypes(args.mots_cles)
+    for titre in args.titres:
+        c = classifieur.classer(titre)
+        print(f"📝 {titre}")
+        print(f"   {c.type_bien} ({c.type_bien_confiance:.2f}) / {c.type_offre} ({c.type_offre_confiance:.2f})"
+              f"{f', {c.nb_pieces} pièce(s)' if c.nb_pieces else ''}"
+              f"{f', location: {c.mots_location}' if c.mots_location else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+CYCLE DE VIE DES ANNONCES - PROJET ID IMMOBILIER
+determiner_statut ne donne qu'un libellé par collecte ; ce module garde la trace
+de chaque annonce d'une collecte à l'autre :
+- Chaque id_bien reçoit un numéro dense (0, 1, 2...) à sa première apparition
+- Par instantané et par statut (présente, Active, Vendue, En attente, Masquée) :
+  un bitmap compressé des numéros concernés ; par quartier : un bitmap aussi
+- Bitmaps « roaring » : numéros découpés en blocs de 65 536, chaque bloc stocké en
+  tableau trié (peu de valeurs) ou en bitset de 8 Ko (beaucoup de valeurs)
+- Les questions de cycle de vie deviennent des intersections / unions de bitmaps :
+    « en ligne la semaine N et vendue avant N+4, par quartier »
+    taux d'écoulement, durée sur le marché (en instantanés)
+
+pyroaring est utilisé s'il est installé (pip install pyroaring) ; sinon la version
+NumPy ci-dessous (même structure, mêmes opérations).
+
+    python cycle_vie.py ajouter exports/id_immobilier_optimise_*.csv --etat cycle_vie/
+    python cycle_vie.py ecoulement --etat cycle_vie/ --semaine 10 --horizon 4
+    python cycle_vie.py --benchmark 200000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+try:
+    from pyroaring import BitMap as _BitMapRoaring
+except ImportError:
+    _BitMapRoaring = None
+
+
+STATUTS = ['Active', 'Vendue', 'En attente', 'Masquée']
+PRESENTE = 'presente'
+
+# Un bloc passe en bitset au-delà de 4096 valeurs (tableau de 8 Ko = bitset de 8 Ko)
+MAX_TABLEAU = 4096
+MOTS_BITSET = 1024  # 65 536 bits en mots de 64 bits
+
+
+# ============================================
+# BITMAP COMPRESSÉ (repli NumPy)
+# ============================================
+
+def _vers_bitset(bloc):
+    if bloc.dtype == np.uint64:
+        return bloc
+    bitset = np.zeros(MOTS_BITSET, dtype=np.uint64)
+    np.bitwise_or.at(bitset, bloc >> 6, np.left_shift(np.uint64(1), (bloc & 63).astype(np.uint64)))
+    return bitset
+
+
+def _valeurs_bitset(bitset):
+    bits = np.unpackbits(bitset.view(np.uint8), bitorder='little')
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _compacter(bitset):
+    """Bitset -> tableau trié s'il contient peu de valeurs (None si vide)"""
+    nb = int(np.unpackbits(bitset.view(np.uint8)).sum())
+    if nb == 0:
+        return None
+    return _valeurs_bitset(bitset) if nb <= MAX_TABLEAU else bitset
+
+
+class BitmapCompresse:
+    """
+    Ensemble d'entiers 32 bits : {bloc (16 bits de poids fort) -> conteneur}
+    conteneur = tableau uint16 trié, ou bitset uint64[1024]
+    """
+
+    __slots__ = ('blocs',)
+
+    def __init__(self, valeurs=None):
+        self.blocs = {}
+        if valeurs is not None:
+            valeurs = np.unique(np.asarray(valeurs, dtype=np.uint32))
+            hauts = valeurs >> 16
+            coupures = np.flatnonzero(np.diff(hauts)) + 1
+            for morceau in np.split(valeurs, coupures) if len(valeurs) else []:
+                bas = (morceau & 0xFFFF).astype(np.uint16)
+                self.blocs[int(morceau[0] >> 16)] = bas if len(bas) <= MAX_TABLEAU else _vers_bitset(bas)
+
+    @classmethod
+    def _depuis_blocs(cls, blocs):
+        bitmap = cls()
+        bitmap.blocs = blocs
+        return bitmap
+
+    def __len__(self):
+        return sum(len(b) if b.dtype == np.uint16 else int(np.unpackbits(b.view(np.uint8)).sum())
+                   for b in self.blocs.values())
+
+    def __and__(self, autre):
+        blocs = {}
+        for cle in self.blocs.keys() & autre.blocs.keys():
+            a, b = self.blocs[cle], autre.blocs[cle]
+            if a.dtype == np.uint16 and b.dtype == np.uint16:
+                resultat = np.intersect1d(a, b, assume_unique=True)
+                if len(resultat):
+                    blocs[cle] = resultat
+            elif a.dtype == np.uint16 or b.dtype == np.uint16:
+                tableau, bitset = (a, b) if a.dtype == np.uint16 else (b, a)
+                garde = (bitset[tableau >> 6] >> (tableau & 63).astype(np.uint64)) & np.uint64(1)
+                resultat = tableau[garde.astype(bool)]
+                if len(resultat):
+                    blocs[cle] = resultat
+            else:
+                resultat = _compacter(a & b)
+                if resultat is not None:
+                    blocs[cle] = resultat
+        return BitmapCompresse._depuis_blocs(blocs)
+
+    def __or__(self, autre):
+        blocs = dict(self.blocs)
+        for cle, b in autre.blocs.items():
+            a = blocs.get(cle)
+            if a is None:
+                blocs[cle] = b
+            elif a.dtype == np.uint16 and b.dtype == np.uint16 and len(a) + len(b) <= MAX_TABLEAU:
+                blocs[cle] = np.union1d(a, b)
+            else:
+                blocs[cle] = _compacter(_vers_bitset(a) | _vers_bitset(b))
+        return BitmapCompresse._depuis_blocs(blocs)
+
+    def __sub__(self, autre):
+        blocs = {}
+        for cle, a in self.blocs.items():
+            b = autre.blocs.get(cle)
+            if b is None:
+                blocs[cle] = a
+            elif a.dtype == np.uint16 and b.dtype == np.uint16:
+                resultat = np.setdiff1d(a, b, assume_unique=True)
+                if len(resultat):
+                    blocs[cle] = resultat
+            else:
+                resultat = _compacter(_vers_bitset(a) & ~_vers_bitset(b))
+                if resultat is not None:
+                    blocs[cle] = resultat
+        return BitmapCompresse._depuis_blocs(blocs)
+
+    def valeurs(self):
+        """Numéros contenus, triés"""
+        morceaux = [(np.uint32(cle) << 16) | (b if b.dtype == np.uint16 else _valeurs_bitset(b)).astype(np.uint32)
+                    for cle, b in sorted(self.blocs.items())]
+        return np.concatenate(morceaux) if morceaux else np.zeros(0, dtype=np.uint32)
+
+    def octets(self):
+        return sum(b.nbytes for b in self.blocs.values())
+
+
+def nouveau_bitmap(valeurs=None):
+    """Bitmap pyroaring si disponible, sinon BitmapCompresse"""
+    if _BitMapRoaring is not None:
+        return _BitMapRoaring(np.asarray(valeurs if valeurs is not None else [], dtype=np.uint32))
+    return BitmapCompresse(valeurs)
+
+
+def _valeurs(bitmap):
+    return bitmap.valeurs() if isinstance(bitmap, BitmapCompresse) else np.asarray(bitmap.to_array(), dtype=np.uint32)
+
+
+def _union(bitmaps):
+    resultat = nouveau_bitmap()
+    for bitmap in bitmaps:
+        resultat = resultat | bitmap
+    return resultat
+
+
+# ============================================
+# REGISTRE DU CYCLE DE VIE
+# ============================================
+
+class CycleDeVie:
+    """Numéros des annonces, bitmaps par (instantané, statut) et par quartier"""
+
+    def __init__(self, dossier=None):
+        self.dossier = dossier
+        self.ids = []            # numéro -> id_bien
+        self.numeros = {}        # id_bien -> numéro
+        self.instantanes = []    # libellés (nom de l'export ou date_collecte), dans l'ordre
+        self.empreintes = []     # empreinte du contenu de chaque instantané
+        self.bitmaps = {}        # (rang instantané, statut) -> bitmap
+        self.quartiers = {}      # quartier -> bitmap (dernier quartier connu de chaque annonce)
+        if dossier and os.path.exists(os.path.join(dossier, 'cycle_vie.json')):
+            self._charger()
+
+    def _numeroter(self, ids):
+        """Numéros des ids (nouveaux numéros pour les annonces jamais vues)"""
+        numeros = np.empty(len(ids), dtype=np.uint32)
+        for i, id_bien in enumerate(ids):
+            numero = self.numeros.get(id_bien)
+            if numero is None:
+                numero = self.numeros[id_bien] = len(self.ids)
+                self.ids.append(id_bien)
+            numeros[i] = numero
+        return numeros
+
+    @staticmethod
+    def empreinte(df):
+        """
+        SHA-256 des lignes (id_bien, statut, quartier, date_collecte), indépendante de
+        leur ordre : une collecte sans changement mais d'un autre jour reste distincte
+        """
+        import pandas as pd
+
+        colonnes = [c for c in ('id_bien', 'statut', 'quartier', 'date_collecte') if c in df.columns]
+        lignes = pd.util.hash_pandas_object(df[colonnes].astype(str), index=False)
+        return hashlib.sha256(np.sort(lignes.to_numpy()).tobytes()).hexdigest()
+
+    def ajouter_instantane(self, df, libelle=None):
+        """
+        Enregistrer une collecte (export nettoyé : id_bien, statut, quartier) ;
+        libellé par défaut : sa date_collecte (date du nettoyage, pas forcément unique).
+        Seul un contenu identique à un instantané déjà enregistré (même export ajouté
+        deux fois) est refusé (ValueError) : il fausserait les durées
+        """
+        if libelle is None:
+            libelle = str(df['date_collecte'].iloc[0]) if len(df) else f'instantane_{len(self.instantanes)}'
+        empreinte = self.empreinte(df)
+        if empreinte in self.empreintes:
+            rang = self.empreintes.index(empreinte)
+            raise ValueError(f"contenu identique à l'instantané {rang} ({self.instantanes[rang]!r})")
+        rang = len(self.instantanes)
+        self.instantanes.append(libelle)
+        self.empreintes.append(empreinte)
+
+        numeros = self._numeroter(df['id_bien'].astype(str).tolist())
+        self.bitmaps[(rang, PRESENTE)] = nouveau_bitmap(numeros)
+        statuts = df['statut'].to_numpy()
+        for statut in STATUTS:
+            self.bitmaps[(rang, statut)] = nouveau_bitmap(numeros[statuts == statut])
+
+        # Quartier : la dernière valeur connue remplace les précédentes
+        if 'quartier' in df.columns:
+            deja_vus = nouveau_bitmap(numeros)
+            for quartier in list(self.quartiers):
+                self.quartiers[quartier] = self.quartiers[quartier] - deja_vus
+            valeurs = df['quartier'].fillna('Non spécifié').to_numpy()
+            for quartier in np.unique(valeurs):
+                bitmap = nouveau_bitmap(numeros[valeurs == quartier])
+                self.quartiers[quartier] = self.quartiers.get(quartier, nouveau_bitmap()) | bitmap
+        return rang
+
+    def bitmap(self, rang, statut=PRESENTE):
+        return self.bitmaps.get((rang, statut), nouveau_bitmap())
+
+    def vendues_entre(self, debut, fin):
+        """Annonces marquées vendues dans au moins un instantané de [debut, fin]"""
+        return _union(self.bitmap(k, 'Vendue') for k in range(debut, min(fin, len(self.instantanes) - 1) + 1))
+
+    def ecoulement(self, semaine, horizon=4):
+        """
+        Par quartier : annonces en ligne (Active) à l'instantané `semaine`, dont celles
+        vendues au plus tard à `semaine + horizon`, et le taux d'écoulement
+        """
+        en_ligne = self.bitmap(semaine, 'Active')
+        vendues = en_ligne & self.vendues_entre(semaine + 1, semaine + horizon)
+        resultat = {}
+        for quartier, bitmap in self.quartiers.items():
+            nb_en_ligne = len(en_ligne & bitmap)
+            if nb_en_ligne:
+                nb_vendues = len(vendues & bitmap)
+                resultat[quartier] = {'en_ligne': nb_en_ligne, 'vendues': nb_vendues,
+                                      'taux': round(nb_vendues / nb_en_ligne, 4)}
+        return resultat
+
+    def duree_sur_marche(self, quartier=None):
+        """
+        Répartition des durées (en instantanés) entre la première apparition et la
+        première collecte « Vendue » : {durée: nb d'annonces}
+        """
+        filtre = self.quartiers.get(quartier, nouveau_bitmap()) if quartier else None
+        nouvelles, vendues, deja_vues, deja_vendues = [], [], nouveau_bitmap(), nouveau_bitmap()
+        for k in range(len(self.instantanes)):
+            presentes = self.bitmap(k)
+            nouvelles.append(presentes - deja_vues)
+            deja_vues = deja_vues | presentes
+            vendues.append(self.bitmap(k, 'Vendue') - deja_vendues)
+            deja_vendues = deja_vendues | self.bitmap(k, 'Vendue')
+        durees = {}
+        for k, vendues_k in enumerate(vendues):
+            if filtre is not None:
+                vendues_k = vendues_k & filtre
+            if not len(vendues_k):
+                continue
+            for j in range(k + 1):
+                nb = len(nouvelles[j] & vendues_k)
+                if nb:
+                    durees[k - j] = durees.get(k - j, 0) + nb
+        return dict(sorted(durees.items()))
+
+    def afficher_ecoulement(self, semaine, horizon=4, top=15):
+        resultat = self.ecoulement(semaine, horizon)
+        print("=" * 70)
+        print(f"📈 ÉCOULEMENT - en ligne le {self.instantanes[semaine]}, vendues sous {horizon} instantané(s)")
+        print("=" * 70)
+        print(f"{'quartier':<28}{'en ligne':>10}{'vendues':>10}{'taux':>10}")
+        for quartier, r in sorted(resultat.items(), key=lambda qr: -qr[1]['en_ligne'])[:top]:
+            print(f"{quartier:<28}{r['en_ligne']:>10}{r['vendues']:>10}{r['taux']:>10.1%}")
+        total = sum(r['en_ligne'] for r in resultat.values())
+        vendues = sum(r['vendues'] for r in resultat.values())
+        print(f"\n{'TOTAL':<28}{total:>10}{vendues:>10}{vendues / total if total else 0:>10.1%}")
+        print("=" * 70)
+        return resultat
+
+    def sauvegarder(self, dossier=None):
+        """ids/instantanés en JSON, numéros de chaque bitmap dans un .npz"""
+        dossier = dossier or self.dossier
+        os.makedirs(dossier, exist_ok=True)
+        tableaux = {f'i{rang}|{statut}': _valeurs(b) for (rang, statut), b in self.bitmaps.items()}
+        tableaux.update({f'q|{quartier}': _valeurs(b) for quartier, b in self.quartiers.items()})
+        np.savez_compressed(os.path.join(dossier, 'bitmaps.npz'), **tableaux)
+        temporaire = os.path.join(dossier, 'cycle_vie.json.tmp')
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump({'format': 1, 'ids': self.ids, 'instantanes': self.instantanes,
+                       'empreintes': self.empreintes}, f, ensure_ascii=False)
+        os.replace(temporaire, os.path.join(dossier, 'cycle_vie.json'))
+
+    def _charger(self):
+        with open(os.path.join(self.dossier, 'cycle_vie.json'), encoding='utf-8') as f:
+            etat = json.load(f)
+        self.ids = etat['ids']
+        self.numeros = {id_bien: i for i, id_bien in enumerate(self.ids)}
+        self.instantanes = etat['instantanes']
+        # États antérieurs aux empreintes : instantanés déjà présents non comparables
+        self.empreintes = etat.get('empreintes', [None] * len(self.instantanes))
+        with np.load(os.path.join(self.dossier, 'bitmaps.npz')) as tableaux:
+            for nom in tableaux.files:
+                if nom.startswith('q|'):
+                    self.quartiers[nom[2:]] = nouveau_bitmap(tableaux[nom])
+                else:
+                    rang, statut = nom[1:].split('|', 1)
+                    self.bitmaps[(int(rang), statut)] = nouveau_bitmap(tableaux[nom])
+
+    def octets(self):
+        """Mémoire occupée par les bitmaps (repli NumPy)"""
+        return sum(b.octets() for b in list(self.bitmaps.values()) + list(self.quartiers.values())
+                   if isinstance(b, BitmapCompresse))
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def generer_collectes(nb_annonces, nb_semaines=26, graine=0):
+    """Collectes hebdomadaires synthétiques : arrivée, quelques semaines en ligne, vente ou retrait"""
+    import pandas as pd
+    from id_immobilier_FINAL import QUARTIERS_LOME
+
+    rng = np.random.default_rng(graine)
+    arrivee = rng.integers(0, nb_semaines, nb_annonces)
+    duree = rng.geometric(0.15, nb_annonces)
+    vendue = rng.random(nb_annonces) < 0.4
+    quartiers = np.array(QUARTIERS_LOME[:60])[rng.integers(0, 60, nb_annonces)]
+    ids = (10 ** 15 + rng.permutation(nb_annonces)).astype(str)
+    collectes = []
+    for semaine in range(nb_semaines):
+        age = semaine - arrivee
+        presentes = np.flatnonzero((age >= 0) & ((age < duree) | (vendue & (age == duree))))
+        statut = np.where(vendue[presentes] & (age[presentes] == duree[presentes]), 'Vendue', 'Active')
+        collectes.append(pd.DataFrame({
+            'id_bien': ids[presentes], 'statut': statut, 'quartier': quartiers[presentes],
+            'date_collecte': f'S{semaine:02d}',
+        }))
+    return collectes
+
+
+def benchmark(nb_annonces=200000, nb_semaines=26, semaine=10, horizon=4):
+    """Écoulement par quartier : bitmaps contre jointure pandas sur les collectes complètes"""
+    import pandas as pd
+
+    collectes = generer_collectes(nb_annonces, nb_semaines)
+    cycle = CycleDeVie()
+    debut = time.perf_counter()
+    for df in collectes:
+        cycle.ajouter_instantane(df)
+    duree_ajout = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    resultat = cycle.ecoulement(semaine, horizon)
+    duree_bitmaps = (time.perf_counter() - debut) * 1000
+
+    # Référence : jointure des collectes complètes
+    debut = time.perf_counter()
+    en_ligne = collectes[semaine][collectes[semaine]['statut'] == 'Active'][['id_bien', 'quartier']]
+    suivantes = pd.concat(collectes[semaine + 1:semaine + horizon + 1])
+    vendues = suivantes.loc[suivantes['statut'] == 'Vendue', ['id_bien']].drop_duplicates()
+    jointure = en_ligne.merge(vendues.assign(vendue=1), on='id_bien', how='left')
+    reference = jointure.groupby('quartier').agg(en_ligne=('id_bien', 'size'), vendues=('vendue', 'count'))
+    duree_jointure = (time.perf_counter() - debut) * 1000
+
+    identique = all(resultat[q]['en_ligne'] == r.en_ligne and resultat[q]['vendues'] == r.vendues
+                    for q, r in reference.iterrows())
+    lignes = sum(len(df) for df in collectes)
+    print("=" * 70)
+    print(f"⏱️  CYCLE DE VIE - {nb_annonces:,} annonces, {nb_semaines} collectes ({lignes:,} lignes)")
+    print("=" * 70)
+    print(f"   Enregistrement des collectes: {duree_ajout:.2f} s "
+          f"({'pyroaring' if _BitMapRoaring else 'bitmaps NumPy'})")
+    if not _BitMapRoaring:
+        print(f"   Bitmaps en mémoire: {cycle.octets() / 1e6:.1f} Mo")
+    print(f"   Écoulement S{semaine} -> S{semaine + horizon} par quartier:")
+    print(f"      bitmaps:          {duree_bitmaps:8.1f} ms")
+    print(f"      jointure pandas:  {duree_jointure:8.1f} ms")
+    print(f"   Résultats identiques: {'✅' if identique else '❌'}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cycle de vie des annonces (bitmaps par collecte)")
+    parser.add_argument('commande', nargs='?', choices=['ajouter', 'ecoulement', 'duree'])
+    parser.add_argument('exports', nargs='*', help="Exports nettoyés, dans l'ordre de collecte")
+    parser.add_argument('--etat', default='cycle_vie')
+    parser.add_argument('--semaine', type=int, default=0, help="Rang de l'instantané de départ")
+    parser.add_argument('--horizon', type=int, default=4)
+    parser.add_argument('--quartier', default=None)
+    parser.add_argument('--benchmark', type=int, metavar='ANNONCES', default=None)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    if args.commande is None:
+        parser.error("commande requise (ajouter, ecoulement, duree) ou --benchmark")
+
+    cycle = CycleDeVie(args.etat)
+    if args.commande == 'ajouter':
+        import pandas as pd
+        for chemin in args.exports:
+            df = pd.read_csv(chemin, usecols=['id_bien', 'statut', 'quartier', 'date_collecte'],
+                             dtype={'id_bien': str}, encoding='utf-8-sig')
+            try:
+                rang = cycle.ajouter_instantane(df, libelle=os.path.basename(chemin))
+            except ValueError as e:
+                print(f"   ⚠️  {os.path.basename(chemin)} ignoré: {e}")
+                continue
+            print(f"   ✓ {os.path.basename(chemin)}: instantané {rang} ({len(df)} annonces)")
+        cycle.sauvegarder()
+        print(f"✅ {len(cycle.ids)} annonces suivies sur {len(cycle.instantanes)} instantanés")
+    elif args.commande == 'ecoulement':
+        cycle.afficher_ecoulement(args.semaine, args.horizon)
+    else:
+        for duree, nb in cycle.duree_sur_marche(args.quartier).items():
+            print(f"   {duree:>3} instantané(s): {nb}")
+
+
+if __name__ == "__main__":
+    main()
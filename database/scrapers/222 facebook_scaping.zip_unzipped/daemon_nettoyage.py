@@ -0,0 +1,252 @@
+"""
+DAEMON DE NETTOYAGE - PROJET ID IMMOBILIER
+Processus résident qui garde le nettoyeur chaud (pandas importé, index des quartiers
+construit, expressions compilées) et traite les dumps dès leur arrivée :
+- Surveillance d'un dossier de dépôt par polling (aucune API spécifique à l'OS)
+- Agrégats cumulés sur tous les fichiers traités depuis le démarrage
+- Socket de contrôle locale (TCP 127.0.0.1) : status, fichiers, stop
+
+Client :
+    python daemon_nettoyage.py --commande status
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import socket
+import socketserver
+import threading
+import time
+
+
+EXTENSIONS_ACCEPTEES = ('.csv', '.json', '.jsonl')
+PORT_CONTROLE = 8765
+
+# Nombre de fichiers dont on garde le détail des latences
+HISTORIQUE_MAX = 500
+
+
+class DaemonNettoyage:
+    """Boucle de surveillance + état chaud partagé avec la socket de contrôle"""
+
+    def __init__(self, dossier_entree, dossier_sortie, intervalle=0.1, taille_morceau=5000):
+        from id_immobilier_FINAL import IDImmobilierCleanerV2
+
+        self.dossier_entree = dossier_entree
+        self.dossier_sortie = dossier_sortie
+        self.dossier_traites = os.path.join(dossier_entree, 'traites')
+        self.intervalle = intervalle
+        self.taille_morceau = taille_morceau
+
+        # Construit une seule fois pour toute la durée de vie du daemon
+        self.cleaner = IDImmobilierCleanerV2()
+
+        self.verrou = threading.Lock()
+        self.arret = threading.Event()
+        self.demarrage = time.time()
+        self.tailles_vues = {}
+        self.ecartes = {}        # chemin -> taille : fichiers en erreur restés dans l'entrée
+        self.historique = []
+        self.agregats = {
+            'fichiers': 0, 'erreurs': 0, 'lignes': 0, 'valides': 0,
+            'somme_prix_m2': 0.0, 'quartiers': {}
+        }
+
+        os.makedirs(self.dossier_traites, exist_ok=True)
+        os.makedirs(self.dossier_sortie, exist_ok=True)
+
+    def _fichiers_prets(self):
+        """
+        Fichiers arrivés et complets : taille identique sur deux scrutations successives
+        (un fichier en cours de copie n'est pas traité)
+        """
+        prets = []
+        presents = set()
+        for entree in os.scandir(self.dossier_entree):
+            if not entree.is_file() or not entree.name.lower().endswith(EXTENSIONS_ACCEPTEES):
+                continue
+            stat = entree.stat()
+            presents.add(entree.path)
+            if self.ecartes.get(entree.path) == stat.st_size:
+                continue
+            precedent = self.tailles_vues.get(entree.path)
+            if precedent is not None and precedent[0] == stat.st_size:
+                prets.append((entree.path, precedent[1]))
+            elif precedent is None:
+                self.tailles_vues[entree.path] = (stat.st_size, time.time())
+            else:
+                self.tailles_vues[entree.path] = (stat.st_size, precedent[1])
+
+        for chemin in list(self.tailles_vues):
+            if chemin not in presents:
+                del self.tailles_vues[chemin]
+        for chemin in list(self.ecartes):
+            if chemin not in presents:
+                del self.ecartes[chemin]
+        return sorted(prets, key=lambda p: p[1])
+
+    def traiter_fichier(self, chemin, arrivee):
+        """Nettoyer un dump, exporter, mettre à jour les agrégats"""
+        debut = time.time()
+        nom = os.path.basename(chemin)
+        dossier_fichier = os.path.join(self.dossier_sortie, os.path.splitext(nom)[0])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            df_valide, nb_lignes = self.cleaner.nettoyer_par_morceaux(chemin, self.taille_morceau)
+            export = None
+            if len(df_valide) > 0:
+                os.makedirs(dossier_fichier, exist_ok=True)
+                export = self.cleaner.exporter_pour_bdd(df_valide, format='csv', dossier=dossier_fichier)
+
+        shutil.move(chemin, os.path.join(self.dossier_traites, nom))
+        fin = time.time()
+
+        mesure = {
+            'fichier': nom,
+            'lignes': nb_lignes,
+            'valides': len(df_valide),
+            'export': export,
+            'latence_ms': round((fin - arrivee) * 1000, 1),
+            'traitement_ms': round((fin - debut) * 1000, 1)
+        }
+
+        with self.verrou:
+            self.agregats['fichiers'] += 1
+            self.agregats['lignes'] += nb_lignes
+            self.agregats['valides'] += len(df_valide)
+            if len(df_valide) > 0:
+                self.agregats['somme_prix_m2'] += float(df_valide['prix_m2'].sum())
+                for quartier, nb in df_valide['quartier'].value_counts().items():
+                    self.agregats['quartiers'][quartier] = self.agregats['quartiers'].get(quartier, 0) + int(nb)
+            self.historique.append(mesure)
+            del self.historique[:-HISTORIQUE_MAX]
+
+        print(f"   ✓ {nom}: {mesure['valides']}/{nb_lignes} valides en {mesure['latence_ms']:.0f} ms")
+        return mesure
+
+    def executer(self):
+        """Boucle de scrutation jusqu'à l'arrêt"""
+        print(f"👀 Surveillance de {self.dossier_entree} (toutes les {self.intervalle}s)")
+        while not self.arret.is_set():
+            for chemin, arrivee in self._fichiers_prets():
+                self.tailles_vues.pop(chemin, None)
+                try:
+                    self.traiter_fichier(chemin, arrivee)
+                except Exception as e:
+                    # Le fichier fautif est écarté pour ne pas bloquer la file
+                    with self.verrou:
+                        self.agregats['erreurs'] += 1
+                    print(f"   ⚠️ {os.path.basename(chemin)}: {e}")
+                    self._ecarter(chemin)
+            self.arret.wait(self.intervalle)
+
+    def _ecarter(self, chemin):
+        """
+        Déplacer un fichier en erreur vers traites/*.erreur ; si le déplacement échoue
+        (déjà déplacé, supprimé, destination non inscriptible), la surveillance continue
+        et le fichier resté en entrée est ignoré tant que sa taille ne change pas
+        """
+        try:
+            shutil.move(chemin, os.path.join(self.dossier_traites, os.path.basename(chemin) + '.erreur'))
+        except OSError as e:
+            print(f"   ⚠️ {os.path.basename(chemin)}: impossible de l'écarter ({e})")
+            if os.path.exists(chemin):
+                self.ecartes[chemin] = os.path.getsize(chemin)
+
+    def statut(self):
+        """Résumé de l'état courant (réponse à la commande status)"""
+        with self.verrou:
+            latences = sorted(m['latence_ms'] for m in self.historique)
+            valides = self.agregats['valides']
+            top_quartiers = sorted(
+                ((q, n) for q, n in self.agregats['quartiers'].items() if q != 'Non spécifié'),
+                key=lambda qn: qn[1], reverse=True
+            )[:10]
+            return {
+                'actif_depuis_s': round(time.time() - self.demarrage, 1),
+                'en_attente': len(self.tailles_vues),
+                'fichiers': self.agregats['fichiers'],
+                'erreurs': self.agregats['erreurs'],
+                'lignes': self.agregats['lignes'],
+                'valides': valides,
+                'prix_m2_moyen': round(self.agregats['somme_prix_m2'] / valides) if valides else None,
+                'top_quartiers': top_quartiers,
+                'latence_ms': {
+                    'p50': latences[len(latences) // 2] if latences else None,
+                    'p95': latences[int(len(latences) * 0.95)] if latences else None,
+                    'max': latences[-1] if latences else None
+                }
+            }
+
+    def fichiers(self):
+        """Détail par fichier (commande fichiers)"""
+        with self.verrou:
+            return list(self.historique)
+
+
+class _GestionnaireControle(socketserver.StreamRequestHandler):
+    """Une commande texte par connexion, réponse JSON sur une ligne"""
+
+    def handle(self):
+        commande = self.rfile.readline().decode('utf-8').strip()
+        daemon = self.server.daemon_nettoyage
+        if commande == 'status':
+            reponse = daemon.statut()
+        elif commande == 'fichiers':
+            reponse = daemon.fichiers()
+        elif commande == 'stop':
+            daemon.arret.set()
+            reponse = {'arret': True}
+        else:
+            reponse = {'erreur': f'commande inconnue: {commande}'}
+        self.wfile.write((json.dumps(reponse, ensure_ascii=False) + '\n').encode('utf-8'))
+
+
+def demarrer_controle(daemon, port=PORT_CONTROLE):
+    """Serveur de contrôle local dans un thread (127.0.0.1 uniquement)"""
+    serveur = socketserver.ThreadingTCPServer(('127.0.0.1', port), _GestionnaireControle)
+    serveur.daemon_threads = True
+    serveur.daemon_nettoyage = daemon
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+
+def envoyer_commande(commande, port=PORT_CONTROLE):
+    """Client de la socket de contrôle"""
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as connexion:
+        connexion.sendall((commande + '\n').encode('utf-8'))
+        return json.loads(connexion.makefile('rb').readline().decode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daemon de nettoyage ID Immobilier")
+    parser.add_argument('--entree', default='depot', help="Dossier de dépôt des dumps")
+    parser.add_argument('--sortie', default='exports', help="Dossier des exports nettoyés")
+    parser.add_argument('--intervalle', type=float, default=0.1, help="Période de scrutation (s)")
+    parser.add_argument('--port', type=int, default=PORT_CONTROLE)
+    parser.add_argument('--commande', choices=['status', 'fichiers', 'stop'],
+                        help="Interroger un daemon déjà lancé")
+    args = parser.parse_args()
+
+    if args.commande:
+        print(json.dumps(envoyer_commande(args.commande, args.port), indent=2, ensure_ascii=False))
+        return
+
+    os.makedirs(args.entree, exist_ok=True)
+    daemon = DaemonNettoyage(args.entree, args.sortie, intervalle=args.intervalle)
+    serveur = demarrer_controle(daemon, args.port)
+    print(f"🚀 Daemon prêt - contrôle sur 127.0.0.1:{args.port}")
+    try:
+        daemon.executer()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.shutdown()
+        print(f"✅ Arrêt: {daemon.statut()['fichiers']} fichier(s) traité(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+DÉPÔT DES EXPORTS - PROJET ID IMMOBILIER
+Les exports ne sont écrits que si les données ont réellement changé.
+
+- Adresse d'un export : empreinte SHA-256 de la projection nettoyée (colonnes de
+  l'export) et du format. Une empreinte par ligne est calculée par pandas
+  (hash_pandas_object, vectorisé), puis ces empreintes triées sont hachées : deux
+  dumps aux mêmes annonces dans un autre ordre ont la même adresse. Les types sont
+  ramenés à une forme canonique avant hachage : un export relu puis redéposé ne
+  change pas d'adresse. Les colonnes d'horodatage du nettoyage (date_collecte, date
+  du jour) sont hors de l'adresse : un dump inchangé renettoyé le lendemain garde
+  la sienne ; leurs valeurs sont notées dans le manifeste.
+- Un export déjà présent sous cette adresse n'est pas réécrit. Sinon, il est écrit
+  dans objets/<empreinte>.<extension>, lignes dans l'ordre canonique (par id_bien,
+  puis par empreinte de ligne) : même contenu, même fichier.
+- latest.<extension> pointe sur la dernière version de chaque format (lien dur,
+  copie si le système de fichiers n'en permet pas).
+- manifeste.json : dernière version par format et, pour chaque objet, format,
+  lignes, taille, date de création, date et nombre des exports, première et
+  dernière valeur des colonnes d'horodatage.
+  Un chargeur en aval compare manifeste['latest'][format] à la dernière
+  empreinte importée et ne recharge que si elle a changé.
+
+Les écritures (objet, pointeur, manifeste) passent par un fichier temporaire
+renommé : une interruption ne laisse jamais d'export partiel sous une adresse.
+
+    python id_immobilier_cli.py clean dump.csv --format csv excel --depot exports
+    python depot_exports.py exports
+    python depot_exports.py --benchmark 200000
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+FORMAT_DEPOT = 1
+MANIFESTE = 'manifeste.json'
+DOSSIER_OBJETS = 'objets'
+EXTENSIONS = {'csv': 'csv', 'excel': 'xlsx', 'json': 'json', 'sql': 'sql'}
+
+# Colonnes estampillées à chaque nettoyage (pas par la collecte) : hors adresse
+COLONNES_HORODATAGE = ['date_collecte']
+
+
+def _canonique(df_export):
+    """
+    Projection aux types canoniques, pour qu'un export relu (id_bien lu comme entier,
+    texte vide lu comme manquant...) garde son adresse : nombres en float64,
+    id_bien et autres colonnes en texte, texte vide et colonnes vides en NaN
+    """
+    import pandas as pd
+
+    colonnes = {}
+    for nom, colonne in df_export.items():
+        if nom != 'id_bien' and pd.api.types.is_numeric_dtype(colonne):
+            colonne = colonne.astype('float64')
+        else:
+            colonne = colonne.astype('str')
+            vide = colonne == ''
+            if vide.any():
+                colonne = colonne.mask(vide)
+        if colonne.isna().all():
+            colonne = pd.Series(np.nan, index=colonne.index)
+        colonnes[nom] = colonne
+    return pd.DataFrame(colonnes, index=df_export.index)
+
+
+def empreinte_projection(df_export, format):
+    """
+    (empreinte SHA-256, empreintes des lignes) de la projection df_export pour
+    `format`. Les empreintes de lignes sont hachées triées : le résultat ne dépend
+    que du contenu, pas de l'ordre des lignes, et aucun tri des id n'est nécessaire
+    pour constater qu'un export est inchangé. Les COLONNES_HORODATAGE ne sont pas hachées.
+    """
+    import pandas as pd
+
+    contenu = df_export.drop(columns=[c for c in COLONNES_HORODATAGE if c in df_export.columns])
+    lignes = pd.util.hash_pandas_object(_canonique(contenu), index=False).to_numpy()
+    h = hashlib.sha256()
+    h.update(json.dumps({'depot': FORMAT_DEPOT, 'format': format,
+                         'colonnes': [str(c) for c in df_export.columns]}).encode('utf-8'))
+    h.update(np.sort(lignes).astype('<u8').tobytes())
+    return h.hexdigest(), lignes
+
+
+def ordre_canonique(df_export, lignes):
+    """Ordre d'écriture : lignes triées par id_bien, puis par empreinte de ligne"""
+    import pandas as pd
+
+    codes_id = pd.factorize(df_export['id_bien'].astype(str), sort=True)[0]
+    return np.lexsort((lignes, codes_id))
+
+
+def _remplacer_par_lien(source, destination):
+    """destination devient un lien dur vers source (copie à défaut), remplacement atomique"""
+    temporaire = destination + '.tmp'
+    if os.path.lexists(temporaire):
+        os.remove(temporaire)
+    try:
+        os.link(source, temporaire)
+    except OSError:
+        shutil.copyfile(source, temporaire)
+    os.replace(temporaire, destination)
+
+
+class DepotExports:
+    """Exports adressés par leur contenu, dans `dossier`"""
+
+    def __init__(self, dossier):
+        self.dossier = dossier
+        self.chemin_manifeste = os.path.join(dossier, MANIFESTE)
+        os.makedirs(os.path.join(dossier, DOSSIER_OBJETS), exist_ok=True)
+        self.manifeste = self._lire_manifeste()
+
+    def _lire_manifeste(self):
+        if not os.path.exists(self.chemin_manifeste):
+            return {'format': FORMAT_DEPOT, 'latest': {}, 'objets': {}}
+        with open(self.chemin_manifeste, encoding='utf-8') as f:
+            manifeste = json.load(f)
+        if manifeste.get('format') != FORMAT_DEPOT:
+            raise ValueError(f"{self.chemin_manifeste}: format de dépôt {manifeste.get('format')} "
+                             f"non pris en charge (attendu {FORMAT_DEPOT})")
+        return manifeste
+
+    def _ecrire_manifeste(self):
+        temporaire = self.chemin_manifeste + '.tmp'
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(self.manifeste, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temporaire, self.chemin_manifeste)
+
+    def chemin_objet(self, empreinte, format):
+        return os.path.join(self.dossier, DOSSIER_OBJETS, f'{empreinte}.{EXTENSIONS[format]}')
+
+    def chemin_latest(self, format):
+        return os.path.join(self.dossier, f'latest.{EXTENSIONS[format]}')
+
+    def dernier(self, format):
+        """(empreinte, chemin) de la dernière version de `format`, ou (None, None)"""
+        empreinte = self.manifeste['latest'].get(format)
+        if empreinte is None:
+            return None, None
+        return empreinte, self.chemin_objet(empreinte, format)
+
+    def deposer(self, df_export, format, ecrire):
+        """
+        Déposer la projection df_export au format `format`.
+        `ecrire(df, chemin)` écrit le fichier ; appelé seulement si le contenu est
+        nouveau, avec les lignes dans l'ordre canonique. Un objet déjà présent garde
+        les horodatages de sa première écriture ; ceux du dépôt courant vont dans le
+        manifeste (objet['horodatage'][colonne] = {'premier', 'dernier'}).
+        Retourne (chemin de l'objet, True si une nouvelle version a été écrite)
+        """
+        empreinte, lignes = empreinte_projection(df_export, format)
+        chemin = self.chemin_objet(empreinte, format)
+        maintenant = datetime.now().isoformat(timespec='seconds')
+
+        objet = self.manifeste['objets'].get(empreinte)
+        nouveau = objet is None or not os.path.exists(chemin)
+        if nouveau:
+            temporaire = chemin + '.tmp'
+            try:
+                ordre = ordre_canonique(df_export, lignes)
+                ecrire(df_export.iloc[ordre].reset_index(drop=True), temporaire)
+                os.replace(temporaire, chemin)
+            finally:
+                if os.path.exists(temporaire):
+                    os.remove(temporaire)
+            objet = {'format': format, 'lignes': len(df_export), 'octets': os.path.getsize(chemin),
+                     'cree_le': maintenant, 'exports': 0}
+            self.manifeste['objets'][empreinte] = objet
+        objet['exports'] += 1
+        objet['dernier_export'] = maintenant
+        horodatage = objet.setdefault('horodatage', {})
+        for colonne in COLONNES_HORODATAGE:
+            if colonne in df_export.columns and df_export[colonne].notna().any():
+                valeur = str(df_export[colonne].dropna().astype(str).max())
+                horodatage.setdefault(colonne, {'premier': valeur})['dernier'] = valeur
+
+        latest = self.chemin_latest(format)
+        if self.manifeste['latest'].get(format) != empreinte or not os.path.exists(latest):
+            _remplacer_par_lien(chemin, latest)
+            self.manifeste['latest'][format] = empreinte
+        self._ecrire_manifeste()
+        return chemin, nouveau
+
+    def afficher(self):
+        """Résumé du dépôt : dernière version par format, objets et exports évités"""
+        print("="*70)
+        print(f"🗄️ DÉPÔT DES EXPORTS : {self.dossier}")
+        print("="*70)
+        objets = self.manifeste['objets']
+        for format, empreinte in sorted(self.manifeste['latest'].items()):
+            objet = objets.get(empreinte, {})
+            print(f"   {format:6s} {empreinte[:12]}  {objet.get('lignes', 0):>9,} lignes  "
+                  f"{objet.get('octets', 0)/1e6:8.1f} Mo  depuis {objet.get('cree_le', '?')}")
+            for colonne, valeurs in objet.get('horodatage', {}).items():
+                print(f"          {colonne}: {valeurs['premier']} -> {valeurs['dernier']}")
+        exports = sum(o['exports'] for o in objets.values())
+        print(f"   {len(objets)} version(s) stockée(s), {exports} export(s), "
+              f"{exports - len(objets)} réécriture(s) évitée(s)")
+        print("="*70)
+
+
+def generer_export(nb, graine=0):
+    """Projection BDD synthétique (COLONNES_BDD) de `nb` annonces"""
+    import pandas as pd
+    from id_immobilier_FINAL import COLONNES_BDD
+    from resume_statistique import generer_annonces
+
+    rng = np.random.default_rng(graine)
+    df = generer_annonces(nb, graine)
+    ids = rng.choice(10**15, nb, replace=False) + 10**15
+    df['id_bien'] = ids.astype(str)
+    df['titre_complet'] = df['type_bien'] + ' à ' + df['quartier'] + ' ' + df['surface_m2'].astype(str) + ' m²'
+    df['ville'] = 'Lomé'
+    df['latitude'] = np.round(6.13 + rng.normal(0, 0.02, nb), 6)
+    df['longitude'] = np.round(1.22 + rng.normal(0, 0.02, nb), 6)
+    df['source'] = 'Facebook Marketplace'
+    df['date_publication'] = pd.NaT
+    df['date_collecte'] = '2026-02-12'
+    df['url_annonce'] = 'https://www.facebook.com/marketplace/item/' + df['id_bien']
+    df['url_photo'] = None
+    df['statut'] = 'Disponible'
+    df['quartier_confiance'] = 'haute'
+    return df[COLONNES_BDD]
+
+
+def benchmark(nb=200000, dossier=None):
+    """Export horodaté classique contre dépôt (premier export puis réexport inchangé)"""
+    import tempfile
+
+    df = generer_export(nb)
+    melange = df.sample(frac=1, random_state=1)
+
+    def ecrire_csv(df_export, chemin):
+        df_export.to_csv(chemin, index=False, encoding='utf-8-sig')
+
+    print("="*70)
+    print(f"⏱️ BENCHMARK DÉPÔT DES EXPORTS ({nb:,} annonces, CSV)")
+    print("="*70)
+    with tempfile.TemporaryDirectory(dir=dossier) as tmp:
+        debut = time.perf_counter()
+        ecrire_csv(df, os.path.join(tmp, 'id_immobilier_optimise.csv'))
+        t_classique = time.perf_counter() - debut
+
+        depot = DepotExports(os.path.join(tmp, 'depot'))
+        debut = time.perf_counter()
+        chemin, nouveau_1 = depot.deposer(df, 'csv', ecrire_csv)
+        t_premier = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        _, nouveau_2 = depot.deposer(melange, 'csv', ecrire_csv)
+        t_inchange = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        empreinte_projection(df, 'csv')
+        t_empreinte = time.perf_counter() - debut
+
+        lendemain = melange.assign(date_collecte='2026-02-13')
+        _, nouveau_renettoye = depot.deposer(lendemain, 'csv', ecrire_csv)
+
+        modifie = df.copy()
+        modifie.loc[modifie.index[nb // 2], 'prix_fcfa'] += 1
+        _, nouveau_3 = depot.deposer(modifie, 'csv', ecrire_csv)
+
+        print(f"   Export classique (toujours écrit) : {t_classique:7.3f} s")
+        print(f"   Dépôt, premier export            : {t_premier:7.3f} s  (nouveau: {nouveau_1})")
+        print(f"   Dépôt, même données mélangées    : {t_inchange:7.3f} s  (nouveau: {nouveau_2}, "
+              f"{t_classique / t_inchange:.1f}x plus rapide)")
+        print(f"      dont empreinte seule          : {t_empreinte:7.3f} s")
+        print(f"   Dépôt, renettoyé le lendemain    : nouveau: {nouveau_renettoye}")
+        print(f"   Dépôt, un prix modifié           : nouveau: {nouveau_3}")
+        print(f"   Objets stockés: {len(depot.manifeste['objets'])} "
+              f"({os.path.getsize(chemin)/1e6:.1f} Mo chacun)")
+    if not (nouveau_1 and not nouveau_2 and not nouveau_renettoye and nouveau_3):
+        print("⚠️ Adresses incohérentes : changement non détecté ou données identiques réécrites")
+    print("="*70)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dépôt des exports adressés par contenu")
+    parser.add_argument('dossier', nargs='?', help="Dossier du dépôt à afficher")
+    parser.add_argument('--benchmark', type=int, nargs='?', const=200000, metavar='N',
+                        help="Mesurer export classique contre dépôt sur N annonces synthétiques")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+    elif args.dossier:
+        DepotExports(args.dossier).afficher()
+    else:
+        parser.error("indiquer un dossier de dépôt ou --benchmark")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+EXTRACTION BORNÉE - PROJET ID IMMOBILIER
+Protège l'extraction prix/surface contre les titres pathologiques (spam Marketplace) :
+- Fenêtre de texte : titre tronqué et longues suites de chiffres neutralisées,
+  ce qui supprime le retour arrière quadratique de `\\d+` sur les patterns de prix
+- Moteur RE2 (temps linéaire garanti) utilisé s'il est installé (pip install google-re2)
+- Budget de temps par ligne : les dépassements sont comptés et rapportés
+
+Benchmark / fuzz :
+    python extraction_bornee.py
+"""
+
+import random
+import re
+import time
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+
+# Au-delà, le texte n'apporte plus d'information exploitable (titre + sous-titre)
+FENETRE_CARACTERES = 1000
+
+# Un prix en FCFA ne dépasse pas 15 chiffres : les suites plus longues sont du bruit
+MAX_CHIFFRES_CONSECUTIFS = 15
+
+_SUITE_CHIFFRES = re.compile(r'\d{%d,}' % (MAX_CHIFFRES_CONSECUTIFS + 1))
+
+
+# Espaces insécables des montants formatés ("3 500 000") : \s de RE2 est ASCII seulement
+_ESPACES_INSECABLES = str.maketrans({'\xa0': ' ', '\u202f': ' '})
+
+
+def borner_texte(texte, fenetre=FENETRE_CARACTERES):
+    """Tronquer le texte et remplacer les suites de chiffres trop longues par un espace"""
+    if len(texte) > fenetre:
+        texte = texte[:fenetre]
+    return _SUITE_CHIFFRES.sub(' ', texte.translate(_ESPACES_INSECABLES))
+
+
+def compiler_motifs(motifs, moteur='re'):
+    """
+    Compiler un dict {nom: motif} avec le moteur demandé
+    're2' retombe sur 're' (avec avertissement) si google-re2 n'est pas installé
+    """
+    if moteur == 're2' and re2 is None:
+        print("⚠️  google-re2 non installé : moteur 're' utilisé (avec fenêtre de texte)")
+        moteur = 're'
+    module = re2 if moteur == 're2' else re
+    return {nom: module.compile(motif) for nom, motif in motifs.items()}
+
+
+class BudgetExtraction:
+    """Budget de temps par ligne et par famille d'extraction (surface, prix)"""
+
+    def __init__(self, budget_ms):
+        self.limite_ns = int(budget_ms * 1e6)
+        self.budget_ms = budget_ms
+        self.lignes = {}
+        self.depassements = {}
+        self.pire_ns = {}
+
+    def demarrer(self, famille):
+        """Début d'extraction d'une ligne ; retourne l'horodatage de départ"""
+        self.lignes[famille] = self.lignes.get(famille, 0) + 1
+        return time.perf_counter_ns()
+
+    def depasse(self, famille, debut_ns):
+        """True (et comptage) si la ligne a consommé tout son budget"""
+        ecoule = time.perf_counter_ns() - debut_ns
+        if ecoule > self.pire_ns.get(famille, 0):
+            self.pire_ns[famille] = ecoule
+        if ecoule > self.limite_ns:
+            self.depassements[famille] = self.depassements.get(famille, 0) + 1
+            return True
+        return False
+
+    def etat(self):
+        """Compteurs transmissibles entre processus"""
+        return {'lignes': dict(self.lignes), 'depassements': dict(self.depassements),
+                'pire_ns': dict(self.pire_ns)}
+
+    def fusionner(self, etat):
+        """Ajouter les compteurs d'un autre budget (worker), voir etat()"""
+        for famille, nb in etat['lignes'].items():
+            self.lignes[famille] = self.lignes.get(famille, 0) + nb
+        for famille, nb in etat['depassements'].items():
+            self.depassements[famille] = self.depassements.get(famille, 0) + nb
+        for famille, ns in etat['pire_ns'].items():
+            self.pire_ns[famille] = max(self.pire_ns.get(famille, 0), ns)
+
+    def afficher(self):
+        print(f"\n⏱️  Budget d'extraction: {self.budget_ms} ms par ligne")
+        for famille, nb in self.lignes.items():
+            depassements = self.depassements.get(famille, 0)
+            print(f"   {famille:<8} {depassements}/{nb} dépassement(s), "
+                  f"pire ligne {self.pire_ns.get(famille, 0) / 1e6:.2f} ms")
+
+
+# ============================================
+# FUZZ / BENCHMARK PIRE CAS
+# ============================================
+
+def _titres_pathologiques(taille, aleatoire):
+    """Familles de titres adverses de `taille` caractères"""
+    alphabet = '0123456789 ,./mlotfca²'
+    return {
+        'chiffres': '1' * taille,
+        'chiffres_espaces': '1 ' * (taille // 2),
+        'millions_sans_m': ('9' * 20 + '.') * (taille // 21),
+        'fractions': '1/' * (taille // 2),
+        'aleatoire': ''.join(aleatoire.choice(alphabet) for _ in range(taille)),
+    }
+
+
+def benchmark_pire_cas(tailles=(1000, 4000, 16000, 64000), graine=0, limite_s=5.0):
+    """
+    Débit (caractères/s) de l'extraction prix + surface sur des titres adverses,
+    en mode standard puis borné. En mode borné, le temps par caractère reste constant.
+    Une mesure standard qui dépasse `limite_s` arrête les tailles suivantes (quadratique).
+    """
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+
+    aleatoire = random.Random(graine)
+    modes = {
+        'standard': IDImmobilierCleanerV2(),
+        'borne': IDImmobilierCleanerV2(extraction_bornee=True),
+    }
+    abandon = set()
+
+    print("=" * 70)
+    print("⏱️  EXTRACTION SUR TITRES PATHOLOGIQUES (Mcar/s = millions de caractères/s)")
+    print("=" * 70)
+    print(f"{'famille':<18}{'taille':>8}{'standard':>14}{'borné':>14}")
+
+    for taille in tailles:
+        for famille, titre in _titres_pathologiques(taille, aleatoire).items():
+            debits = {}
+            for mode, cleaner in modes.items():
+                if (mode, famille) in abandon:
+                    debits[mode] = None
+                    continue
+                debut = time.perf_counter()
+                cleaner.nettoyer_prix_avec_regle({'titre_complet': titre})
+                cleaner.extraire_surface_avec_regle(titre)
+                duree = time.perf_counter() - debut
+                debits[mode] = len(titre) / duree / 1e6
+                if duree > limite_s:
+                    abandon.add((mode, famille))
+            cellules = [f"{d:10.2f} M/s" if d is not None else f"{'abandon':>14}"
+                        for d in (debits['standard'], debits['borne'])]
+            print(f"{famille:<18}{taille:>8}{cellules[0]}{cellules[1]}")
+
+    print("=" * 70)
+
+
+def fuzz_equivalence(nb=2000, graine=0):
+    """
+    Sur des titres réalistes (courts, sans suite de chiffres > 15),
+    le mode borné doit donner exactement les mêmes résultats
+    """
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+
+    aleatoire = random.Random(graine)
+    mots = ['terrain', 'lot', '1/4', '1/2', '2 lots', 'et', '500m2', '350 m²', 'à', 'vendre',
+            '3,500,000', '3 500 000', '12 millions', '8m fcfa', 'cfa', 'parcelle', '600',
+            'villa', 'f3', 'adidogomé', 'bè', 'km', '25m']
+    standard = IDImmobilierCleanerV2()
+    borne = IDImmobilierCleanerV2(extraction_bornee=True)
+
+    differences = 0
+    for _ in range(nb):
+        titre = ' '.join(aleatoire.choice(mots) for _ in range(aleatoire.randint(1, 12)))
+        ligne = {'titre_complet': titre}
+        if (standard.nettoyer_prix_avec_regle(ligne) != borne.nettoyer_prix_avec_regle(ligne)
+                or standard.extraire_surface_avec_regle(titre) != borne.extraire_surface_avec_regle(titre)):
+            differences += 1
+            print(f"   ⚠️ Différence: {titre!r}")
+
+    print(f"✅ Fuzz: {nb - differences}/{nb} titres identiques en mode borné")
+    return differences
+
+
+if __name__ == "__main__":
+    fuzz_equivalence()
+    benchmark_pire_cas()
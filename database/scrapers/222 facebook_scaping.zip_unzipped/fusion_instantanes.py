@@ -0,0 +1,265 @@
+"""
+FUSION DES INSTANTANÉS - PROJET ID IMMOBILIER
+Fusionne les exports nettoyés successifs (un par collecte) en un historique
+dédoublonné, sans jamais charger l'historique en mémoire (tri externe) :
+- Phase 1 : chaque instantané est lu par paquets de LIGNES_PAR_RUN lignes, triés par
+  (id_bien, date_collecte) et écrits dans des fichiers de débordement (runs)
+- Phase 2 : fusion k-voies des runs avec un tas (heapq.merge), en plusieurs passes
+  si les runs dépassent MAX_FICHIERS_OUVERTS
+- Sorties, écrites au fil de la fusion :
+    etat_courant.csv     dernier état connu de chaque bien (+ 1re collecte, nb d'instantanés)
+    historique_prix.csv  une ligne par changement de prix d'un bien (id_bien, date, prix)
+Mémoire bornée par LIGNES_PAR_RUN ; lectures et écritures uniquement séquentielles.
+
+    python fusion_instantanes.py exports/id_immobilier_optimise_*.csv --sortie historique/
+    python fusion_instantanes.py --benchmark 20000000
+"""
+
+import argparse
+import csv
+import heapq
+import operator
+import os
+import shutil
+import tempfile
+import time
+
+from id_immobilier_FINAL import COLONNES_BDD
+
+
+# Lignes triées en mémoire par run (≈ 1 Ko par ligne en objets Python)
+LIGNES_PAR_RUN = 500_000
+
+# Runs fusionnés en une passe (descripteurs de fichiers ouverts simultanément)
+MAX_FICHIERS_OUVERTS = 64
+
+# Positions dans une ligne de run (colonnes BDD puis rang de l'instantané)
+I_ID = COLONNES_BDD.index('id_bien')
+I_DATE = COLONNES_BDD.index('date_collecte')
+I_PRIX = COLONNES_BDD.index('prix_fcfa')
+I_PRIX_M2 = COLONNES_BDD.index('prix_m2')
+# Dernière colonne d'un run : rang de l'instantané sur 6 chiffres (départage deux
+# collectes du même jour ; comparable en texte)
+I_RANG = len(COLONNES_BDD)
+
+cle_tri = operator.itemgetter(I_ID, I_DATE, I_RANG)
+
+
+def _ecrire_run(lignes, dossier, runs):
+    lignes.sort(key=cle_tri)
+    chemin = os.path.join(dossier, f'run_{len(runs):06d}.csv')
+    with open(chemin, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(lignes)
+    runs.append(chemin)
+
+
+def creer_runs(instantanes, dossier, lignes_par_run=LIGNES_PAR_RUN):
+    """Phase 1 : runs triés ; retourne (chemins des runs, nb de lignes lues)"""
+    runs, lignes, nb_lignes = [], [], 0
+    for rang, chemin in enumerate(instantanes):
+        with open(chemin, encoding='utf-8-sig', newline='') as f:
+            lecteur = csv.reader(f)
+            entete = next(lecteur, [])
+            positions = [entete.index(c) if c in entete else None for c in COLONNES_BDD]
+            rang_texte = f'{rang:06d}'
+            # Export au format courant : colonnes déjà dans l'ordre, pas de réordonnancement
+            direct = entete == COLONNES_BDD
+            for ligne in lecteur:
+                if direct:
+                    ligne.append(rang_texte)
+                else:
+                    ligne = [ligne[p] if p is not None else '' for p in positions] + [rang_texte]
+                lignes.append(ligne)
+                if len(lignes) >= lignes_par_run:
+                    nb_lignes += len(lignes)
+                    _ecrire_run(lignes, dossier, runs)
+                    lignes = []
+    if lignes:
+        nb_lignes += len(lignes)
+        _ecrire_run(lignes, dossier, runs)
+    return runs, nb_lignes
+
+
+def _prix(texte):
+    """
+    Prix d'une ligne de run en nombre : '3500000.0' et '3500000' (exports relus par
+    pandas ou non) sont le même prix ; vide ou NaN -> None
+    """
+    try:
+        prix = float(texte)
+    except ValueError:
+        return None
+    return None if prix != prix else prix
+
+
+def _lire_run(chemin):
+    with open(chemin, encoding='utf-8', newline='') as f:
+        yield from csv.reader(f)
+
+
+def reduire_runs(runs, dossier, max_fichiers=MAX_FICHIERS_OUVERTS):
+    """Passes de fusion intermédiaires jusqu'à au plus `max_fichiers` runs"""
+    passe = 0
+    while len(runs) > max_fichiers:
+        passe += 1
+        suivants = []
+        for i in range(0, len(runs), max_fichiers):
+            groupe = runs[i:i + max_fichiers]
+            chemin = os.path.join(dossier, f'passe{passe}_{len(suivants):06d}.csv')
+            with open(chemin, 'w', encoding='utf-8', newline='') as f:
+                csv.writer(f).writerows(heapq.merge(*map(_lire_run, groupe), key=cle_tri))
+            for run in groupe:
+                os.remove(run)
+            suivants.append(chemin)
+        runs = suivants
+    return runs, passe
+
+
+def fusionner_runs(runs, chemin_etat, chemin_historique):
+    """
+    Phase 2 : fusion finale. Les lignes d'un même bien arrivent consécutives et dans
+    l'ordre chronologique : le dernier état et les changements de prix se calculent
+    en un passage. Retourne (nb de biens, nb de changements de prix)
+    """
+    nb_biens = nb_changements = 0
+    with open(chemin_etat, 'w', encoding='utf-8-sig', newline='') as f_etat, \
+            open(chemin_historique, 'w', encoding='utf-8-sig', newline='') as f_hist:
+        etat = csv.writer(f_etat)
+        historique = csv.writer(f_hist)
+        etat.writerow(COLONNES_BDD + ['premiere_collecte', 'nb_instantanes'])
+        historique.writerow(['id_bien', 'date_collecte', 'prix_fcfa', 'prix_m2'])
+
+        courant, premiere, nb_vus, dernier_prix = None, None, 0, None
+        for ligne in heapq.merge(*map(_lire_run, runs), key=cle_tri):
+            if courant is None or ligne[I_ID] != courant[I_ID]:
+                if courant is not None:
+                    etat.writerow(courant[:I_RANG] + [premiere, nb_vus])
+                    nb_biens += 1
+                premiere, nb_vus, dernier_prix = ligne[I_DATE], 0, None
+            nb_vus += 1
+            prix = _prix(ligne[I_PRIX])
+            if nb_vus == 1 or prix != dernier_prix:
+                historique.writerow([ligne[I_ID], ligne[I_DATE], ligne[I_PRIX], ligne[I_PRIX_M2]])
+                nb_changements += 1
+                dernier_prix = prix
+            courant = ligne
+        if courant is not None:
+            etat.writerow(courant[:I_RANG] + [premiere, nb_vus])
+            nb_biens += 1
+    return nb_biens, nb_changements
+
+
+def fusionner_instantanes(instantanes, dossier_sortie, lignes_par_run=LIGNES_PAR_RUN,
+                          dossier_temporaire=None):
+    """Fusion complète ; retourne les mesures (lignes, biens, changements, débits)"""
+    os.makedirs(dossier_sortie, exist_ok=True)
+    temporaire = tempfile.mkdtemp(prefix='id_immobilier_runs_', dir=dossier_temporaire)
+    chemin_etat = os.path.join(dossier_sortie, 'etat_courant.csv')
+    chemin_historique = os.path.join(dossier_sortie, 'historique_prix.csv')
+
+    print("=" * 70)
+    print(f"🧮 FUSION DE {len(instantanes)} INSTANTANÉ(S) - tri externe")
+    print("=" * 70)
+    try:
+        debut = time.perf_counter()
+        runs, nb_lignes = creer_runs(instantanes, temporaire, lignes_par_run)
+        duree_runs = time.perf_counter() - debut
+        print(f"   ✓ Phase 1: {nb_lignes:,} lignes -> {len(runs)} run(s) en {duree_runs:.1f} s "
+              f"({nb_lignes / duree_runs if duree_runs else 0:,.0f} lignes/s)")
+
+        debut_fusion = time.perf_counter()
+        runs, passes = reduire_runs(runs, temporaire)
+        nb_biens, nb_changements = fusionner_runs(runs, chemin_etat, chemin_historique)
+        duree_fusion = time.perf_counter() - debut_fusion
+        print(f"   ✓ Phase 2: fusion {passes + 1} passe(s) en {duree_fusion:.1f} s "
+              f"({nb_lignes / duree_fusion if duree_fusion else 0:,.0f} lignes/s)")
+    finally:
+        shutil.rmtree(temporaire, ignore_errors=True)
+
+    duree = time.perf_counter() - debut
+    print(f"\n   Biens distincts:     {nb_biens:,}  -> {chemin_etat}")
+    print(f"   Changements de prix: {nb_changements:,}  -> {chemin_historique}")
+    print(f"⏱️  Total: {duree:.1f} s ({nb_lignes / duree if duree else 0:,.0f} lignes/s)")
+    print("=" * 70)
+    return {
+        'lignes': nb_lignes,
+        'biens': nb_biens,
+        'changements_prix': nb_changements,
+        'runs': len(runs),
+        'duree_s': round(duree, 2),
+        'lignes_par_s': round(nb_lignes / duree, 1) if duree else None,
+    }
+
+
+# ============================================
+# BENCHMARK SUR INSTANTANÉS SYNTHÉTIQUES
+# ============================================
+
+def generer_instantanes(dossier, nb_lignes, nb_instantanes=10, graine=0):
+    """
+    Instantanés hebdomadaires synthétiques au format d'export : chaque bien est vu
+    dans une suite d'instantanés consécutifs, son prix change parfois
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(graine)
+    par_instantane = nb_lignes // nb_instantanes
+    nb_biens = par_instantane * 2
+    # La moitié des biens est déjà en ligne à la 1re collecte, les autres arrivent ensuite
+    debuts = np.where(rng.random(nb_biens) < 0.5, 0, rng.integers(0, nb_instantanes, nb_biens))
+    prix = rng.integers(5, 200, nb_biens) * 1e6
+    chemins = []
+    for k in range(nb_instantanes):
+        date = (pd.Timestamp('2026-01-05') + pd.Timedelta(weeks=k)).strftime('%Y-%m-%d')
+        # Biens arrivés avant ou pendant la semaine k (tirage dans l'ordre du scraper)
+        arrives = np.flatnonzero(debuts <= k)
+        presents = rng.choice(arrives, min(par_instantane, len(arrives)), replace=False)
+        prix[presents] *= np.where(rng.random(len(presents)) < 0.05, 0.95, 1.0)
+        surface = 300.0 + presents % 700
+        df = pd.DataFrame({c: '' for c in COLONNES_BDD}, index=range(len(presents)))
+        df['id_bien'] = presents.astype(str)
+        df['titre_complet'] = 'Terrain 1 lot'
+        df['type_bien'], df['type_offre'], df['ville'] = 'Terrain', 'Vente', 'Lomé'
+        df['quartier'] = 'Agoè'
+        df['surface_m2'] = surface
+        df['prix_fcfa'] = prix[presents].round()
+        df['prix_m2'] = (prix[presents] / surface).round(2)
+        df['source'], df['statut'] = 'Facebook Marketplace', 'Active'
+        df['date_collecte'] = date
+        chemin = os.path.join(dossier, f'id_immobilier_optimise_{date}.csv')
+        df.to_csv(chemin, index=False, encoding='utf-8-sig')
+        chemins.append(chemin)
+    return chemins
+
+
+def benchmark(nb_lignes=2_000_000, nb_instantanes=10, lignes_par_run=LIGNES_PAR_RUN):
+    dossier = tempfile.mkdtemp(prefix='id_immobilier_instantanes_')
+    try:
+        debut = time.perf_counter()
+        instantanes = generer_instantanes(dossier, nb_lignes, nb_instantanes)
+        print(f"📂 {nb_instantanes} instantanés synthétiques générés en {time.perf_counter() - debut:.1f} s")
+        return fusionner_instantanes(instantanes, os.path.join(dossier, 'sortie'), lignes_par_run)
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fusion des instantanés nettoyés (tri externe)")
+    parser.add_argument('instantanes', nargs='*', help="Exports nettoyés, dans l'ordre de collecte")
+    parser.add_argument('--sortie', default='historique')
+    parser.add_argument('--lignes-par-run', type=int, default=LIGNES_PAR_RUN)
+    parser.add_argument('--temporaire', default=None, help="Dossier des runs (défaut : dossier système)")
+    parser.add_argument('--benchmark', type=int, metavar='LIGNES', default=None)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, lignes_par_run=args.lignes_par_run)
+    elif args.instantanes:
+        fusionner_instantanes(args.instantanes, args.sortie, args.lignes_par_run, args.temporaire)
+    else:
+        parser.error("aucun instantané (ou --benchmark LIGNES)")
+
+
+if __name__ == "__main__":
+    main()
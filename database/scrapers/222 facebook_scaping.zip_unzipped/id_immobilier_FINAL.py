@@ -7,24 +7,198 @@ Améliorations :
 - Règles d'inférence intelligentes
 """
 
-import pandas as pd
-import numpy as np
-import re
+import contextlib
+import io
+import os
+import sys
+import time
 from datetime import datetime
 
+from classification_types import COLONNES_CLASSEMENT, ClassifieurTypes
+from extraction_bornee import BudgetExtraction, borner_texte, compiler_motifs
+from jeu_regles import charger_regles
+from profilage_regles import ProfileurRegles
+from recherche_quartiers import ALIAS_QUARTIERS, IndexQuartiers
+
+# Modules partagés avec la V1 (resume_statistique.py) : dossier de clean_data_scrapers.py
+DOSSIER_COMMUN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if DOSSIER_COMMUN not in sys.path:
+    sys.path.append(DOSSIER_COMMUN)
+
+
+def est_manquant(valeur):
+    """Équivalent scalaire de pd.isna (None, NaN, NaT, pd.NA) sans importer pandas"""
+    if valeur is None:
+        return True
+    try:
+        return bool(valeur != valeur)
+    except TypeError:
+        # pd.NA : sa comparaison est elle-même manquante
+        return True
+
+
+# Patterns d'extraction (compilés une fois, avec le moteur choisi)
+MOTIFS_EXTRACTION = {
+    'fraction_lot': r'(\d+)/(\d+)\s*(?:de\s*)?lots?',
+    'lots_et_fraction': r'(\d+)\s*lots?\s*et\s*(\d+)/(\d+)',
+    'lots': r'(\d+)\s*lots?\b',
+    'm2': r'(\d+)\s*(?:m[²2]|mètres?\s*carrés?|m\s*carrés?)',
+    'm_seul': r'(\d{2,4})\s*m\b',
+    'terrain_nombre': r'(?:terrain|parcelle|plot)\s+(\d{2,4})\b',
+    'prix_milliers': r'(\d{1,3}(?:[,\s]\d{3})+)',
+    'prix_millions': r'(\d+(?:[.,]\d+)?)\s*(?:millions?|m)\s*(?:fcfa|cfa|f)?',
+    'prix_compact': r'(\d+)m\s*(?:fcfa|cfa|f)',
+}
+
+
+# Colonnes de la table biens_immobiliers (export commun à toutes les sources)
+COLONNES_BDD = [
+    'id_bien', 'titre_complet', 'type_bien', 'type_offre',
+    'ville', 'quartier', 'surface_m2', 'prix_fcfa', 'prix_m2',
+    'latitude', 'longitude', 'source', 'date_publication',
+    'date_collecte', 'url_annonce', 'url_photo', 'statut',
+    'quartier_confiance'
+]
+
+
+# Extraction parallèle (workers > 1) à partir de cette taille : en dessous, le
+# démarrage des processus coûte plus qu'il ne rapporte
+SEUIL_PARALLELE = 20000
+
+
+# LISTE COMPLÈTE DES 69 QUARTIERS OFFICIELS DE LOMÉ + variantes orthographiques
+# Source : Plan Guide de Lomé + recherches web
+# (tables dérivées précompilées dans regles_id_immobilier.json, voir jeu_regles.py)
+QUARTIERS_LOME = [
+    # Arrondissement 1 (11 quartiers)
+    'abobokomé', 'adoboukomé', 'agbadahonou', 'aguiakomé', 'adawlato',
+    'bassadji', 'doumassessé', 'lomé-2', 'lome 2', 'lome ii',
+    'octaviano', 'octavio', 'zanguéra', 'zanguera', 'zongo',
+    
+    # Arrondissement 2 (18 quartiers - Nord-Est)
+    'adakpamé', 'adakpame', 'adeticopé', 'adetikopé', 'adetikope', 
+    'anfamé', 'anfame', 'aklavé', 'aklave',
+    'cacavelli', 'cacavéli', 'forever', 'kanyikopé', 'kanyikope',
+    'kpota', 'dékon', 'dekon', 'légokonmé', 'legokonme',
+    'noèpé', 'noepe', 'nukafu', 'nukafu nord',
+    'tokoin', 'tokoin-wuiti', 'tokoin wuiti', 'tokoin-tamé', 'tokoin tame',
+    'tokoin-enyonam', 'tokoin enyonam', 'tokoin-gbadago', 'tokoin gbadago',
+    'tokoin-aviation', 'tokoin aviation',
+    
+    # Arrondissement 3 (17 quartiers - Bande littorale Est)
+    'ablogamé', 'ablogame', 'afédomé', 'afedome',
+    'bè', 'be', 'bè-centre', 'be-centre',
+    'bè-apéyémé', 'be-apeyeme', 'bè-dangbuipé', 'be-dangbuipe',
+    'bè-adzrometi', 'be-adzrometi', 'bè-agodo', 'be-agodo',
+    'bè-agodogan', 'be-agodogan', 'bè-allaglo', 'be-allaglo',
+    'bè-ahligo', 'be-ahligo', 'bè-hounvémé', 'be-hounveme',
+    'bè-adanlekponsi', 'be-adanlekponsi', 'bè-wété', 'be-wete',
+    'bè-akodessewa', 'be-akodessewa', 'bè-akodesséwa', 'be-akodessewa',
+    'akodessewa', 'akodesséwa', 'akodeséwa',
+    'bè-kotokou', 'be-kotokou', 'bè-ablogame', 'be-ablogame',
+    'bè-kanyikopé', 'be-kanyikope', 'bè-adakpamé', 'be-adakpame',
+    'bè-kpota', 'be-kpota', 'bè-anfamé', 'be-anfame',
+    'bè-atiégou', 'be-atiegou', 'bè-souza', 'be-souza',
+    'bè-anthony', 'be-anthony', 'bè-klikamé', 'be-klikame',
+    'katanga', 'kélégougan', 'kelegougan', 'klobatèmé', 'klobateme',
+    'hédzranawoé', 'hedzranawoe', 'xédranawoe', 'xedranawoe',
+    'hédjé', 'hedje', 'kégué', 'kegue',
+    
+    # Arrondissement 4 (4 quartiers - Bande littorale Ouest)
+    'agoè', 'agoe', 'agoè-nyivé', 'agoe-nyive',
+    'avédji', 'avedji', 'baguida', 'djidjolé', 'djidjole',
+    
+    # Arrondissement 5 (19 quartiers - Nord-Ouest)
+    'adéwui', 'adewui', 'adewi', 'agbalépédogan', 'agbalepedogan',
+    'amoutivé', 'amoutive', 'assivito', 'béniglato', 'beniglato',
+    'biossé', 'biosse', 'doulassamé', 'doulassame',
+    'hanoukopé', 'hanoukope', 'hétrivikondji', 'hetrivikondji',
+    'kodjoviakopé', 'kodjoviakope', 'kodomé', 'kodome',
+    'lom-nava', 'lom nava', 'nyékonakpoé', 'nyekonakpoe', 'nyekonakpo',
+    'ntifafa', 'sanguéra', 'sanguera',
+    
+    # Autres quartiers et cantons de l'agglomération
+    'attikoumé', 'attikoume', 'atikoume', 'atikoumé', 'atikoume-adjomayi',
+    'kélékougan', 'kelekougan', 'kpogan',
+    'aflao-gakli', 'aflao gakli', 'aflao-sagbado', 'aflao sagbado',
+    
+    # Quartiers spéciaux
+    'quartier administratif', 'zone portuaire', 'cité oua', 'cite oua',
+    'togo 2000',
+    
+    # Localités périphériques du Grand Lomé
+    'aného', 'aneho', 'kpalimé', 'kpalime',
+    'tsévié', 'tsevie', 'vogan', 'vo',
+    'anfoin', 'nanegbé', 'nanegbe', 'wonyomé', 'wonyome', 'wessomé', 'wessome'
+]
+
 
 class IDImmobilierCleanerV2:
     """
     Version OPTIMISÉE pour atteindre 60%+ de données valides
     """
     
-    def __init__(self):
+    def __init__(self, profilage=False, extraction_bornee=False, budget_ligne_ms=None,
+                 tables_surface=None, source='Facebook Marketplace', workers=None, mots_cles=None):
         # Surface standard pour 1 lot au Togo
         self.surface_lot_standard = 350  # m²
         
+        # Libellé de la colonne `source` (autres sites : voir sources_annonces.py)
+        self.source = source
+        
+        # Tables d'inférence des surfaces apprises (inference_surface.py), créées au
+        # premier nettoyage ; `tables_surface` = fichier JSON persistant entre les runs
+        self.chemin_tables_surface = tables_surface
+        self.tables_surface = None
+        
+        # Extraction sur plusieurs cœurs pour les gros fichiers (parallele_memoire.py)
+        self.workers = workers or 1
+        
+        # Statistiques du dernier nettoyage (resume_statistique.py), pour les rapports et exports
+        self.resume = None
+        
+        # Types de bien / d'offre, pièces et mots de location en un parcours du titre ;
+        # `mots_cles` : table remplaçant MOTS_CLES (dict ou fichier JSON)
+        self.classifieur = ClassifieurTypes(mots_cles)
+        
+        # Profilage des règles (opt-in) : None = aucune mesure, coût quasi nul
+        self.profileur = ProfileurRegles() if profilage else None
+        
+        # Extraction bornée (opt-in) : fenêtre de texte + RE2 si disponible,
+        # budget de temps par ligne (dépassements comptés)
+        self.extraction_bornee = extraction_bornee
+        
+        # Jeu de règles précompilé (quartiers, index, patterns), lu une fois par processus
+        self.regles = charger_regles(QUARTIERS_LOME, ALIAS_QUARTIERS, MOTIFS_EXTRACTION)
+        self.motifs = compiler_motifs(self.regles['motifs'], 're2' if extraction_bornee else 're')
+        self.budget = BudgetExtraction(budget_ligne_ms) if budget_ligne_ms else None
+        
+        # Règles d'extraction, dans leur ordre de priorité
+        self.regles_surface = [
+            ('fraction_lot', self._surface_fraction_lot),
+            ('lots_et_fraction', self._surface_lots_et_fraction),
+            ('lots', self._surface_lots),
+            ('m2', self._surface_m2),
+            ('m_seul', self._surface_m_seul),
+            ('terrain_nombre', self._surface_terrain_nombre),
+        ]
+        self.tentatives_prix = [
+            ('montant', self._prix_montant),
+            ('montant_formate', self._prix_formate),
+            ('prix_comparable', self._prix_comparable),
+            ('titre_milliers', self._prix_titre_milliers),
+            ('titre_millions', self._prix_titre_millions),
+            ('titre_compact', self._prix_titre_compact),
+            ('inference_surface', self._prix_inference),
+        ]
+        
         # LISTE COMPLÈTE DES 69 QUARTIERS OFFICIELS DE LOMÉ
         # Source : Plan Guide de Lomé + recherches web
         self.quartiers_lome = self._init_quartiers_complets()
+        self.table_quartiers = self.regles['table_exacte']
+        
+        # Index SymSpell : variantes et fautes de frappe -> nom canonique
+        self.index_quartiers = IndexQuartiers.depuis_export(self.regles['index'])
         
         # Champs selon les 3 niveaux (inchangé)
         self.niveaux_champs = {
@@ -48,153 +222,136 @@ class IDImmobilierCleanerV2:
     def _init_quartiers_complets(self):
         """
         Liste COMPLÈTE des 69 quartiers officiels + variantes orthographiques
+        (dédoublonnée et triée dans le jeu de règles précompilé)
         """
-        quartiers = [
-            # Arrondissement 1 (11 quartiers)
-            'abobokomé', 'adoboukomé', 'agbadahonou', 'aguiakomé', 'adawlato',
-            'bassadji', 'doumassessé', 'lomé-2', 'lome 2', 'lome ii',
-            'octaviano', 'octavio', 'zanguéra', 'zanguera', 'zongo',
-            
-            # Arrondissement 2 (18 quartiers - Nord-Est)
-            'adakpamé', 'adakpame', 'adeticopé', 'adetikopé', 'adetikope', 
-            'anfamé', 'anfame', 'aklavé', 'aklave',
-            'cacavelli', 'cacavéli', 'forever', 'kanyikopé', 'kanyikope',
-            'kpota', 'dékon', 'dekon', 'légokonmé', 'legokonme',
-            'noèpé', 'noepe', 'nukafu', 'nukafu nord',
-            'tokoin', 'tokoin-wuiti', 'tokoin wuiti', 'tokoin-tamé', 'tokoin tame',
-            'tokoin-enyonam', 'tokoin enyonam', 'tokoin-gbadago', 'tokoin gbadago',
-            'tokoin-aviation', 'tokoin aviation',
-            
-            # Arrondissement 3 (17 quartiers - Bande littorale Est)
-            'ablogamé', 'ablogame', 'afédomé', 'afedome',
-            'bè', 'be', 'bè-centre', 'be-centre',
-            'bè-apéyémé', 'be-apeyeme', 'bè-dangbuipé', 'be-dangbuipe',
-            'bè-adzrometi', 'be-adzrometi', 'bè-agodo', 'be-agodo',
-            'bè-agodogan', 'be-agodogan', 'bè-allaglo', 'be-allaglo',
-            'bè-ahligo', 'be-ahligo', 'bè-hounvémé', 'be-hounveme',
-            'bè-adanlekponsi', 'be-adanlekponsi', 'bè-wété', 'be-wete',
-            'bè-akodessewa', 'be-akodessewa', 'bè-akodesséwa', 'be-akodessewa',
-            'akodessewa', 'akodesséwa', 'akodeséwa',
-            'bè-kotokou', 'be-kotokou', 'bè-ablogame', 'be-ablogame',
-            'bè-kanyikopé', 'be-kanyikope', 'bè-adakpamé', 'be-adakpame',
-            'bè-kpota', 'be-kpota', 'bè-anfamé', 'be-anfame',
-            'bè-atiégou', 'be-atiegou', 'bè-souza', 'be-souza',
-            'bè-anthony', 'be-anthony', 'bè-klikamé', 'be-klikame',
-            'katanga', 'kélégougan', 'kelegougan', 'klobatèmé', 'klobateme',
-            'hédzranawoé', 'hedzranawoe', 'xédranawoe', 'xedranawoe',
-            'hédjé', 'hedje', 'kégué', 'kegue',
-            
-            # Arrondissement 4 (4 quartiers - Bande littorale Ouest)
-            'agoè', 'agoe', 'agoè-nyivé', 'agoe-nyive',
-            'avédji', 'avedji', 'baguida', 'djidjolé', 'djidjole',
-            
-            # Arrondissement 5 (19 quartiers - Nord-Ouest)
-            'adéwui', 'adewui', 'adewi', 'agbalépédogan', 'agbalepedogan',
-            'amoutivé', 'amoutive', 'assivito', 'béniglato', 'beniglato',
-            'biossé', 'biosse', 'doulassamé', 'doulassame',
-            'hanoukopé', 'hanoukope', 'hétrivikondji', 'hetrivikondji',
-            'kodjoviakopé', 'kodjoviakope', 'kodomé', 'kodome',
-            'lom-nava', 'lom nava', 'nyékonakpoé', 'nyekonakpoe', 'nyekonakpo',
-            'ntifafa', 'sanguéra', 'sanguera',
-            
-            # Autres quartiers et cantons de l'agglomération
-            'attikoumé', 'attikoume', 'atikoume', 'atikoumé', 'atikoume-adjomayi',
-            'kélékougan', 'kelekougan', 'kpogan',
-            'aflao-gakli', 'aflao gakli', 'aflao-sagbado', 'aflao sagbado',
-            
-            # Quartiers spéciaux
-            'quartier administratif', 'zone portuaire', 'cité oua', 'cite oua',
-            'togo 2000',
-            
-            # Localités périphériques du Grand Lomé
-            'aného', 'aneho', 'kpalimé', 'kpalime',
-            'tsévié', 'tsevie', 'vogan', 'vo',
-            'anfoin', 'nanegbé', 'nanegbe', 'wonyomé', 'wonyome', 'wessomé', 'wessome'
-        ]
-        
-        # Enlever les doublons et convertir en minuscules
-        return sorted(list(set([q.lower().strip() for q in quartiers])))
+        return self.regles['quartiers']
     
     def extraire_surface_amelioree(self, titre):
         """
         Extraction AMÉLIORÉE de la surface avec plus de patterns
         """
-        if not titre or pd.isna(titre):
-            return None
+        return self.extraire_surface_avec_regle(titre)[0]
+    
+    def extraire_surface_avec_regle(self, titre):
+        """
+        Extraction de la surface + nom de la règle qui l'a produite (provenance)
+        Les règles sont essayées dans l'ordre ; la première qui trouve gagne
+        """
+        if not titre or est_manquant(titre):
+            return None, None
         
         titre = str(titre).lower()
-        
+        if self.extraction_bornee:
+            titre = borner_texte(titre)
+        profileur, budget = self.profileur, self.budget
+        debut_ligne = budget.demarrer('surface') if budget is not None else 0
+        
+        for nom, regle in self.regles_surface:
+            if profileur is None:
+                surface = regle(titre)
+            else:
+                debut = time.perf_counter_ns()
+                surface = regle(titre)
+                profileur.mesurer('surface', nom, time.perf_counter_ns() - debut, surface is not None)
+            if surface is not None:
+                return surface, nom
+            if budget is not None and budget.depasse('surface', debut_ligne):
+                break
+        
+        return None, None
+    
+    def _surface_fraction_lot(self, titre):
         # Pattern 1: "1/4 de lot", "1/2 lot", "1/8 lot" (priorité haute)
-        match = re.search(r'(\d+)/(\d+)\s*(?:de\s*)?lots?', titre)
+        match = self.motifs['fraction_lot'].search(titre)
         if match:
             num = int(match.group(1))
             denom = int(match.group(2))
             return (num / denom) * self.surface_lot_standard
-        
+        return None
+    
+    def _surface_lots_et_fraction(self, titre):
         # Pattern 2: "1lot et 1/4", "1 lot et 1/2"
-        match = re.search(r'(\d+)\s*lots?\s*et\s*(\d+)/(\d+)', titre)
+        match = self.motifs['lots_et_fraction'].search(titre)
         if match:
             lots_entiers = int(match.group(1))
             num = int(match.group(2))
             denom = int(match.group(3))
             return (lots_entiers + num / denom) * self.surface_lot_standard
-        
+        return None
+    
+    def _surface_lots(self, titre):
         # Pattern 3: "1 lot", "2 lots", "1lot", "02 lot"
-        match = re.search(r'(\d+)\s*lots?\b', titre)
+        match = self.motifs['lots'].search(titre)
         if match:
             nb_lots = int(match.group(1))
             # Filtre : max 10 lots (au-delà c'est probablement pas un lot)
             if nb_lots <= 10:
                 return nb_lots * self.surface_lot_standard
-        
+        return None
+    
+    def _surface_m2(self, titre):
         # Pattern 4: "350 m²", "350m2", "350 mètres carrés", "350 m carré"
-        match = re.search(r'(\d+)\s*(?:m[²2]|mètres?\s*carrés?|m\s*carrés?)', titre)
+        match = self.motifs['m2'].search(titre)
         if match:
             return int(match.group(1))
-        
+        return None
+    
+    def _surface_m_seul(self, titre):
         # Pattern 5: "350m" (sans ² mais probablement des m²)
-        match = re.search(r'(\d{2,4})\s*m\b', titre)
+        match = self.motifs['m_seul'].search(titre)
         if match and 'km' not in titre.lower():  # Éviter les kilomètres
             surface = int(match.group(1))
             if 30 <= surface <= 5000:  # Plage réaliste pour un terrain
                 return surface
-        
+        return None
+    
+    def _surface_terrain_nombre(self, titre):
         # Pattern 6: Mention de parcelle/terrain avec nombre
         # Ex: "terrain 500", "parcelle 400"
-        match = re.search(r'(?:terrain|parcelle|plot)\s+(\d{2,4})\b', titre)
+        match = self.motifs['terrain_nombre'].search(titre)
         if match:
             surface = int(match.group(1))
             if 50 <= surface <= 5000:
                 return surface
-        
         return None
     
     def extraire_quartier_ameliore(self, titre):
         """
         Extraction AMÉLIORÉE des quartiers avec détection de variantes
         """
-        if not titre or pd.isna(titre):
-            return 'Non spécifié'
+        return self.extraire_quartier_avec_confiance(titre)[0]
+    
+    def extraire_quartier_avec_confiance(self, titre):
+        """
+        Extraire le quartier (nom canonique) et la confiance de la correspondance
+        1.0 = variante connue, < 1.0 = faute de frappe corrigée, 0.0 = non trouvé
+        """
+        if not titre or est_manquant(titre):
+            return 'Non spécifié', 0.0
         
         titre_lower = str(titre).lower()
+        if self.extraction_bornee:
+            titre_lower = borner_texte(titre_lower)
         # Enlever les accents pour meilleure détection
         titre_norm = self._normaliser_texte(titre_lower)
+        titre_flexible = titre_norm.replace('-', '').replace(' ', '')
         
-        # Rechercher chaque quartier connu
-        for quartier in self.quartiers_lome:
-            quartier_norm = self._normaliser_texte(quartier)
-            
+        # Rechercher chaque quartier connu (formes normalisées précalculées)
+        for _, quartier_norm, quartier_flexible, canonique in self.table_quartiers:
             # Recherche exacte
             if quartier_norm in titre_norm:
-                return self._formater_quartier(quartier)
+                return self._formater_quartier(canonique), 1.0
             
             # Recherche avec espace/tiret flexible (bè-kpota = be kpota = bekpota)
-            quartier_flexible = quartier_norm.replace('-', '').replace(' ', '')
-            titre_flexible = titre_norm.replace('-', '').replace(' ', '')
             if quartier_flexible in titre_flexible:
-                return self._formater_quartier(quartier)
+                return self._formater_quartier(canonique), 1.0
         
-        return 'Non spécifié'
+        # Recherche floue (fautes de frappe) sur les mots du titre
+        quartier, confiance = self.index_quartiers.rechercher(titre_lower)
+        if quartier:
+            return self._formater_quartier(quartier), confiance
+        
+        return 'Non spécifié', 0.0
     
     def _normaliser_texte(self, texte):
         """Normaliser le texte (enlever accents, etc.)"""
@@ -218,25 +375,23 @@ class IDImmobilierCleanerV2:
     def inferer_surface_intelligente(self, row):
         """
         RÈGLES D'INFÉRENCE ULTRA-AGRESSIVES pour surfaces manquantes
+        Repli des tables apprises : lignes sans prix ou sans table applicable
         """
         # Si surface déjà trouvée, on garde
-        if pd.notna(row.get('surface_m2')) and row['surface_m2'] > 0:
+        if not est_manquant(row.get('surface_m2')) and row['surface_m2'] > 0:
             return row['surface_m2']
         
         titre = str(row.get('titre_complet', '')).lower()
         prix = row.get('prix_fcfa', 0)
         
         # Règle 1 : Terrain sans précision → inférence basée sur prix
-        if 'terrain' in titre and pd.isna(row.get('surface_m2')):
+        if 'terrain' in titre and est_manquant(row.get('surface_m2')):
             if prix > 0:
                 # Très petit prix → 1/8 lot ou 1/4 lot
                 if prix < 1100000:
                     return self.surface_lot_standard / 8  # ~43 m²
                 elif prix < 2100000:
                     return self.surface_lot_standard / 4  # 87.5 m²
-                # Prix moyen → 1/2 lot
-                elif prix < 1000000:
-                    return self.surface_lot_standard / 2  # 175 m²
                 # Prix élevé → 1 lot
                 elif prix < 11000000:
                     return self.surface_lot_standard  # 350 m²
@@ -286,18 +441,18 @@ class IDImmobilierCleanerV2:
         titre_parts = []
         
         # Titre principal du marketplace
-        if pd.notna(row.get('marketplace_listing_title')) and str(row.get('marketplace_listing_title')).strip():
+        if not est_manquant(row.get('marketplace_listing_title')) and str(row.get('marketplace_listing_title')).strip():
             titre_parts.append(str(row['marketplace_listing_title']))
         
         # Titre custom (alternatif)
-        if pd.notna(row.get('custom_title')) and str(row.get('custom_title')).strip():
+        if not est_manquant(row.get('custom_title')) and str(row.get('custom_title')).strip():
             custom = str(row['custom_title'])
             # N'ajouter que si différent du premier
             if not titre_parts or custom.lower() not in titre_parts[0].lower():
                 titre_parts.append(custom)
         
         # Sous-titre si disponible
-        if pd.notna(row.get('custom_sub_titles_with_rendering_flags/0/subtitle')):
+        if not est_manquant(row.get('custom_sub_titles_with_rendering_flags/0/subtitle')):
             subtitle = str(row['custom_sub_titles_with_rendering_flags/0/subtitle'])
             if subtitle.strip() and subtitle not in str(titre_parts):
                 titre_parts.append(subtitle)
@@ -307,122 +462,141 @@ class IDImmobilierCleanerV2:
     
     def extraire_ville(self, row):
         """Extraire ville"""
-        if pd.notna(row.get('location/reverse_geocode/city')):
+        if not est_manquant(row.get('location/reverse_geocode/city')):
             return str(row['location/reverse_geocode/city'])
-        if pd.notna(row.get('location/reverse_geocode/city_page/display_name')):
+        if not est_manquant(row.get('location/reverse_geocode/city_page/display_name')):
             display = str(row['location/reverse_geocode/city_page/display_name'])
             return display.split(',')[0].strip()
         return 'Lomé'
     
     def nettoyer_prix_ultra(self, row):
         """Extraction ULTRA-AGRESSIVE du prix depuis TOUS les champs"""
+        return self.nettoyer_prix_avec_regle(row)[0]
+    
+    def nettoyer_prix_avec_regle(self, row):
+        """
+        Prix + nom de la tentative qui l'a fourni (provenance)
+        Chaque tentative n'est essayée que si le prix courant reste < 10 000 FCFA
+        """
         prix = 0
+        provenance = None
+        profileur, budget = self.profileur, self.budget
+        debut_ligne = budget.demarrer('prix') if budget is not None else 0
+        
+        for nom, tentative in self.tentatives_prix:
+            if prix >= 10000:
+                break
+            if budget is not None and budget.depasse('prix', debut_ligne):
+                break
+            if profileur is None:
+                candidat = tentative(row)
+            else:
+                debut = time.perf_counter_ns()
+                candidat = tentative(row)
+                profileur.mesurer('prix', nom, time.perf_counter_ns() - debut,
+                                  candidat is not None and candidat >= 10000)
+            if candidat is not None:
+                prix = candidat
+                provenance = nom
+        
+        # Filtrer prix aberrants (TRÈS permissif maintenant)
+        # Accepter même les très petits prix si trouvés dans formatted ou titre
+        if prix > 0 and prix < 10000:  # Moins de 10k FCFA est vraiment trop bas
+            return None, None
         
+        return (prix, provenance) if prix > 0 else (None, None)
+    
+    def _prix_montant(self, row):
         # Tentative 1: listing_price/amount (champ principal)
         try:
-            prix = float(row.get('listing_price/amount', 0)) if pd.notna(row.get('listing_price/amount')) else 0
+            return float(row.get('listing_price/amount', 0)) if not est_manquant(row.get('listing_price/amount')) else 0
         except:
-            prix = 0
-        
+            return 0
+    
+    def _prix_formate(self, row):
         # Tentative 2: Si prix invalide, chercher dans formatted_amount
-        if prix < 10000:
-            formatted = str(row.get('listing_price/formatted_amount', ''))
-            if formatted and formatted != 'nan':
-                # "CFA3,500,000" ou "CFA 3 500 000"
-                match = re.search(r'(\d{1,3}(?:[,\s]\d{3})+)', formatted)
-                if match:
-                    prix_str = match.group(1).replace(',', '').replace(' ', '')
-                    try:
-                        prix = float(prix_str)
-                    except:
-                        pass
-        
+        formatted = str(row.get('listing_price/formatted_amount', ''))
+        if formatted and formatted != 'nan':
+            if self.extraction_bornee:
+                formatted = borner_texte(formatted)
+            # "CFA3,500,000" ou "CFA 3 500 000"
+            match = self.motifs['prix_milliers'].search(formatted)
+            if match:
+                prix_str = match.group(1).replace(',', '').replace(' ', '')
+                try:
+                    return float(prix_str)
+                except:
+                    pass
+        return None
+    
+    def _prix_comparable(self, row):
         # Tentative 3: comparable_price
-        if prix < 10000:
-            try:
-                comp_price = float(row.get('comparable_price', 0)) if pd.notna(row.get('comparable_price')) else 0
-                if comp_price >= 10000:
-                    prix = comp_price
-            except:
-                pass
-        
+        try:
+            comp_price = float(row.get('comparable_price', 0)) if not est_manquant(row.get('comparable_price')) else 0
+            if comp_price >= 10000:
+                return comp_price
+        except:
+            pass
+        return None
+    
+    def _titre_prix(self, row):
+        titre = str(row.get('titre_complet', '')).lower()
+        if self.extraction_bornee:
+            titre = borner_texte(titre)
+        return titre if titre and titre != 'nan' else None
+    
+    def _prix_titre_milliers(self, row):
         # Tentative 4: Chercher dans le titre
-        if prix < 10000:
-            titre = str(row.get('titre_complet', '')).lower()
-            if titre and titre != 'nan':
-                # Pattern "3,500,000" ou "3 500 000"
-                match = re.search(r'(\d{1,3}(?:[,\s]\d{3})+)', titre)
-                if match:
-                    prix_str = match.group(1).replace(',', '').replace(' ', '')
-                    try:
-                        prix_num = float(prix_str)
-                        if prix_num >= 10000:
-                            prix = prix_num
-                    except:
-                        pass
-                
-                # Pattern "X millions" ou "X M"
-                if prix < 10000:
-                    match = re.search(r'(\d+(?:[.,]\d+)?)\s*(?:millions?|m)\s*(?:fcfa|cfa|f)?', titre)
-                    if match:
-                        prix = float(match.group(1).replace(',', '.')) * 1000000
-                
-                # Pattern "Xm fcfa" (compact)
-                if prix < 10000:
-                    match = re.search(r'(\d+)m\s*(?:fcfa|cfa|f)', titre)
-                    if match:
-                        prix = float(match.group(1)) * 1000000
-        
+        # Pattern "3,500,000" ou "3 500 000"
+        titre = self._titre_prix(row)
+        if titre:
+            match = self.motifs['prix_milliers'].search(titre)
+            if match:
+                prix_str = match.group(1).replace(',', '').replace(' ', '')
+                try:
+                    prix_num = float(prix_str)
+                    if prix_num >= 10000:
+                        return prix_num
+                except:
+                    pass
+        return None
+    
+    def _prix_titre_millions(self, row):
+        # Pattern "X millions" ou "X M"
+        titre = self._titre_prix(row)
+        if titre:
+            match = self.motifs['prix_millions'].search(titre)
+            if match:
+                return float(match.group(1).replace(',', '.')) * 1000000
+        return None
+    
+    def _prix_titre_compact(self, row):
+        # Pattern "Xm fcfa" (compact)
+        titre = self._titre_prix(row)
+        if titre:
+            match = self.motifs['prix_compact'].search(titre)
+            if match:
+                return float(match.group(1)) * 1000000
+        return None
+    
+    def _prix_inference(self, row):
         # Tentative 5: Si VRAIMENT rien trouvé, inférer selon type de bien et surface
-        if prix < 10000:
-            titre = str(row.get('titre_complet', '')).lower()
-            surface = row.get('surface_m2', 0)
-            
-            if 'terrain' in titre and surface and surface > 0:
-                # Prix moyen au m² à Lomé pour terrain ≈ 15 000 - 50 000 FCFA/m²
-                # On prend une moyenne basse pour être conservateur
-                prix = surface * 20000  # 20k FCFA/m²
-        
-        # Filtrer prix aberrants (TRÈS permissif maintenant)
-        # Accepter même les très petits prix si trouvés dans formatted ou titre
-        if prix > 0 and prix < 10000:  # Moins de 10k FCFA est vraiment trop bas
-            return None
+        titre = str(row.get('titre_complet', '')).lower()
+        surface = row.get('surface_m2', 0)
         
-        return prix if prix > 0 else None
+        if 'terrain' in titre and surface and surface > 0:
+            # Prix moyen au m² à Lomé pour terrain ≈ 15 000 - 50 000 FCFA/m²
+            # On prend une moyenne basse pour être conservateur
+            return surface * 20000  # 20k FCFA/m²
+        return None
     
     def identifier_type_bien(self, titre):
-        """Identifier type de bien"""
-        if not titre or pd.isna(titre):
-            return 'Inconnu'
-        
-        titre_lower = str(titre).lower()
-        
-        if 'terrain' in titre_lower:
-            return 'Terrain'
-        elif any(word in titre_lower for word in ['villa', 'duplex']):
-            return 'Villa'
-        elif 'maison' in titre_lower:
-            return 'Maison'
-        elif any(word in titre_lower for word in ['appartement', 'studio', 'f1', 'f2', 'f3', 'f4']):
-            return 'Appartement'
-        elif 'immeuble' in titre_lower:
-            return 'Immeuble'
-        elif 'bureau' in titre_lower or 'commercial' in titre_lower:
-            return 'Commercial'
-        
-        return 'Terrain'
+        """Identifier type de bien (voir classification_types.py)"""
+        return self.classifieur.classer(titre).type_bien
     
     def identifier_type_offre(self, titre):
         """Identifier type d'offre"""
-        if not titre or pd.isna(titre):
-            return 'Vente'
-        
-        titre_lower = str(titre).lower()
-        
-        if any(word in titre_lower for word in ['louer', 'location', 'à louer', 'en location']):
-            return 'Location'
-        
-        return 'Vente'
+        return self.classifieur.classer(titre).type_offre
     
     def determiner_statut(self, row):
         """Déterminer statut"""
@@ -437,7 +611,50 @@ class IDImmobilierCleanerV2:
         else:
             return 'Inconnue'
     
-    def nettoyer_dataset(self, df):
+    def _tables_surface(self):
+        """Tables d'inférence des surfaces (chargées depuis le fichier persistant au besoin)"""
+        if self.tables_surface is None:
+            from inference_surface import TablesSurface
+            self.tables_surface = TablesSurface(self.chemin_tables_surface)
+        return self.tables_surface
+    
+    def options_workers(self):
+        """Paramètres pour recréer ce nettoyeur dans un processus worker"""
+        return {
+            'profilage': self.profileur is not None,
+            'extraction_bornee': self.extraction_bornee,
+            'budget_ligne_ms': self.budget.budget_ms if self.budget is not None else None,
+            'tables_surface': self.chemin_tables_surface,
+            'source': self.source,
+            'mots_cles': self.classifieur.mots_cles,
+        }
+    
+    def etat_worker(self):
+        """
+        Côté worker : compteurs du profileur et du budget et annonces apprises par les
+        tables depuis le dernier appel (remis à zéro), à renvoyer au parent
+        """
+        etat = {'profileur': None, 'budget': None, 'observations': []}
+        if self.profileur is not None:
+            etat['profileur'] = self.profileur.etat()
+            self.profileur.reinitialiser()
+        if self.budget is not None:
+            etat['budget'] = self.budget.etat()
+            self.budget = BudgetExtraction(self.budget.budget_ms)
+        if self.tables_surface is not None:
+            etat['observations'] = self.tables_surface.vider_journal()
+        return etat
+    
+    def fusionner_worker(self, etat):
+        """Côté parent : ajouter l'état d'un worker (etat_worker) aux mesures et aux tables"""
+        if etat['profileur'] is not None and self.profileur is not None:
+            self.profileur.fusionner(etat['profileur'])
+        if etat['budget'] is not None and self.budget is not None:
+            self.budget.fusionner(etat['budget'])
+        for observations in etat['observations']:
+            self._tables_surface().apprendre(*observations)
+    
+    def nettoyer_dataset(self, df, sauvegarder_tables=True):
         """
         NETTOYAGE COMPLET avec toutes les optimisations
         """
@@ -450,50 +667,104 @@ class IDImmobilierCleanerV2:
         
         # ÉTAPE 1 : Extraction basique
         print("🔹 ÉTAPE 1 : Extraction des champs essentiels")
-        df_clean['titre_complet'] = df_clean.apply(self.generer_titre_complet, axis=1)
+        if self.workers > 1 and len(df_clean) >= SEUIL_PARALLELE:
+            # Étapes 1 et 2 sur plusieurs cœurs, entrées et sorties en mémoire partagée
+            from parallele_memoire import extraire_en_parallele, villes_et_statuts
+            print(f"   ⚡ Extraction parallèle sur {self.workers} workers")
+            colonnes_paralleles = extraire_en_parallele(self, df_clean, self.workers)
+            df_clean['ville'], df_clean['statut'] = villes_et_statuts(df_clean)
+        else:
+            colonnes_paralleles = None
+            df_clean['titre_complet'] = df_clean.apply(self.generer_titre_complet, axis=1)
+            prix = df_clean.apply(self.nettoyer_prix_avec_regle, axis=1)
+            df_clean['prix_fcfa'] = prix.str[0]
+            df_clean['regle_prix'] = prix.str[1]
+            df_clean['ville'] = df_clean.apply(self.extraire_ville, axis=1)
+            df_clean['statut'] = df_clean.apply(self.determiner_statut, axis=1)
         df_clean['id_bien'] = df_clean['id'].astype(str)
-        df_clean['prix_fcfa'] = df_clean.apply(self.nettoyer_prix_ultra, axis=1)
-        df_clean['ville'] = df_clean.apply(self.extraire_ville, axis=1)
         df_clean['url_annonce'] = df_clean['listingUrl'].fillna('')
-        df_clean['statut'] = df_clean.apply(self.determiner_statut, axis=1)
+        if colonnes_paralleles is not None:
+            for colonne, valeurs in colonnes_paralleles.items():
+                df_clean[colonne] = valeurs
         print(f"   ✓ Prix extraits: {df_clean['prix_fcfa'].notna().sum()}/{len(df_clean)}")
         
         # ÉTAPE 2 : Extraction AMÉLIORÉE
         print("\n🔹 ÉTAPE 2 : Extraction améliorée (surfaces et quartiers)")
-        df_clean['surface_m2'] = df_clean['titre_complet'].apply(self.extraire_surface_amelioree)
+        if colonnes_paralleles is None:
+            surfaces = df_clean['titre_complet'].apply(self.extraire_surface_avec_regle)
+            df_clean['surface_m2'] = surfaces.str[0]
+            df_clean['regle_surface'] = surfaces.str[1]
         surfaces_avant = df_clean['surface_m2'].notna().sum()
         print(f"   ✓ Surfaces extraites: {surfaces_avant}/{len(df_clean)}")
         
-        df_clean['quartier'] = df_clean['titre_complet'].apply(self.extraire_quartier_ameliore)
+        if colonnes_paralleles is None:
+            quartiers = df_clean['titre_complet'].apply(self.extraire_quartier_avec_confiance)
+            df_clean['quartier'] = quartiers.str[0]
+            df_clean['quartier_confiance'] = quartiers.str[1]
+        quartiers_flous = ((df_clean['quartier_confiance'] > 0) & (df_clean['quartier_confiance'] < 1)).sum()
         quartiers_trouves = (df_clean['quartier'] != 'Non spécifié').sum()
-        print(f"   ✓ Quartiers identifiés: {quartiers_trouves}/{len(df_clean)}")
+        print(f"   ✓ Quartiers identifiés: {quartiers_trouves}/{len(df_clean)} (dont {quartiers_flous} par correspondance floue)")
+        
+        # Types nécessaires aux tables d'inférence (un parcours par titre distinct)
+        if colonnes_paralleles is None:
+            classement = self.classifieur.classer_colonne(df_clean['titre_complet'])
+            for colonne in COLONNES_CLASSEMENT:
+                df_clean[colonne] = classement[colonne]
+        types_incertains = (df_clean['type_bien_confiance'] < 0.5).sum()
+        print(f"   ✓ Types identifiés ({types_incertains} sans mot-clé clair, confiance < 0,5)")
         
         # ÉTAPE 3 : INFÉRENCE INTELLIGENTE
         print("\n🔹 ÉTAPE 3 : Inférence intelligente des surfaces manquantes")
-        df_clean['surface_m2'] = df_clean.apply(self.inferer_surface_intelligente, axis=1)
+        # Apprentissage sur les surfaces extraites (hors prix eux-mêmes inférés de la surface)
+        tables = self._tables_surface()
+        surfaces_extraites = df_clean['regle_surface'].notna() & (df_clean['regle_prix'] != 'inference_surface')
+        colonnes_cles = ['type_offre', 'type_bien', 'quartier']
+        nb_appris = tables.apprendre(df_clean.loc[surfaces_extraites, 'prix_fcfa'],
+                                     df_clean.loc[surfaces_extraites, 'surface_m2'],
+                                     *(df_clean.loc[surfaces_extraites, c] for c in colonnes_cles))
+        
+        # Tables apprises : tranche de prix -> prix/m² médian, vectorisé sur la colonne
+        manquantes = df_clean.index[df_clean['surface_m2'].isna()]
+        surfaces, niveaux = tables.estimer(df_clean.loc[manquantes, 'prix_fcfa'],
+                                           *(df_clean.loc[manquantes, c] for c in colonnes_cles))
+        df_clean.loc[manquantes, 'surface_m2'] = surfaces
+        par_tables = niveaux >= 0
+        df_clean.loc[manquantes[par_tables], 'regle_surface'] = 'table_prix_m2'
+        
+        # Règles fixes pour le reste (pas de prix, ou aucune table assez fournie)
+        restantes = df_clean['surface_m2'].isna()
+        if restantes.any():
+            df_clean.loc[restantes, 'surface_m2'] = df_clean[restantes].apply(
+                self.inferer_surface_intelligente, axis=1)
+        df_clean.loc[df_clean['regle_surface'].isna() & df_clean['surface_m2'].notna(),
+                     'regle_surface'] = 'inference'
+        resume = tables.resume()
+        print(f"   ✓ Tables apprises: +{nb_appris} annonces à surface extraite "
+              f"({resume[0]} quartiers, {resume[1]} types exploitables)")
+        print(f"   ✓ Inférées par les tables: {par_tables.sum()}, "
+              f"par les règles fixes: {(df_clean['regle_surface'] == 'inference').sum()}")
         surfaces_apres = df_clean['surface_m2'].notna().sum()
         surfaces_inferees = surfaces_apres - surfaces_avant
         print(f"   ✓ Surfaces après inférence: {surfaces_apres}/{len(df_clean)} (+{surfaces_inferees} inférées)")
         
         # ÉTAPE 4 : Compléments
         print("\n🔹 ÉTAPE 4 : Finalisation")
-        df_clean['type_bien'] = df_clean['titre_complet'].apply(self.identifier_type_bien)
-        df_clean['type_offre'] = df_clean['titre_complet'].apply(self.identifier_type_offre)
         
         # Prix au m²
         df_clean['prix_m2'] = df_clean.apply(
             lambda row: round(row['prix_fcfa'] / row['surface_m2'], 2)
-            if pd.notna(row['surface_m2']) and row['surface_m2'] > 0 
-               and pd.notna(row['prix_fcfa']) and row['prix_fcfa'] > 0
+            if not est_manquant(row['surface_m2']) and row['surface_m2'] > 0 
+               and not est_manquant(row['prix_fcfa']) and row['prix_fcfa'] > 0
             else None,
             axis=1
         )
         
         # Champs complémentaires
-        df_clean['source'] = 'Facebook Marketplace'
+        df_clean['source'] = self.source
         df_clean['date_collecte'] = datetime.now().strftime('%Y-%m-%d')
-        df_clean['latitude'] = None
-        df_clean['longitude'] = None
+        # Coordonnées fournies par certaines sources (sinon vides)
+        df_clean['latitude'] = df_clean.get('latitude')
+        df_clean['longitude'] = df_clean.get('longitude')
         df_clean['date_publication'] = None
         df_clean['url_photo'] = df_clean.get('primary_listing_photo/photo_image_url', '')
         
@@ -509,7 +780,9 @@ class IDImmobilierCleanerV2:
             (df_clean['prix_m2'].notna())
         ].copy()
         
-        taux_validite = (len(df_valide) / len(df) * 100)
+        from resume_statistique import resumer
+        self.resume = resumer(df_valide, len(df))
+        taux_validite = self.resume.taux_validite
         print(f"   ✓ Données valides: {len(df_valide)}/{len(df)} ({taux_validite:.1f}%)")
         
         # RÉSULTATS
@@ -523,65 +796,179 @@ class IDImmobilierCleanerV2:
             print(f"⚠️  Objectif non atteint : {taux_validite:.1f}% < 60%")
         
         if len(df_valide) > 0:
-            print(f"\nPrix moyen au m²:     {df_valide['prix_m2'].mean():,.0f} FCFA")
-            print(f"Prix médian au m²:    {df_valide['prix_m2'].median():,.0f} FCFA")
-            print(f"Surface moyenne:      {df_valide['surface_m2'].mean():.0f} m²")
+            print(f"\nPrix moyen au m²:     {self.resume['prix_m2'].moyenne:,.0f} FCFA")
+            print(f"Prix médian au m²:    {self.resume['prix_m2'].mediane:,.0f} FCFA")
+            print(f"Surface moyenne:      {self.resume['surface_m2'].moyenne:.0f} m²")
             print(f"\n📍 Quartiers trouvés: {quartiers_trouves} annonces")
             print(f"📏 Surfaces inférées: {surfaces_inferees} annonces")
             
             print(f"\n📊 Répartition par type:")
-            print(df_valide['type_bien'].value_counts())
+            for type_bien, nb in self.resume.repartitions['type_bien'].items():
+                print(f"   {type_bien:<15}{nb:>6}")
         
         print("="*70)
         
+        if self.profileur is not None:
+            self.profileur.afficher()
+        if self.budget is not None:
+            self.budget.afficher()
+        if sauvegarder_tables:
+            self.tables_surface.sauvegarder()
+        
         return df_valide
     
-    def exporter_pour_bdd(self, df_clean, format='csv'):
-        """Export selon structure BDD"""
-        colonnes_bdd = [
-            'id_bien', 'titre_complet', 'type_bien', 'type_offre',
-            'ville', 'quartier', 'surface_m2', 'prix_fcfa', 'prix_m2',
-            'latitude', 'longitude', 'source', 'date_publication',
-            'date_collecte', 'url_annonce', 'url_photo', 'statut'
-        ]
-        
-        df_export = df_clean[colonnes_bdd].copy()
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        if format == 'csv':
-            filename = f'id_immobilier_optimise_{timestamp}.csv'
-            df_export.to_csv(filename, index=False, encoding='utf-8-sig')
-        elif format == 'excel':
-            filename = f'id_immobilier_optimise_{timestamp}.xlsx'
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                df_export.to_excel(writer, sheet_name='Données', index=False)
-                
-                # Stats
-                stats = pd.DataFrame({
-                    'Total': [len(df_export)],
-                    'Prix moyen /m²': [df_export['prix_m2'].mean()],
-                    'Surface moyenne': [df_export['surface_m2'].mean()],
-                    'Quartiers trouvés': [(df_export['quartier'] != 'Non spécifié').sum()]
-                })
-                stats.T.to_excel(writer, sheet_name='Statistiques')
+    def lire_morceaux(self, source, taille_morceau=5000, adaptateur=None):
+        """
+        Morceaux bruts d'un CSV (chemin ou flux texte), d'un dataset Apify .json/.jsonl
+        ou d'un CSV d'une autre source (`adaptateur`)
+        """
+        import pandas as pd
+        
+        if isinstance(source, str) and source.lower().endswith(('.json', '.jsonl')):
+            from ingestion_apify import champs_utilises, lire_apify
+            return lire_apify(source, champs_utilises(self.niveaux_champs), taille_morceau)
+        if adaptateur is not None:
+            return adaptateur.lire(source, self.niveaux_champs, taille_morceau)
+        return pd.read_csv(source, chunksize=taille_morceau)
+    
+    def nettoyer_par_morceaux(self, source, taille_morceau=5000, adaptateur=None):
+        """
+        Nettoyage par morceaux d'un CSV (chemin ou flux texte, ex: membre d'une archive ZIP)
+        ou d'un dataset Apify .json/.jsonl (seuls les champs utiles sont extraits)
+        `adaptateur` (sources_annonces.AdaptateurSource) : CSV d'une autre source, ramené
+        aux colonnes Marketplace avant nettoyage
+        Le fichier n'est jamais chargé en entier ; retourne (données valides, nb lignes lues)
+        """
+        import pandas as pd
+        
+        morceaux = []
+        nb_lignes = 0
+        lecteur = self.lire_morceaux(source, taille_morceau, adaptateur)
+        
+        for morceau in lecteur:
+            nb_lignes += len(morceau)
+            # Rapport détaillé de chaque morceau inutile : seul le total est affiché
+            with contextlib.redirect_stdout(io.StringIO()):
+                morceaux.append(self.nettoyer_dataset(morceau, sauvegarder_tables=False))
+        
+        df_valide = pd.concat(morceaux, ignore_index=True) if morceaux else pd.DataFrame()
+        if nb_lignes > 0:
+            print(f"   ✓ {len(df_valide)}/{nb_lignes} lignes valides "
+                  f"({len(df_valide)/nb_lignes*100:.1f}%, {len(morceaux)} morceau(x))")
+        if self.profileur is not None:
+            self.profileur.afficher()
+        if self.tables_surface is not None:
+            self.tables_surface.sauvegarder()
+        
+        return df_valide, nb_lignes
+    
+    def exporter_pour_bdd(self, df_clean, format='csv', dossier='.', resume=None, depot=None):
+        """
+        Export selon structure BDD (dans `dossier`, répertoire courant par défaut)
+        `resume` : ResumeStatistique déjà calculé pour df_clean (feuille Statistiques)
+        `depot` : DepotExports ; l'export y est adressé par son contenu et n'est
+        écrit que si les données ont changé (voir depot_exports.py)
+        """
+        df_export = df_clean[COLONNES_BDD].copy()
+        
+        def ecrire(df, filename):
+            if format == 'csv':
+                df.to_csv(filename, index=False, encoding='utf-8-sig')
+            elif format == 'excel':
+                ecrire_excel(df, filename, resume)
+        
+        if depot is not None:
+            filename, nouveau = depot.deposer(df_export, format, ecrire)
+            if not nouveau:
+                print(f"\n⏭️ Export {format.upper()} inchangé, non réécrit: {filename}")
+                return filename
+        else:
+            filename = chemin_export(format, dossier)
+            ecrire(df_export, filename)
         
         print(f"\n✅ Export {format.upper()}: {filename}")
         return filename
+    
+    def nettoyer_en_pipeline(self, source, formats=('csv',), dossier='.', taille_morceau=5000,
+                             workers=None, adaptateur=None):
+        """
+        Lecture, nettoyage et écriture des exports en parallèle, reliés par des files
+        bornées (voir pipeline_nettoyage.py) ; retourne (fichiers écrits, mesures par étape)
+        """
+        from pipeline_nettoyage import executer_pipeline
+        return executer_pipeline(self, source, formats, dossier, taille_morceau,
+                                 workers=workers, adaptateur=adaptateur)
+    
+    def nettoyer_sous_budget(self, source, budget_memoire, formats=('csv',), dossier='.',
+                             adaptateur=None):
+        """
+        Nettoyage par morceaux dimensionnés sur la mémoire restante sous `budget_memoire`
+        (octets de RSS), résultats déversés sur disque près de la limite (voir budget_memoire.py) ;
+        retourne (fichiers écrits, BudgetMemoire)
+        """
+        from budget_memoire import nettoyer_sous_budget
+        return nettoyer_sous_budget(self, source, budget_memoire, formats, dossier, adaptateur)
+
+
+def chemin_export(format, dossier='.', timestamp=None):
+    """Nom du fichier d'export horodaté (id_immobilier_optimise_AAAAMMJJ_HHMMSS.csv/.xlsx)"""
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    extension = 'xlsx' if format == 'excel' else format
+    return os.path.join(dossier, f'id_immobilier_optimise_{timestamp}.{extension}')
+
+
+def ecrire_excel(df_export, filename, resume=None):
+    """Classeur Excel : feuille Données + feuille Statistiques (ResumeStatistique)"""
+    import pandas as pd
+    from resume_statistique import resumer
+    
+    if resume is None:
+        resume = resumer(df_export)
+    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        df_export.to_excel(writer, sheet_name='Données', index=False)
+        resume.feuille_statistiques().to_excel(writer, sheet_name='Statistiques')
+    return filename
 
 
 def main():
     """Fonction principale"""
+    import argparse
+    import pandas as pd
+    
+    parser = argparse.ArgumentParser(description="Nettoyage ID Immobilier (version optimisée)")
+    parser.add_argument('fichier', nargs='?',
+                        default='/mnt/user-data/uploads/1770856556826_dataset_test_2026-02-12_00-27-35-233.csv')
+    parser.add_argument('--preview', type=int, nargs='?', const=1000, metavar='N',
+                        help="Aperçu : statistiques estimées sur N lignes échantillonnées (défaut 1000)")
+    parser.add_argument('--budget', type=float, default=10.0,
+                        help="Aperçu : durée maximale de lecture en secondes")
+    parser.add_argument('--extraction-bornee', action='store_true',
+                        help="Fenêtre de texte + RE2 si installé contre les titres pathologiques")
+    parser.add_argument('--budget-ligne-ms', type=float, default=None,
+                        help="Budget de temps d'extraction par ligne (ms), dépassements rapportés")
+    parser.add_argument('--stats-json', metavar='FICHIER',
+                        help="Écrire les statistiques (résumé, quartiers, types) en JSON")
+    parser.add_argument('--depot', metavar='DOSSIER',
+                        help="Dépôt adressé par contenu : exports inchangés non réécrits")
+    args = parser.parse_args()
+    
+    if args.preview:
+        from apercu import apercu
+        apercu(args.fichier, taille=args.preview, budget_s=args.budget)
+        return
+    
     print("="*70)
     print("🏠 ID IMMOBILIER - VERSION OPTIMISÉE")
     print("="*70)
     print()
     
     # Charger
-    df = pd.read_csv('/mnt/user-data/uploads/1770856556826_dataset_test_2026-02-12_00-27-35-233.csv')
+    df = pd.read_csv(args.fichier)
     print(f"📂 {len(df)} lignes chargées\n")
     
     # Nettoyer
-    cleaner = IDImmobilierCleanerV2()
+    cleaner = IDImmobilierCleanerV2(extraction_bornee=args.extraction_bornee,
+                                    budget_ligne_ms=args.budget_ligne_ms)
     df_clean = cleaner.nettoyer_dataset(df)
     
     # Exporter
@@ -589,18 +976,22 @@ def main():
         print("\n" + "="*70)
         print("💾 EXPORTS")
         print("="*70)
-        cleaner.exporter_pour_bdd(df_clean, format='csv')
-        cleaner.exporter_pour_bdd(df_clean, format='excel')
+        depot = None
+        if args.depot:
+            from depot_exports import DepotExports
+            depot = DepotExports(args.depot)
+        cleaner.exporter_pour_bdd(df_clean, format='csv', depot=depot)
+        cleaner.exporter_pour_bdd(df_clean, format='excel', resume=cleaner.resume, depot=depot)
+        if args.stats_json:
+            cleaner.resume.ecrire_json(args.stats_json)
+            print(f"\n✅ Statistiques JSON: {args.stats_json}")
         
         # Analyse quartiers
         print("\n" + "="*70)
         print("📍 TOP 10 QUARTIERS")
         print("="*70)
-        quartiers_stats = df_clean[df_clean['quartier'] != 'Non spécifié'].groupby('quartier').agg({
-            'prix_m2': ['mean', 'count']
-        }).round(0)
+        quartiers_stats = cleaner.resume.tableau_quartiers(10, par='nb')[['Prix/m² Moyen', 'Nb Annonces']]
         quartiers_stats.columns = ['Prix /m² moyen', 'Nb annonces']
-        quartiers_stats = quartiers_stats.sort_values('Nb annonces', ascending=False).head(10)
         print(quartiers_stats)
         print("="*70)
 
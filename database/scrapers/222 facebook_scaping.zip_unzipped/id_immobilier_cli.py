@@ -0,0 +1,198 @@
+"""
+LIGNE DE COMMANDE - PROJET ID IMMOBILIER
+Point d'entrée unique, démarrage rapide : pandas n'est importé que par les
+sous-commandes qui lisent ou écrivent des tableaux (clean, preview, export),
+openpyxl seulement pour l'export Excel. classify n'importe ni l'un ni l'autre.
+
+    python id_immobilier_cli.py classify "Terrain 1 lot à Bè-Kpota 12 millions"
+    python id_immobilier_cli.py clean dump.csv --format excel
+    python id_immobilier_cli.py clean gros_dump.csv --pipeline --workers 4
+    python id_immobilier_cli.py clean gros_dump.csv --memory-budget 512M
+    python id_immobilier_cli.py clean dump.csv --format csv excel --depot exports
+    python id_immobilier_cli.py preview dump.csv -n 1000 --budget 5
+    python id_immobilier_cli.py export id_immobilier_optimise_20260212.csv --format excel
+    python id_immobilier_cli.py regles --construire
+"""
+
+import argparse
+import sys
+
+
+def _cleaner(args):
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+    return IDImmobilierCleanerV2(
+        profilage=getattr(args, 'profilage', False),
+        extraction_bornee=getattr(args, 'extraction_bornee', False),
+        budget_ligne_ms=getattr(args, 'budget_ligne_ms', None),
+        tables_surface=getattr(args, 'tables_surface', None),
+        workers=None if getattr(args, 'pipeline', False) else getattr(args, 'workers', None),
+        mots_cles=getattr(args, 'mots_cles', None),
+    )
+
+
+def _depot(args):
+    """DepotExports de --depot (None sans l'option)"""
+    if not getattr(args, 'depot', None):
+        return None
+    from depot_exports import DepotExports
+    return DepotExports(args.depot)
+
+
+def commande_classify(args):
+    """Classer des titres un par un (arguments ou une ligne par titre sur l'entrée standard)"""
+    cleaner = _cleaner(args)
+    titres = args.titres if args.titres and args.titres != ['-'] else (l.strip() for l in sys.stdin)
+
+    for titre in titres:
+        if not titre:
+            continue
+        quartier, confiance = cleaner.extraire_quartier_avec_confiance(titre)
+        surface, regle_surface = cleaner.extraire_surface_avec_regle(titre)
+        prix, regle_prix = cleaner.nettoyer_prix_avec_regle({'titre_complet': titre})
+        print(f"📝 {titre}")
+        classement = cleaner.classifieur.classer(titre)
+        print(f"   Type: {classement.type_bien} ({classement.type_bien_confiance:.2f}) / "
+              f"{classement.type_offre} ({classement.type_offre_confiance:.2f})")
+        if classement.nb_pieces or classement.mots_location:
+            print(f"   Pièces: {classement.nb_pieces or '?'}, location: {classement.mots_location or '-'}")
+        print(f"   Quartier: {quartier} (confiance {confiance})")
+        print(f"   Surface: {f'{surface:g} m² ({regle_surface})' if surface else 'non trouvée'}")
+        print(f"   Prix: {f'{prix:,.0f} FCFA ({regle_prix})' if prix else 'non trouvé'}")
+
+
+def commande_clean(args):
+    """Nettoyer un dump (CSV, JSON/JSONL Apify) et l'exporter"""
+    cleaner = _cleaner(args)
+    if args.memory_budget:
+        # Morceaux adaptés à la mémoire mesurée, déversement sur disque près de la limite
+        cleaner.nettoyer_sous_budget(args.fichier, args.memory_budget, args.format, args.dossier)
+        return
+    if args.pipeline:
+        # Lecture, nettoyage et écriture simultanés : pas de DataFrame complet en mémoire
+        cleaner.nettoyer_en_pipeline(args.fichier, args.format, args.dossier, args.morceau,
+                                     workers=args.workers)
+        return
+    if args.fichier.lower().endswith(('.json', '.jsonl')):
+        df_clean, _ = cleaner.nettoyer_par_morceaux(args.fichier, args.morceau)
+    else:
+        import pandas as pd
+        df = pd.read_csv(args.fichier)
+        print(f"📂 {len(df)} lignes chargées\n")
+        df_clean = cleaner.nettoyer_dataset(df)
+
+    if len(df_clean) == 0:
+        print("⚠️ Aucune donnée valide, rien n'est exporté")
+        return
+    depot = _depot(args)
+    for format in args.format:
+        cleaner.exporter_pour_bdd(df_clean, format=format, dossier=args.dossier, depot=depot)
+
+
+def commande_preview(args):
+    """Statistiques estimées sur un échantillon (voir apercu.py)"""
+    from apercu import apercu
+    apercu(args.fichier, taille=args.n, budget_s=args.budget, cleaner=_cleaner(args))
+
+
+def commande_export(args):
+    """Réexporter un fichier déjà nettoyé (sortie de clean) dans un autre format"""
+    import pandas as pd
+    df_clean = pd.read_csv(args.fichier, encoding='utf-8-sig')
+    cleaner = _cleaner(args)
+    depot = _depot(args)
+    for format in args.format:
+        cleaner.exporter_pour_bdd(df_clean, format=format, dossier=args.dossier, depot=depot)
+
+
+def commande_regles(args):
+    """Afficher (ou reconstruire) le jeu de règles précompilé"""
+    from id_immobilier_FINAL import MOTIFS_EXTRACTION, QUARTIERS_LOME
+    from jeu_regles import CHEMIN_REGLES, charger_regles, construire_regles, ecrire_regles
+    from recherche_quartiers import ALIAS_QUARTIERS
+
+    if args.construire:
+        regles = construire_regles(QUARTIERS_LOME, ALIAS_QUARTIERS, MOTIFS_EXTRACTION)
+        ecrire_regles(regles)
+        print(f"✅ Jeu de règles reconstruit: {CHEMIN_REGLES}")
+    else:
+        regles = charger_regles(QUARTIERS_LOME, ALIAS_QUARTIERS, MOTIFS_EXTRACTION)
+    print(f"   Version: {regles['version']} (format {regles['format']})")
+    print(f"   Quartiers: {len(regles['quartiers'])} variantes, "
+          f"{len(set(regles['index']['canoniques'].values()))} noms canoniques")
+    print(f"   Index: {len(regles['index']['suppressions'])} suppressions, {len(regles['motifs'])} patterns")
+
+
+def _taille_memoire(texte):
+    """Budget mémoire en octets ('512M', '2G', 'auto'), budget_memoire importé seulement si utilisé"""
+    from budget_memoire import lire_taille
+    try:
+        return lire_taille(texte)
+    except ValueError as erreur:
+        raise argparse.ArgumentTypeError(str(erreur))
+
+
+def _options_extraction(parser):
+    parser.add_argument('--extraction-bornee', action='store_true',
+                        help="Fenêtre de texte + RE2 si installé contre les titres pathologiques")
+    parser.add_argument('--mots-cles', metavar='JSON',
+                        help="Table de mots-clés des types (forme de classification_types.MOTS_CLES)")
+    parser.add_argument('--budget-ligne-ms', type=float, default=None,
+                        help="Budget de temps d'extraction par ligne (ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ID Immobilier - nettoyage des annonces")
+    sous = parser.add_subparsers(dest='commande', required=True)
+
+    p = sous.add_parser('classify', help="Classer un ou plusieurs titres")
+    p.add_argument('titres', nargs='*', help="Titres (aucun ou '-' : entrée standard)")
+    _options_extraction(p)
+    p.set_defaults(fonction=commande_classify)
+
+    p = sous.add_parser('clean', help="Nettoyer un dump et l'exporter")
+    p.add_argument('fichier')
+    p.add_argument('--format', nargs='+', choices=['csv', 'excel'], default=['csv'])
+    p.add_argument('--dossier', default='.')
+    p.add_argument('--morceau', type=int, default=5000, help="Taille des morceaux (JSON/JSONL, --pipeline)")
+    p.add_argument('--profilage', action='store_true', help="Profiler les règles d'extraction")
+    p.add_argument('--tables-surface', metavar='JSON',
+                   help="Tables d'inférence des surfaces, relues puis complétées à chaque run")
+    p.add_argument('--workers', type=int, default=None,
+                   help="Extraction sur plusieurs cœurs (gros fichiers, voir parallele_memoire.py)")
+    p.add_argument('--pipeline', action='store_true',
+                   help="Lecture, nettoyage et écriture en parallèle (voir pipeline_nettoyage.py)")
+    p.add_argument('--memory-budget', metavar='TAILLE', type=_taille_memoire,
+                   help="Budget de RSS (ex: 512M, 2G, auto = limite du conteneur) : "
+                        "morceaux adaptatifs, déversement sur disque (voir budget_memoire.py)")
+    p.add_argument('--depot', metavar='DOSSIER',
+                   help="Dépôt adressé par contenu : exports inchangés non réécrits (voir depot_exports.py)")
+    _options_extraction(p)
+    p.set_defaults(fonction=commande_clean)
+
+    p = sous.add_parser('preview', help="Aperçu rapide sur échantillon")
+    p.add_argument('fichier')
+    p.add_argument('-n', type=int, default=1000, help="Taille de l'échantillon")
+    p.add_argument('--budget', type=float, default=10.0, help="Durée maximale de lecture (s)")
+    p.set_defaults(fonction=commande_preview)
+
+    p = sous.add_parser('export', help="Réexporter un fichier nettoyé")
+    p.add_argument('fichier')
+    p.add_argument('--format', nargs='+', choices=['csv', 'excel'], default=['excel'])
+    p.add_argument('--dossier', default='.')
+    p.add_argument('--depot', metavar='DOSSIER',
+                   help="Dépôt adressé par contenu : exports inchangés non réécrits")
+    p.set_defaults(fonction=commande_export)
+
+    p = sous.add_parser('regles', help="Jeu de règles précompilé (quartiers, index, patterns)")
+    p.add_argument('--construire', action='store_true', help="Forcer la reconstruction")
+    p.set_defaults(fonction=commande_regles)
+
+    args = parser.parse_args(argv)
+    if getattr(args, 'depot', None) and (getattr(args, 'pipeline', False) or getattr(args, 'memory_budget', None)):
+        # Ces modes écrivent les exports au fil des morceaux, sans projection complète à hacher
+        parser.error("--depot ne se combine pas avec --pipeline ni --memory-budget")
+    args.fonction(args)
+
+
+if __name__ == "__main__":
+    main()
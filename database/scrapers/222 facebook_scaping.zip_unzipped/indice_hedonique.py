@@ -0,0 +1,355 @@
+"""
+INDICE HÉDONIQUE DES PRIX - PROJET ID IMMOBILIER
+Indice de prix à qualité constante sur l'historique des annonces nettoyées :
+    log(prix_fcfa) ~ log(surface_m2) + type_bien + type_offre + quartier + période
+- Chaque ligne du plan d'expérience n'a que 6 valeurs non nulles (constante, surface
+  et une indicatrice par variable catégorielle) : la matrice n'est jamais construite,
+  X'X et X'y sont accumulés par blocs avec np.bincount sur les codes des modalités
+- L'ajustement résout un système p x p (p = nombre de modalités), indépendant de n
+- Ajout incrémental : une nouvelle période ne fait qu'ajouter ses lignes à X'X et X'y
+  (nouvelles modalités = nouvelles colonnes), sans relire l'historique ; l'état garde
+  l'empreinte SHA-256 des exports déjà intégrés, ignorés s'ils sont repassés
+
+Utilisation :
+    python indice_hedonique.py exports/*.csv --periode M --etat indice_etat.npz
+    python indice_hedonique.py --benchmark 1000000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+
+VARIABLES_CATEGORIELLES = ['type_bien', 'type_offre', 'quartier', 'periode']
+COLONNES_UTILES = ['prix_fcfa', 'surface_m2', 'type_bien', 'type_offre', 'quartier', 'date_collecte']
+
+# Colonnes continues : constante et log de la surface
+NB_CONTINUES = 2
+
+
+class IndiceHedonique:
+    """
+    Régression hédonique par équations normales accumulées
+    La première modalité vue de chaque variable sert de référence (pas de colonne)
+    """
+
+    def __init__(self, periode='M'):
+        self.periode = periode
+        self.modalites = {v: [] for v in VARIABLES_CATEGORIELLES}
+        # (variable, modalité) -> index de colonne dans X
+        self.colonnes = {}
+        self.xtx = np.zeros((NB_CONTINUES, NB_CONTINUES))
+        self.xty = np.zeros(NB_CONTINUES)
+        self.yty = 0.0
+        self.nb = 0
+        self.nb_par_periode = {}
+        # empreinte SHA-256 -> nom des exports déjà intégrés
+        self.fichiers = {}
+        self.coefficients = None
+        self.covariance = None
+
+    @property
+    def nb_colonnes(self):
+        return NB_CONTINUES + len(self.colonnes)
+
+    def _preparer(self, df):
+        """Filtrer les lignes exploitables, calculer y, log(surface) et la période"""
+        import pandas as pd
+
+        prix = pd.to_numeric(df['prix_fcfa'], errors='coerce').to_numpy(dtype=float)
+        surface = pd.to_numeric(df['surface_m2'], errors='coerce').to_numpy(dtype=float)
+        dates = pd.to_datetime(df['date_collecte'], errors='coerce')
+        garde = (prix > 0) & (surface > 0) & dates.notna().to_numpy()
+
+        valeurs = {
+            'type_bien': df['type_bien'].fillna('Non spécifié').astype(str).to_numpy()[garde],
+            'type_offre': df['type_offre'].fillna('Non spécifié').astype(str).to_numpy()[garde],
+            'quartier': df['quartier'].fillna('Non spécifié').astype(str).to_numpy()[garde],
+            'periode': dates[garde].dt.to_period(self.periode).astype(str).to_numpy(),
+        }
+        return np.log(prix[garde]), np.log(surface[garde]), valeurs
+
+    def _coder(self, variable, valeurs):
+        """
+        Index de colonne de chaque ligne (-1 pour la modalité de référence)
+        Les modalités inconnues créent de nouvelles colonnes
+        """
+        import pandas as pd
+
+        codes_locaux, uniques = pd.factorize(valeurs)
+        correspondance = np.empty(len(uniques), dtype=np.int64)
+        for i, modalite in enumerate(uniques):
+            if modalite not in self.modalites[variable]:
+                self.modalites[variable].append(modalite)
+                if len(self.modalites[variable]) > 1:
+                    self.colonnes[(variable, modalite)] = self.nb_colonnes
+            correspondance[i] = self.colonnes.get((variable, modalite), -1)
+        return correspondance[codes_locaux]
+
+    def _agrandir(self):
+        """Étendre X'X et X'y aux colonnes créées par les nouvelles modalités"""
+        p, ancien = self.nb_colonnes, len(self.xty)
+        if p == ancien:
+            return
+        xtx = np.zeros((p, p))
+        xtx[:ancien, :ancien] = self.xtx
+        self.xtx = xtx
+        self.xty = np.concatenate([self.xty, np.zeros(p - ancien)])
+
+    def ajouter(self, df):
+        """Accumuler les annonces de `df` dans X'X et X'y ; retourne le nombre de lignes retenues"""
+        import pandas as pd
+
+        y, log_surface, valeurs = self._preparer(df)
+        if len(y) == 0:
+            return 0
+
+        codes = [self._coder(v, valeurs[v]) for v in VARIABLES_CATEGORIELLES]
+        self._agrandir()
+        p = self.nb_colonnes
+
+        continues = np.column_stack([np.ones(len(y)), log_surface])
+        self.xtx[:NB_CONTINUES, :NB_CONTINUES] += continues.T @ continues
+        self.xty[:NB_CONTINUES] += continues.T @ y
+        self.yty += float(y @ y)
+
+        for i, code in enumerate(codes):
+            present = code >= 0
+            c = code[present]
+            # Bloc continues x indicatrices : sommes par modalité
+            for j in range(NB_CONTINUES):
+                somme = np.bincount(c, weights=continues[present, j], minlength=p)
+                self.xtx[j, :] += somme
+                self.xtx[NB_CONTINUES:, j] += somme[NB_CONTINUES:]
+            self.xty += np.bincount(c, weights=y[present], minlength=p)
+
+            # Blocs indicatrices x indicatrices : effectifs croisés (diagonale pour i == k)
+            for code_autre in codes[i:]:
+                deux = present & (code_autre >= 0)
+                croises = np.bincount(code[deux] * p + code_autre[deux], minlength=p * p).reshape(p, p)
+                if code_autre is code:
+                    self.xtx += croises
+                else:
+                    self.xtx += croises + croises.T
+
+        for periode, nb in pd.Series(valeurs['periode']).value_counts().items():
+            self.nb_par_periode[periode] = self.nb_par_periode.get(periode, 0) + int(nb)
+        self.nb += len(y)
+        return len(y)
+
+    def ajuster(self):
+        """Résoudre les équations normales (lstsq : tolère les modalités colinéaires)"""
+        self.coefficients, _, rang, _ = np.linalg.lstsq(self.xtx, self.xty, rcond=None)
+        residus = self.yty - 2 * self.coefficients @ self.xty + self.coefficients @ self.xtx @ self.coefficients
+        variance = max(residus, 0.0) / max(self.nb - rang, 1)
+        self.covariance = variance * np.linalg.pinv(self.xtx)
+        return self.coefficients
+
+    def indice(self, base=100.0, niveau_z=1.96):
+        """
+        Indice par période rebasé sur la première période (base 100)
+        avec intervalle de confiance à 95 % sur le log-écart à la base
+        """
+        import pandas as pd
+
+        if self.coefficients is None:
+            self.ajuster()
+
+        periodes = sorted(self.modalites['periode'])
+        index = [self.colonnes.get(('periode', p), -1) for p in periodes]
+        beta = np.array([self.coefficients[i] if i >= 0 else 0.0 for i in index])
+        variances = np.array([self.covariance[i, i] if i >= 0 else 0.0 for i in index])
+        covariances = np.array([self.covariance[i, index[0]] if i >= 0 and index[0] >= 0 else 0.0
+                                for i in index])
+
+        ecart = beta - beta[0]
+        erreur = np.sqrt(np.maximum(variances + variances[0] - 2 * covariances, 0.0))
+        return pd.DataFrame({
+            'periode': periodes,
+            'indice': base * np.exp(ecart),
+            'ic_bas': base * np.exp(ecart - niveau_z * erreur),
+            'ic_haut': base * np.exp(ecart + niveau_z * erreur),
+            'nb_annonces': [self.nb_par_periode.get(p, 0) for p in periodes],
+        })
+
+    def effets(self, variable):
+        """Effet multiplicatif de chaque modalité d'une variable par rapport à la référence"""
+        if self.coefficients is None:
+            self.ajuster()
+        return {m: float(np.exp(self.coefficients[self.colonnes[(variable, m)]]))
+                if (variable, m) in self.colonnes else 1.0
+                for m in self.modalites[variable]}
+
+    def afficher(self):
+        """Rapport console"""
+        indice = self.indice()
+        print("=" * 70)
+        print(f"📈 INDICE HÉDONIQUE DES PRIX ({self.nb:,} annonces, {self.nb_colonnes} paramètres)")
+        print("=" * 70)
+        print(f"Élasticité prix / surface: {self.coefficients[1]:.3f}")
+        print(indice.to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+        print("=" * 70)
+        return indice
+
+    def sauvegarder(self, chemin):
+        """État accumulé (X'X, X'y, modalités) dans un .npz pour les ajouts suivants"""
+        meta = {
+            'periode': self.periode,
+            'modalites': self.modalites,
+            'colonnes': [[v, m, i] for (v, m), i in self.colonnes.items()],
+            'yty': self.yty,
+            'nb': self.nb,
+            'nb_par_periode': self.nb_par_periode,
+            'fichiers': self.fichiers,
+        }
+        np.savez(chemin, xtx=self.xtx, xty=self.xty, meta=np.array(json.dumps(meta, ensure_ascii=False)))
+
+    @classmethod
+    def charger(cls, chemin):
+        donnees = np.load(chemin)
+        meta = json.loads(str(donnees['meta']))
+        modele = cls(meta['periode'])
+        modele.modalites = meta['modalites']
+        modele.colonnes = {(v, m): i for v, m, i in meta['colonnes']}
+        modele.xtx = donnees['xtx']
+        modele.xty = donnees['xty']
+        modele.yty = meta['yty']
+        modele.nb = meta['nb']
+        modele.nb_par_periode = meta['nb_par_periode']
+        modele.fichiers = meta.get('fichiers', {})
+        return modele
+
+
+def charger_exports(chemins):
+    """Concaténer les exports nettoyés (colonnes utiles seulement)"""
+    import pandas as pd
+    return pd.concat([pd.read_csv(c, usecols=COLONNES_UTILES, encoding='utf-8-sig') for c in chemins],
+                     ignore_index=True)
+
+
+# ============================================
+# BENCHMARK SUR DONNÉES SYNTHÉTIQUES
+# ============================================
+
+def generer_annonces(nb, nb_periodes=12, nb_quartiers=80, graine=0):
+    """Annonces synthétiques avec un indice connu (+1 % par mois) et des effets quartier"""
+    import pandas as pd
+
+    rng = np.random.default_rng(graine)
+    periode = rng.integers(0, nb_periodes, nb)
+    quartier = rng.integers(0, nb_quartiers, nb)
+    type_bien = rng.choice(['Terrain', 'Villa', 'Maison', 'Appartement'], nb)
+    type_offre = rng.choice(['Vente', 'Location'], nb, p=[0.8, 0.2])
+    surface = np.exp(rng.normal(6.0, 0.6, nb))
+
+    effet_quartier = rng.normal(0, 0.3, nb_quartiers)
+    log_prix = (8.0 + 0.9 * np.log(surface) + effet_quartier[quartier] + 0.01 * periode
+                + np.where(type_offre == 'Location', -4.0, 0.0) + rng.normal(0, 0.25, nb))
+
+    dates = pd.Timestamp('2026-01-01') + pd.to_timedelta(periode * 31, unit='D')
+    return pd.DataFrame({
+        'prix_fcfa': np.exp(log_prix).round(),
+        'surface_m2': surface.round(1),
+        'type_bien': type_bien,
+        'type_offre': type_offre,
+        'quartier': np.array([f'Quartier {q}' for q in range(nb_quartiers)])[quartier],
+        'date_collecte': dates.strftime('%Y-%m-%d'),
+    })
+
+
+def benchmark(nb=1_000_000):
+    """Ajustement complet, ajout incrémental d'une période et contrôle contre lstsq dense"""
+    df = generer_annonces(nb)
+    periodes = df['date_collecte'].str[:7]
+    derniere = periodes.max()
+
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK INDICE HÉDONIQUE - {nb:,} annonces")
+    print("=" * 70)
+
+    debut = time.perf_counter()
+    modele = IndiceHedonique()
+    modele.ajouter(df[periodes != derniere])
+    modele.ajuster()
+    print(f"   Historique ({modele.nb:,} lignes)  : {time.perf_counter() - debut:6.2f} s")
+
+    debut = time.perf_counter()
+    modele.ajouter(df[periodes == derniere])
+    modele.ajuster()
+    print(f"   Ajout de la période {derniere}  : {time.perf_counter() - debut:6.2f} s")
+
+    indice = modele.indice()
+    attendu = 100 * np.exp(0.01 * np.arange(len(indice)))
+    print(f"   Écart max à l'indice simulé  : {np.abs(indice['indice'] - attendu).max():.2f} points")
+
+    # Contrôle sur un sous-échantillon : même résultat que la matrice dense complète
+    petit = df.sample(20_000, random_state=0)
+    controle = IndiceHedonique()
+    controle.ajouter(petit)
+    controle.ajuster()
+    y, log_surface, valeurs = controle._preparer(petit)
+    x = np.zeros((len(y), controle.nb_colonnes))
+    x[:, 0], x[:, 1] = 1.0, log_surface
+    for variable in VARIABLES_CATEGORIELLES:
+        for ligne, modalite in enumerate(valeurs[variable]):
+            colonne = controle.colonnes.get((variable, modalite))
+            if colonne is not None:
+                x[ligne, colonne] = 1.0
+    dense = np.linalg.lstsq(x, y, rcond=None)[0]
+    print(f"   Écart aux coefficients denses: {np.abs(dense - controle.coefficients).max():.2e}")
+    print("=" * 70)
+    return modele
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indice hédonique des prix ID Immobilier")
+    parser.add_argument('fichiers', nargs='*', help="Exports nettoyés (id_immobilier_optimise_*.csv)")
+    parser.add_argument('--periode', default=None,
+                        help="Fréquence des périodes (M, W, Q... ; défaut M, ou celle de l'état repris)")
+    parser.add_argument('--etat', help="État .npz : repris s'il existe, mis à jour après ajout")
+    parser.add_argument('--sortie', help="Écrire l'indice dans ce CSV")
+    parser.add_argument('--benchmark', type=int, nargs='?', const=1_000_000, metavar='N')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+
+    import os
+    from archive_brute import empreinte_fichier
+    if args.etat and os.path.exists(args.etat):
+        modele = IndiceHedonique.charger(args.etat)
+        if args.periode and args.periode != modele.periode:
+            parser.error(f"--periode {args.periode} incompatible avec l'état {args.etat} "
+                         f"(périodes {modele.periode})")
+    else:
+        modele = IndiceHedonique(args.periode or 'M')
+
+    # Un export déjà intégré compterait ses lignes deux fois dans X'X et X'y
+    nouveaux = {}
+    for chemin in args.fichiers:
+        empreinte = empreinte_fichier(chemin)
+        if empreinte in modele.fichiers or empreinte in nouveaux:
+            print(f"   ⚠️ {os.path.basename(chemin)} déjà intégré, ignoré")
+        else:
+            nouveaux[empreinte] = chemin
+    if nouveaux:
+        modele.ajouter(charger_exports(list(nouveaux.values())))
+        modele.fichiers.update({e: os.path.basename(c) for e, c in nouveaux.items()})
+    if modele.nb == 0:
+        print("⚠️ Aucune annonce exploitable")
+        return
+
+    modele.ajuster()
+    indice = modele.afficher()
+    if args.etat:
+        modele.sauvegarder(args.etat)
+    if args.sortie:
+        indice.to_csv(args.sortie, index=False, encoding='utf-8-sig')
+        print(f"✅ Indice exporté: {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+TABLES D'INFÉRENCE DES SURFACES - PROJET ID IMMOBILIER
+Remplace les tranches de prix codées en dur de inferer_surface_intelligente :
+- Apprentissage sur les annonces dont la surface a réellement été extraite du titre
+- Par (type_offre, type_bien, quartier) : tranches de prix (quantiles) et prix/m² médian
+  de chaque tranche ; repli sur (type_offre, type_bien). Jamais de table commune à
+  plusieurs types de bien : une ligne sans table de son type passe aux règles fixes
+  (inferer_surface_intelligente)
+- Inférence vectorisée sur toute la colonne : une seule recherche np.searchsorted
+- Observations conservées par échantillonnage (reservoir) et persistées en JSON,
+  complétées à chaque nettoyage
+
+La vente et la location sont séparées : un loyer mensuel n'a pas la même échelle
+qu'un prix de vente.
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+# Observations gardées par clé (reservoir) et minimum pour utiliser une clé
+MAX_OBSERVATIONS = 500
+MIN_OBSERVATIONS = 5
+
+# Une tranche de prix pour 10 observations, au plus 4 (quartiles)
+OBSERVATIONS_PAR_TRANCHE = 10
+MAX_TRANCHES = 4
+
+# Niveaux de la hiérarchie : 0 = quartier, 1 = type de bien
+NIVEAUX = 2
+
+# 0 <= log(prix) < 64 pour tout prix en FCFA : clé k et prix p -> k * 64 + log(p),
+# ce qui met les bornes de toutes les clés dans un seul tableau trié
+DECALAGE = 64.0
+
+# Plage réaliste des surfaces inférées (comme l'ancienne règle au prix/m² fixe)
+SURFACE_MIN = 20
+SURFACE_MAX = 5000
+
+TOUS = '*'
+
+
+def _cles(type_offre, type_bien, quartier, niveau):
+    """Clés d'un niveau de la hiérarchie : 0 = quartier, 1 = type de bien"""
+    import pandas as pd
+
+    offre = pd.Series(type_offre, dtype=object).astype(str).to_numpy()
+    bien = pd.Series(type_bien, dtype=object).astype(str).to_numpy()
+    if niveau == 1:
+        return offre + '|' + bien + f'|{TOUS}'
+    return offre + '|' + bien + '|' + pd.Series(quartier, dtype=object).astype(str).to_numpy()
+
+
+class TablesSurface:
+    """Observations (prix, prix/m²) par clé et tables de tranches compilées"""
+
+    def __init__(self, chemin=None, graine=0):
+        self.chemin = chemin
+        self.aleatoire = np.random.default_rng(graine)
+        # clé -> {'vus': nb observations rencontrées, 'prix': [...], 'prix_m2': [...]}
+        self.observations = {}
+        self._compile = None
+        # Annonces apprises à transmettre (worker d'un pool), None si non journalisées
+        self.journal = None
+        if chemin and os.path.exists(chemin):
+            with open(chemin, encoding='utf-8') as f:
+                self.observations = json.load(f)['observations']
+
+    def apprendre(self, prix, surface, type_offre, type_bien, quartier):
+        """Ajouter des annonces à surface extraite (tableaux alignés)"""
+        import pandas as pd
+
+        prix = np.asarray(prix, dtype=float)
+        surface = np.asarray(surface, dtype=float)
+        garde = (prix > 0) & (surface > 0)
+        if not garde.any():
+            return 0
+
+        quartier = np.asarray(quartier, dtype=object)
+        if self.journal is not None:
+            self.journal.append((prix[garde], surface[garde],
+                                 *(np.asarray(v, dtype=object)[garde] for v in (type_offre, type_bien, quartier))))
+        for niveau in range(NIVEAUX):
+            cles = _cles(type_offre, type_bien, quartier, niveau)
+            selection = garde & (quartier != 'Non spécifié') if niveau == 0 else garde
+            groupes = pd.Series(np.flatnonzero(selection)).groupby(cles[selection])
+            for cle, lignes in groupes:
+                lignes = lignes.to_numpy()
+                self._ajouter(cle, prix[lignes], prix[lignes] / surface[lignes])
+
+        self._compile = None
+        return int(garde.sum())
+
+    def journaliser(self):
+        """Garder les annonces apprises (voir vider_journal) : tables d'un processus worker"""
+        self.journal = []
+
+    def vider_journal(self):
+        """Annonces apprises depuis le dernier appel, à rejouer par apprendre() dans le parent"""
+        journal, self.journal = self.journal or [], []
+        return journal
+
+    def _ajouter(self, cle, prix, prix_m2):
+        """Reservoir sampling : chaque observation vue a la même chance d'être gardée"""
+        entree = self.observations.setdefault(cle, {'vus': 0, 'prix': [], 'prix_m2': []})
+        for p, pm2 in zip(prix.tolist(), prix_m2.tolist()):
+            entree['vus'] += 1
+            if len(entree['prix']) < MAX_OBSERVATIONS:
+                entree['prix'].append(p)
+                entree['prix_m2'].append(pm2)
+            else:
+                j = int(self.aleatoire.integers(entree['vus']))
+                if j < MAX_OBSERVATIONS:
+                    entree['prix'][j] = p
+                    entree['prix_m2'][j] = pm2
+
+    def _compiler(self):
+        """
+        Tables plates pour la recherche vectorisée :
+        bornes décalées de toutes les clés (triées) + prix/m² médian de chaque tranche
+        """
+        cles, bornes, medianes, debuts = [], [], [], []
+        for cle, entree in sorted(self.observations.items()):
+            prix = np.asarray(entree['prix'])
+            # Les clés par type d'offre seul (anciens fichiers) mélangent les types de bien
+            if len(prix) < MIN_OBSERVATIONS or cle.split('|')[1] == TOUS:
+                continue
+            prix_m2 = np.asarray(entree['prix_m2'])
+            nb_tranches = min(MAX_TRANCHES, max(1, len(prix) // OBSERVATIONS_PAR_TRANCHE))
+            interieures = np.unique(np.quantile(prix, np.arange(1, nb_tranches) / nb_tranches))
+            tranches = np.digitize(prix, interieures)
+            # Prix à égalité : une tranche peut rester vide, fusionnée avec sa voisine
+            # (la 1re tranche non vide devient la tranche 0, les autres gardent leur borne)
+            presentes = np.unique(tranches)
+            if len(presentes) < len(interieures) + 1:
+                interieures = interieures[presentes[1:] - 1]
+                tranches = np.digitize(prix, interieures)
+
+            k = len(cles)
+            cles.append(cle)
+            debuts.append(len(medianes))
+            bornes.extend(k * DECALAGE + np.log(np.maximum(interieures, 1)))
+            medianes.extend(float(np.median(prix_m2[tranches == t])) for t in range(len(interieures) + 1))
+
+        import pandas as pd
+        self._compile = {
+            'index': pd.Index(cles),
+            'bornes': np.asarray(bornes, dtype=float),
+            'medianes': np.asarray(medianes, dtype=float),
+            # Position de la 1re borne de la clé k dans `bornes` = debuts[k] - k
+            'debuts': np.asarray(debuts, dtype=np.int64),
+        }
+        return self._compile
+
+    def estimer(self, prix, type_offre, type_bien, quartier):
+        """
+        Surface estimée (NaN si aucune table ne couvre la ligne) et niveau utilisé
+        (0 = quartier, 1 = type de bien, -1 = aucun : règles fixes)
+        """
+        tables = self._compile or self._compiler()
+        prix = np.asarray(prix, dtype=float)
+        quartier = np.asarray(quartier, dtype=object)
+        prix_m2 = np.full(len(prix), np.nan)
+        niveaux = np.full(len(prix), -1, dtype=np.int8)
+        if len(tables['index']) == 0:
+            return prix_m2, niveaux
+
+        log_prix = np.log(np.maximum(np.nan_to_num(prix), 1))
+        for niveau in range(NIVEAUX):
+            k = tables['index'].get_indexer(_cles(type_offre, type_bien, quartier, niveau))
+            a_faire = (k >= 0) & np.isnan(prix_m2) & (prix > 0)
+            if niveau == 0:
+                a_faire &= quartier != 'Non spécifié'
+            if not a_faire.any():
+                continue
+            k = k[a_faire]
+            # Tranche = nombre de bornes de la clé <= prix (np.digitize, toutes clés d'un coup)
+            position = np.searchsorted(tables['bornes'], k * DECALAGE + log_prix[a_faire], side='right')
+            tranche = position - (tables['debuts'][k] - k)
+            prix_m2[a_faire] = tables['medianes'][tables['debuts'][k] + tranche]
+            niveaux[a_faire] = niveau
+
+        surface = np.clip(np.round(prix / prix_m2, 1), SURFACE_MIN, SURFACE_MAX)
+        # Aucune surface (prix/m² médian inconnu) : la ligne revient aux règles fixes
+        niveaux[np.isnan(surface)] = -1
+        return surface, niveaux
+
+    def resume(self):
+        """Nombre de clés utilisables par niveau"""
+        tables = self._compile or self._compiler()
+        resume = {0: 0, 1: 0}
+        for cle in tables['index']:
+            resume[1 if cle.split('|')[2] == TOUS else 0] += 1
+        return resume
+
+    def sauvegarder(self, chemin=None):
+        """Écriture atomique des observations"""
+        chemin = chemin or self.chemin
+        if not chemin:
+            return
+        temporaire = chemin + '.tmp'
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump({'format': 1, 'observations': self.observations}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporaire, chemin)
@@ -0,0 +1,240 @@
+"""
+INGESTION APIFY JSON / JSONL - PROJET ID IMMOBILIER
+Lit les datasets Apify d'origine au lieu de l'export CSV aplati (178 colonnes) :
+- Lecture incrémentale (une ligne JSONL ou un élément du tableau JSON à la fois)
+- Seuls les chemins imbriqués utiles (niveaux_champs + titres/prix) sont extraits
+- Colonnes typées dès la lecture (prix en float, statuts en booléens)
+
+orjson et ijson sont utilisés s'ils sont installés (pip install orjson ijson),
+sinon le module json standard prend le relais.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+try:
+    import orjson
+    _charger_json = orjson.loads
+except ImportError:
+    _charger_json = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# Champs lus par IDImmobilierCleanerV2 en plus des 3 niveaux
+CHAMPS_EXTRAS = [
+    'custom_sub_titles_with_rendering_flags/0/subtitle',
+    'comparable_price',
+]
+
+# Typage des colonnes (les autres restent des chaînes)
+CHAMPS_NUMERIQUES = {'listing_price/amount', 'comparable_price'}
+CHAMPS_BOOLEENS = {'is_sold', 'is_live', 'is_pending', 'is_hidden'}
+CHAMPS_TEXTE = {'id', 'marketplace_listing_category_id'}
+
+
+def champs_utilises(niveaux_champs):
+    """Liste ordonnée des chemins à extraire (3 niveaux + extras)"""
+    champs = []
+    for niveau in niveaux_champs.values():
+        champs.extend(niveau)
+    champs.extend(CHAMPS_EXTRAS)
+    return list(dict.fromkeys(champs))
+
+
+def compiler_chemin(chemin):
+    """'location/reverse_geocode/city' -> ('location', 'reverse_geocode', 'city') ; '0' -> index"""
+    return tuple(int(p) if p.isdigit() else p for p in chemin.split('/'))
+
+
+def extraire(enregistrement, chemin_compile):
+    """Valeur au bout d'un chemin imbriqué (None si absent)"""
+    valeur = enregistrement
+    for cle in chemin_compile:
+        try:
+            valeur = valeur[cle]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return valeur
+
+
+def _typer(champ, valeurs):
+    """Convertir une colonne brute selon son type attendu"""
+    if champ in CHAMPS_NUMERIQUES:
+        sortie = []
+        for v in valeurs:
+            try:
+                sortie.append(float(v) if v is not None else None)
+            except (TypeError, ValueError):
+                sortie.append(None)
+        return sortie
+    if champ in CHAMPS_BOOLEENS:
+        return [v if isinstance(v, bool) or v is None else str(v).lower() == 'true' for v in valeurs]
+    if champ in CHAMPS_TEXTE:
+        return [str(v) if v is not None else None for v in valeurs]
+    return valeurs
+
+
+def iterer_enregistrements(chemin):
+    """Itérer sur les enregistrements d'un dataset Apify (.jsonl ou .json)"""
+    if chemin.lower().endswith('.jsonl'):
+        with open(chemin, 'rb') as f:
+            for ligne in f:
+                if ligne.strip():
+                    yield _charger_json(ligne)
+    elif ijson is not None:
+        with open(chemin, 'rb') as f:
+            # use_float : pas de Decimal, les prix restent des nombres natifs
+            yield from ijson.items(f, 'item', use_float=True)
+    else:
+        with open(chemin, 'rb') as f:
+            yield from _charger_json(f.read())
+
+
+def lire_apify(chemin, champs, taille_morceau=5000):
+    """
+    Lire un dataset Apify par morceaux de `taille_morceau` enregistrements
+    Chaque morceau est un DataFrame étroit aux colonnes nommées comme dans le CSV aplati
+    """
+    import pandas as pd
+
+    chemins = [(champ, compiler_chemin(champ)) for champ in champs]
+    colonnes = {champ: [] for champ in champs}
+    nb = 0
+
+    for enregistrement in iterer_enregistrements(chemin):
+        for champ, chemin_compile in chemins:
+            colonnes[champ].append(extraire(enregistrement, chemin_compile))
+        nb += 1
+        if nb == taille_morceau:
+            yield pd.DataFrame({c: _typer(c, v) for c, v in colonnes.items()})
+            colonnes = {champ: [] for champ in champs}
+            nb = 0
+
+    if nb:
+        yield pd.DataFrame({c: _typer(c, v) for c, v in colonnes.items()})
+
+
+# ============================================
+# BENCHMARK CSV APLATI vs JSONL
+# ============================================
+
+def _imbriquer(ligne):
+    """Reconstruire l'enregistrement Apify imbriqué depuis une ligne CSV aplatie"""
+    racine = {}
+    for colonne, valeur in ligne.items():
+        if valeur is None or (isinstance(valeur, float) and valeur != valeur):
+            continue
+        parties = colonne.split('/')
+        noeud = racine
+        for partie, suivante in zip(parties, parties[1:]):
+            cle = int(partie) if isinstance(noeud, list) else partie
+            if isinstance(noeud, list):
+                while len(noeud) <= cle:
+                    noeud.append(None)
+                if noeud[cle] is None:
+                    noeud[cle] = [] if suivante.isdigit() else {}
+                noeud = noeud[cle]
+            else:
+                noeud = noeud.setdefault(cle, [] if suivante.isdigit() else {})
+        feuille = parties[-1]
+        if isinstance(noeud, list):
+            feuille = int(feuille)
+            while len(noeud) <= feuille:
+                noeud.append(None)
+            noeud[feuille] = valeur
+        elif isinstance(noeud, dict):
+            noeud[feuille] = valeur
+    return racine
+
+
+def benchmark(fichier_csv, repetitions=50, taille_morceau=5000):
+    """
+    Comparer le nettoyage depuis le CSV aplati et depuis le JSONL équivalent
+    Le dump est répété `repetitions` fois pour obtenir un volume mesurable
+    """
+    import pandas as pd
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+
+    dossier = tempfile.mkdtemp(prefix='id_immobilier_apify_')
+    df = pd.read_csv(fichier_csv)
+    df = pd.concat([df] * repetitions, ignore_index=True)
+    chemin_csv = os.path.join(dossier, 'dataset.csv')
+    chemin_jsonl = os.path.join(dossier, 'dataset.jsonl')
+    df.to_csv(chemin_csv, index=False)
+    with open(chemin_jsonl, 'w', encoding='utf-8') as f:
+        for ligne in df.to_dict(orient='records'):
+            f.write(json.dumps(_imbriquer(ligne), ensure_ascii=False) + '\n')
+
+    cleaner = IDImmobilierCleanerV2()
+    champs = champs_utilises(cleaner.niveaux_champs)
+    try:
+        return _mesurer(cleaner, champs, df, chemin_csv, chemin_jsonl, taille_morceau)
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def _mesurer(cleaner, champs, df, chemin_csv, chemin_jsonl, taille_morceau):
+    """Chronométrer lecture seule puis nettoyage complet sur les deux formats"""
+    import pandas as pd
+
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK CSV vs JSONL - {len(df)} annonces, {df.shape[1]} colonnes aplaties")
+    print("=" * 70)
+
+    debut = time.perf_counter()
+    morceaux = list(pd.read_csv(chemin_csv, chunksize=taille_morceau))
+    lecture_csv = time.perf_counter() - debut
+    debut = time.perf_counter()
+    morceaux_json = list(lire_apify(chemin_jsonl, champs, taille_morceau))
+    lecture_json = time.perf_counter() - debut
+
+    memoire_csv = sum(m.memory_usage(deep=True).sum() for m in morceaux)
+    memoire_json = sum(m.memory_usage(deep=True).sum() for m in morceaux_json)
+    print(f"   Lecture CSV aplati : {lecture_csv:6.2f} s  ({memoire_csv / 1e6:7.1f} Mo en mémoire)")
+    print(f"   Lecture JSONL      : {lecture_json:6.2f} s  ({memoire_json / 1e6:7.1f} Mo en mémoire)"
+          f"  [{'orjson' if _charger_json is not json.loads else 'json'}]")
+
+    debut = time.perf_counter()
+    valides_csv, _ = cleaner.nettoyer_par_morceaux(chemin_csv, taille_morceau)
+    total_csv = time.perf_counter() - debut
+    debut = time.perf_counter()
+    valides_json, _ = cleaner.nettoyer_par_morceaux(chemin_jsonl, taille_morceau)
+    total_json = time.perf_counter() - debut
+
+    print(f"   Nettoyage complet CSV   : {total_csv:6.2f} s ({len(valides_csv)} valides)")
+    print(f"   Nettoyage complet JSONL : {total_json:6.2f} s ({len(valides_json)} valides)")
+    print("=" * 70)
+
+    return {'lecture_csv': lecture_csv, 'lecture_jsonl': lecture_json,
+            'total_csv': total_csv, 'total_jsonl': total_json}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion des datasets Apify JSON/JSONL")
+    parser.add_argument('fichier', help="Dataset .json/.jsonl (ou CSV aplati avec --benchmark)")
+    parser.add_argument('--benchmark', action='store_true', help="Comparer au chemin CSV aplati")
+    parser.add_argument('--repetitions', type=int, default=50)
+    parser.add_argument('--morceau', type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.fichier, args.repetitions, args.morceau)
+        return
+
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+    cleaner = IDImmobilierCleanerV2()
+    df_valide, _ = cleaner.nettoyer_par_morceaux(args.fichier, args.morceau)
+    if len(df_valide) > 0:
+        cleaner.exporter_pour_bdd(df_valide, format='csv')
+
+
+if __name__ == "__main__":
+    main()
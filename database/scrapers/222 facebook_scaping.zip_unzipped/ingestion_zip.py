@@ -0,0 +1,171 @@
+"""
+INGESTION DES ARCHIVES ZIP - PROJET ID IMMOBILIER
+Lit les dumps des scrapers directement dans les archives (facebook_scaping.zip, ...) :
+- Chaque membre CSV est lu en flux, sans extraction sur disque
+- Les membres indépendants sont nettoyés en parallèle (un processus par membre)
+- Les membres déjà traités (même CRC et même taille) sont ignorés
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+# Registre des membres déjà ingérés, à côté des archives
+REGISTRE_DEFAUT = '.archives_traitees.json'
+
+# Colonnes qui signalent un dump brut Marketplace (les exports nettoyés ont 'id_bien')
+COLONNES_DUMP_BRUT = {'id', 'marketplace_listing_title'}
+
+
+def signature(chemin_zip, info):
+    """Identifiant d'un membre : archive + nom, et empreinte CRC/taille"""
+    cle = f'{os.path.basename(chemin_zip)}::{info.filename}'
+    return cle, {'crc': info.CRC, 'taille': info.file_size}
+
+
+def ouvrir_membre(archive, info):
+    """Flux texte sur un membre CSV (décompression à la volée)"""
+    return io.TextIOWrapper(archive.open(info), encoding='utf-8-sig', errors='replace', newline='')
+
+
+def est_dump_brut(archive, info):
+    """Vérifier sur l'en-tête seul que le membre est un dump brut de scraper"""
+    with ouvrir_membre(archive, info) as flux:
+        entete = flux.readline()
+    colonnes = {c.strip().strip('"') for c in entete.split(',')}
+    return COLONNES_DUMP_BRUT <= colonnes
+
+
+class RegistreIngestion:
+    """Mémorise les membres déjà traités (fichier JSON)"""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.entrees = {}
+        if os.path.exists(chemin):
+            with open(chemin, encoding='utf-8') as f:
+                self.entrees = json.load(f)
+
+    def deja_traite(self, cle, empreinte):
+        return self.entrees.get(cle) == empreinte
+
+    def marquer(self, cle, empreinte):
+        self.entrees[cle] = empreinte
+
+    def sauvegarder(self):
+        temporaire = self.chemin + '.tmp'
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(self.entrees, f, indent=2, ensure_ascii=False)
+        os.replace(temporaire, self.chemin)
+
+
+def lister_membres(chemins_zip, registre=None):
+    """
+    Membres CSV à traiter : dumps bruts, non encore vus dans le registre
+    Retourne [(chemin_zip, nom_membre, cle, empreinte)] et le nombre de membres ignorés
+    """
+    a_traiter, ignores = [], 0
+    for chemin_zip in chemins_zip:
+        with zipfile.ZipFile(chemin_zip) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith('.csv'):
+                    continue
+                if info.filename.startswith('__MACOSX/'):
+                    continue
+                cle, empreinte = signature(chemin_zip, info)
+                if registre is not None and registre.deja_traite(cle, empreinte):
+                    ignores += 1
+                    continue
+                if not est_dump_brut(archive, info):
+                    ignores += 1
+                    continue
+                a_traiter.append((chemin_zip, info.filename, cle, empreinte))
+    return a_traiter, ignores
+
+
+def nettoyer_membre(chemin_zip, nom_membre, taille_morceau=5000):
+    """Nettoyer un membre d'archive en flux (exécuté dans un processus du pool)"""
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+
+    cleaner = IDImmobilierCleanerV2()
+    with zipfile.ZipFile(chemin_zip) as archive:
+        with ouvrir_membre(archive, archive.getinfo(nom_membre)) as flux:
+            with contextlib.redirect_stdout(io.StringIO()):
+                df_valide, nb_lignes = cleaner.nettoyer_par_morceaux(flux, taille_morceau)
+    return df_valide, nb_lignes
+
+
+def ingerer_archives(chemins_zip, registre=None, workers=None, taille_morceau=5000):
+    """
+    Nettoyer tous les nouveaux dumps contenus dans les archives
+    Retourne le DataFrame des données valides (toutes archives confondues) et les
+    membres traités [(cle, empreinte)] : l'appelant les marque dans le registre une
+    fois l'export réussi, sinon une erreur d'export perdrait ces données
+    """
+    import pandas as pd
+
+    membres, ignores = lister_membres(chemins_zip, registre)
+
+    print("=" * 70)
+    print(f"📦 INGESTION ZIP - {len(membres)} membre(s) à traiter, {ignores} ignoré(s)")
+    print("=" * 70)
+
+    resultats = [None] * len(membres)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        taches = {
+            pool.submit(nettoyer_membre, chemin_zip, nom, taille_morceau): i
+            for i, (chemin_zip, nom, _, _) in enumerate(membres)
+        }
+        for tache in as_completed(taches):
+            i = taches[tache]
+            chemin_zip, nom, _, _ = membres[i]
+            df_valide, nb_lignes = tache.result()
+            resultats[i] = df_valide
+            print(f"   ✓ {os.path.basename(chemin_zip)} › {nom}: {len(df_valide)}/{nb_lignes} valides")
+
+    traites = [(cle, empreinte) for _, _, cle, empreinte in membres]
+    # Ordre des archives et des membres, pas ordre de fin des processus
+    resultats = [df for df in resultats if len(df) > 0]
+    if not resultats:
+        return pd.DataFrame(), traites
+    # Un même listing peut apparaître dans plusieurs dumps : on garde la dernière occurrence
+    return pd.concat(resultats, ignore_index=True).drop_duplicates('id_bien', keep='last'), traites
+
+
+def main():
+    """Ingérer les archives passées en argument et exporter les données valides"""
+    parser = argparse.ArgumentParser(description="Nettoyer les dumps contenus dans des archives ZIP")
+    parser.add_argument('archives', nargs='+', help="Archives ZIP des scrapers")
+    parser.add_argument('--registre', default=None,
+                        help=f"Registre des membres traités (défaut: {REGISTRE_DEFAUT} à côté de la 1re archive)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--morceau', type=int, default=5000, help="Lignes par morceau")
+    parser.add_argument('--format', default='csv', choices=['csv', 'excel'])
+    parser.add_argument('--sortie', default='.')
+    args = parser.parse_args()
+
+    registre = RegistreIngestion(args.registre or os.path.join(
+        os.path.dirname(os.path.abspath(args.archives[0])), REGISTRE_DEFAUT))
+    df_valide, traites = ingerer_archives(args.archives, registre, args.workers, args.morceau)
+
+    if len(df_valide) > 0:
+        from id_immobilier_FINAL import IDImmobilierCleanerV2
+        IDImmobilierCleanerV2().exporter_pour_bdd(df_valide, format=args.format, dossier=args.sortie)
+    elif traites:
+        print("\n⚠️ Aucune donnée valide dans les nouveaux dumps")
+    else:
+        print("\n⚠️ Aucun nouveau dump à nettoyer")
+
+    # Seulement après l'export : un export en échec laisse ces membres à retraiter
+    for cle, empreinte in traites:
+        registre.marquer(cle, empreinte)
+    registre.sauvegarder()
+
+
+if __name__ == "__main__":
+    main()
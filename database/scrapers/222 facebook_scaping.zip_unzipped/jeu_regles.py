@@ -0,0 +1,91 @@
+"""
+JEU DE RÈGLES PRÉCOMPILÉ - PROJET ID IMMOBILIER
+Les tables dérivées des listes de quartiers et des patterns sont construites une fois
+et enregistrées dans regles_id_immobilier.json :
+- Liste des quartiers dédoublonnée et triée, avec formes normalisées et nom canonique
+- Index SymSpell (canoniques + suppressions) de recherche_quartiers
+- Patterns d'extraction
+Le fichier porte une version (empreinte des sources) : s'il ne correspond plus aux
+listes du code, il est reconstruit et réécrit automatiquement.
+
+Reconstruction manuelle :
+    python id_immobilier_cli.py regles --construire
+"""
+
+import hashlib
+import json
+import os
+
+
+FORMAT_REGLES = 1
+CHEMIN_REGLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'regles_id_immobilier.json')
+
+# Jeux déjà chargés dans ce processus : (chemin, version) -> règles
+_CHARGES = {}
+
+
+def empreinte(quartiers, alias, motifs):
+    """Version du jeu de règles : empreinte SHA-256 des sources"""
+    contenu = json.dumps({'format': FORMAT_REGLES, 'quartiers': list(quartiers),
+                          'alias': alias, 'motifs': motifs},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenu.encode('utf-8')).hexdigest()[:16]
+
+
+def construire_regles(quartiers, alias, motifs):
+    """Calculer toutes les tables dérivées"""
+    from recherche_quartiers import IndexQuartiers, normaliser
+
+    liste = sorted(set(q.lower().strip() for q in quartiers))
+    index = IndexQuartiers(liste, alias)
+    # Recherche exacte : [quartier, forme normalisée, forme sans espace ni tiret, canonique]
+    table_exacte = []
+    for quartier in liste:
+        quartier_norm = normaliser(quartier)
+        table_exacte.append([quartier, quartier_norm, quartier_norm.replace('-', '').replace(' ', ''),
+                             index.canonique(quartier)])
+
+    return {
+        'format': FORMAT_REGLES,
+        'version': empreinte(quartiers, alias, motifs),
+        'quartiers': liste,
+        'table_exacte': table_exacte,
+        'motifs': motifs,
+        'index': index.exporter(),
+    }
+
+
+def ecrire_regles(regles, chemin=CHEMIN_REGLES):
+    """Écriture atomique (fichier temporaire puis renommage)"""
+    temporaire = chemin + '.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(regles, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporaire, chemin)
+
+
+def charger_regles(quartiers, alias, motifs, chemin=CHEMIN_REGLES):
+    """
+    Jeu de règles à jour pour ces sources : lu depuis le fichier précompilé,
+    ou reconstruit (puis réécrit si possible) s'il est absent ou périmé
+    """
+    version = empreinte(quartiers, alias, motifs)
+    if (chemin, version) in _CHARGES:
+        return _CHARGES[(chemin, version)]
+
+    regles = None
+    try:
+        with open(chemin, encoding='utf-8') as f:
+            regles = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if not regles or regles.get('format') != FORMAT_REGLES or regles.get('version') != version:
+        regles = construire_regles(quartiers, alias, motifs)
+        try:
+            ecrire_regles(regles, chemin)
+        except OSError:
+            # Dossier en lecture seule : les règles restent valables en mémoire
+            pass
+
+    _CHARGES[(chemin, version)] = regles
+    return regles
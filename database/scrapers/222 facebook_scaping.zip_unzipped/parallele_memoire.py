@@ -0,0 +1,349 @@
+"""
+PARALLÉLISME INTRA-FICHIER - PROJET ID IMMOBILIER
+Nettoyage d'un gros dump sur plusieurs cœurs sans sérialiser le DataFrame :
+- Colonnes de titres et de prix copiées une seule fois en mémoire partagée
+  (multiprocessing.shared_memory) : octets UTF-8 contigus + offsets, à la manière d'Arrow
+- Chaque worker traite une plage de lignes en lisant directement ces tampons
+- Résultats écrits dans des tableaux de sortie préalloués, eux aussi partagés
+  (codes pour les valeurs catégorielles, zone réservée par ligne pour le titre complet)
+
+Activé par IDImmobilierCleanerV2(workers=N) à partir de SEUIL_PARALLELE lignes
+(id_immobilier_FINAL.py).
+
+Benchmark (passage de 1 à N cœurs) :
+    python parallele_memoire.py --lignes 1000000
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# Plages par worker : plusieurs par worker pour équilibrer les titres longs
+PLAGES_PAR_WORKER = 4
+
+COLONNES_TEXTE = [
+    'marketplace_listing_title', 'custom_title',
+    'custom_sub_titles_with_rendering_flags/0/subtitle',
+    'listing_price/formatted_amount',
+]
+COLONNES_NUMERIQUES = ['listing_price/amount', 'comparable_price', 'surface_m2']
+
+# Colonnes de sortie numériques : nom -> type
+SORTIES = {
+    'prix_fcfa': np.float64, 'code_regle_prix': np.int8,
+    'surface_m2': np.float64, 'code_regle_surface': np.int8,
+    'code_quartier': np.int32, 'quartier_confiance': np.float64,
+    'code_type_bien': np.int8, 'code_type_offre': np.int8,
+    'type_bien_confiance': np.float64, 'type_offre_confiance': np.float64,
+    'nb_pieces': np.float64, 'masque_location': np.int64,
+    'titre_longueur': np.int64,
+}
+
+
+class TamponsPartages:
+    """Tableaux NumPy adossés à des segments de mémoire partagée"""
+
+    def __init__(self):
+        self.segments = {}
+        self.tableaux = {}
+
+    def creer(self, nom, forme, dtype):
+        taille = max(int(np.prod(forme)) * np.dtype(dtype).itemsize, 1)
+        segment = shared_memory.SharedMemory(create=True, size=taille)
+        self.segments[nom] = segment
+        self.tableaux[nom] = np.ndarray(forme, dtype=dtype, buffer=segment.buf)
+        return self.tableaux[nom]
+
+    def descripteurs(self):
+        """(nom du segment, forme, type) de chaque tableau, pour les workers"""
+        return {nom: (self.segments[nom].name, t.shape, t.dtype.str) for nom, t in self.tableaux.items()}
+
+    def liberer(self):
+        self.tableaux.clear()
+        for segment in self.segments.values():
+            segment.close()
+            segment.unlink()
+        self.segments.clear()
+
+
+def _attacher(nom_segment):
+    """
+    Ouvrir un segment créé par le parent. Les workers du pool partagent le
+    resource_tracker du parent : l'enregistrement fait ici est le même que le sien,
+    et c'est l'unlink du parent (TamponsPartages.liberer) qui le retire.
+    """
+    return shared_memory.SharedMemory(name=nom_segment)
+
+
+def _colonne_texte(tampons, nom, valeurs):
+    """Encoder une colonne texte : octets UTF-8 bout à bout + offsets (n + 1) + masque des manquants"""
+    manquant = valeurs.isna().to_numpy()
+    encodees = [b'' if m else str(v).encode('utf-8') for v, m in zip(valeurs.tolist(), manquant)]
+    longueurs = np.fromiter((len(e) for e in encodees), dtype=np.int64, count=len(encodees))
+    offsets = tampons.creer(f'{nom}:offsets', (len(encodees) + 1,), np.int64)
+    offsets[0] = 0
+    np.cumsum(longueurs, out=offsets[1:])
+    octets = tampons.creer(f'{nom}:octets', (int(offsets[-1]),), np.uint8)
+    octets[:] = np.frombuffer(b''.join(encodees), dtype=np.uint8)
+    tampons.creer(f'{nom}:manquant', (len(encodees),), np.bool_)[:] = manquant
+    return longueurs
+
+
+# ============================================
+# CÔTÉ WORKER
+# ============================================
+
+_ETAT = {}
+
+
+def _initialiser_worker(descripteurs, options, codes):
+    """Une fois par processus : nettoyeur chaud et vues sur les tampons partagés"""
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+
+    _ETAT['cleaner'] = IDImmobilierCleanerV2(**options)
+    _ETAT['segments'] = []
+    _ETAT['tableaux'] = {}
+    for nom, (nom_segment, forme, dtype) in descripteurs.items():
+        segment = _attacher(nom_segment)
+        _ETAT['segments'].append(segment)
+        _ETAT['tableaux'][nom] = np.ndarray(forme, dtype=np.dtype(dtype), buffer=segment.buf)
+    _ETAT['codes'] = codes
+
+
+def _texte(tableaux, nom, i):
+    if nom + ':offsets' not in tableaux or tableaux[nom + ':manquant'][i]:
+        return None
+    offsets = tableaux[nom + ':offsets']
+    return tableaux[nom + ':octets'][offsets[i]:offsets[i + 1]].tobytes().decode('utf-8')
+
+
+def _traiter_plage(plage):
+    """
+    Extraire titre, prix, surface, quartier et types des lignes [debut, fin)
+    Retourne (nombre de lignes, état du worker : profilage et budget de la plage)
+    """
+    debut, fin = plage
+    cleaner, t, codes = _ETAT['cleaner'], _ETAT['tableaux'], _ETAT['codes']
+    numeriques = [c for c in COLONNES_NUMERIQUES if 'entree:' + c in t]
+    titres_sortie, debuts_titre = t['titre:octets'], t['titre:debut']
+
+    for i in range(debut, fin):
+        ligne = {c: _texte(t, c, i) for c in COLONNES_TEXTE}
+        for c in numeriques:
+            ligne[c] = t['entree:' + c][i]
+        titre = cleaner.generer_titre_complet(ligne)
+        ligne['titre_complet'] = titre
+
+        prix, regle_prix = cleaner.nettoyer_prix_avec_regle(ligne)
+        surface, regle_surface = cleaner.extraire_surface_avec_regle(titre)
+        quartier, confiance = cleaner.extraire_quartier_avec_confiance(titre)
+
+        t['prix_fcfa'][i] = np.nan if prix is None else prix
+        t['code_regle_prix'][i] = codes['regle_prix'][regle_prix]
+        t['surface_m2'][i] = np.nan if surface is None else surface
+        t['code_regle_surface'][i] = codes['regle_surface'][regle_surface]
+        t['code_quartier'][i] = codes['quartier'][quartier]
+        t['quartier_confiance'][i] = confiance
+        classement = cleaner.classifieur.classer(titre)
+        t['code_type_bien'][i] = codes['type_bien'][classement.type_bien]
+        t['code_type_offre'][i] = codes['type_offre'][classement.type_offre]
+        t['type_bien_confiance'][i] = classement.type_bien_confiance
+        t['type_offre_confiance'][i] = classement.type_offre_confiance
+        t['nb_pieces'][i] = np.nan if classement.nb_pieces is None else classement.nb_pieces
+        t['masque_location'][i] = cleaner.classifieur.masque_location(classement.mots_location)
+
+        # Titre complet dans la zone réservée à la ligne (capacité calculée à l'avance)
+        octets = titre.encode('utf-8')
+        titres_sortie[debuts_titre[i]:debuts_titre[i] + len(octets)] = np.frombuffer(octets, dtype=np.uint8)
+        t['titre_longueur'][i] = len(octets)
+
+    return fin - debut, cleaner.etat_worker()
+
+
+# ============================================
+# CÔTÉ PARENT
+# ============================================
+
+def _codes(cleaner):
+    """Tables valeur -> code (et inverse) des sorties catégorielles"""
+    canoniques = set(cleaner.index_quartiers.canoniques.values())
+    canoniques |= {ligne[3] for ligne in cleaner.table_quartiers}
+    noms_quartiers = sorted({cleaner._formater_quartier(c) for c in canoniques})
+    listes = {
+        'regle_prix': [None] + [nom for nom, _ in cleaner.tentatives_prix],
+        'regle_surface': [None] + [nom for nom, _ in cleaner.regles_surface],
+        'quartier': ['Non spécifié'] + noms_quartiers,
+        'type_bien': cleaner.classifieur.modalites('type_bien'),
+        'type_offre': cleaner.classifieur.modalites('type_offre'),
+    }
+    return listes, {cle: {v: i for i, v in enumerate(liste)} for cle, liste in listes.items()}
+
+
+def extraire_en_parallele(cleaner, df, workers):
+    """
+    Colonnes extraites de `df` (titre_complet, prix_fcfa, regle_prix, surface_m2,
+    regle_surface, quartier, quartier_confiance et colonnes de classification_types)
+    calculées par `workers` processus sur des plages de lignes
+    """
+    import pandas as pd
+
+    n = len(df)
+    listes, codes = _codes(cleaner)
+    tampons = TamponsPartages()
+    try:
+        # Entrées : une copie unique en mémoire partagée
+        capacite = np.zeros(n, dtype=np.int64)
+        for colonne in COLONNES_TEXTE:
+            if colonne in df.columns:
+                longueurs = _colonne_texte(tampons, colonne, df[colonne])
+                if colonne != 'listing_price/formatted_amount':
+                    capacite += longueurs
+        for colonne in COLONNES_NUMERIQUES:
+            if colonne in df.columns:
+                valeurs = pd.to_numeric(df[colonne], errors='coerce').to_numpy(dtype=np.float64)
+                tampons.creer('entree:' + colonne, (n,), np.float64)[:] = valeurs
+
+        # Sorties préallouées ; titre : somme des 3 champs + 2 séparateurs, au moins 'Sans titre'
+        for nom, dtype in SORTIES.items():
+            tampons.creer(nom, (n,), dtype)
+        capacite = np.maximum(capacite + 2, len('Sans titre'))
+        debuts = tampons.creer('titre:debut', (n,), np.int64)
+        debuts[:] = np.concatenate([[0], np.cumsum(capacite)[:-1]]) if n else []
+        tampons.creer('titre:octets', (int(capacite.sum()),), np.uint8)
+
+        pas = max(1, -(-n // (workers * PLAGES_PAR_WORKER)))
+        plages = [(d, min(d + pas, n)) for d in range(0, n, pas)]
+        with multiprocessing.Pool(workers, initializer=_initialiser_worker,
+                                  initargs=(tampons.descripteurs(), cleaner.options_workers(), codes)) as pool:
+            # Profilage et budget de chaque plage ajoutés à ceux du nettoyeur parent
+            for _, etat in pool.imap(_traiter_plage, plages):
+                cleaner.fusionner_worker(etat)
+
+        t = tampons.tableaux
+        octets, longueurs = t['titre:octets'], t['titre_longueur']
+        titres = [octets[d:d + l].tobytes().decode('utf-8') for d, l in zip(debuts.tolist(), longueurs.tolist())]
+
+        def decoder(nom_code, cle):
+            return np.asarray(listes[cle], dtype=object)[t[nom_code]]
+
+        colonnes = {
+            'titre_complet': titres,
+            'prix_fcfa': t['prix_fcfa'].copy(),
+            'regle_prix': decoder('code_regle_prix', 'regle_prix'),
+            'surface_m2': t['surface_m2'].copy(),
+            'regle_surface': decoder('code_regle_surface', 'regle_surface'),
+            'quartier': decoder('code_quartier', 'quartier'),
+            'quartier_confiance': t['quartier_confiance'].copy(),
+            'type_bien': decoder('code_type_bien', 'type_bien'),
+            'type_bien_confiance': t['type_bien_confiance'].copy(),
+            'type_offre': decoder('code_type_offre', 'type_offre'),
+            'type_offre_confiance': t['type_offre_confiance'].copy(),
+            'nb_pieces': t['nb_pieces'].copy(),
+        }
+        masques, inverse = np.unique(t['masque_location'], return_inverse=True)
+        colonnes['mots_location'] = np.asarray(
+            [cleaner.classifieur.mots_du_masque(int(m)) for m in masques], dtype=object)[inverse]
+    finally:
+        tampons.liberer()
+    return colonnes
+
+
+def villes_et_statuts(df):
+    """Équivalents vectorisés de extraire_ville et determiner_statut (chemin parallèle)"""
+    import pandas as pd
+
+    ville = df.get('location/reverse_geocode/city', pd.Series(np.nan, index=df.index))
+    affichage = df.get('location/reverse_geocode/city_page/display_name', pd.Series(np.nan, index=df.index))
+    # map plutôt que .str : une colonne entièrement vide n'est pas de type texte (pandas 3)
+    villes = ville.astype(str).where(ville.notna(),
+                                     affichage.map(lambda v: str(v).split(',')[0].strip(), na_action='ignore'))
+    villes = villes.where(ville.notna() | affichage.notna(), 'Lomé')
+
+    def drapeau(colonne):
+        valeurs = df.get(colonne, pd.Series(None, index=df.index, dtype=object))
+        return valeurs.map(lambda v: v == 'true' or v == True).to_numpy(dtype=bool)
+
+    statuts = np.select([drapeau('is_sold'), drapeau('is_live'), drapeau('is_pending'), drapeau('is_hidden')],
+                        ['Vendue', 'Active', 'En attente', 'Masquée'], default='Inconnue')
+    return villes, statuts
+
+
+# ============================================
+# BENCHMARK : PASSAGE À L'ÉCHELLE
+# ============================================
+
+def generer_dump(nb, graine=0):
+    """Dump Marketplace synthétique (titres variés, prix en champ ou dans le titre)"""
+    import pandas as pd
+    from id_immobilier_FINAL import QUARTIERS_LOME
+
+    rng = np.random.default_rng(graine)
+    biens = np.array(['Terrain', 'Villa', 'Maison', 'Appartement F3', 'Terrain 1/2 lot', 'Parcelle'])
+    offres = np.array(['à vendre', 'à louer', 'vente', ''])
+    surfaces = np.array(['1 lot', '500 m2', '2 lots', '', '350m²', '1lot et 1/4'])
+    prix_titre = np.array(['', '12 millions', '3,500,000 FCFA', '8m fcfa', ''])
+    quartiers = np.array(QUARTIERS_LOME + ['adidogome', 'tokoim', 'bekpota'])
+
+    titres = pd.Series(biens[rng.integers(0, len(biens), nb)]).str.cat(
+        [pd.Series(offres[rng.integers(0, len(offres), nb)]),
+         pd.Series(surfaces[rng.integers(0, len(surfaces), nb)]),
+         pd.Series(quartiers[rng.integers(0, len(quartiers), nb)]),
+         pd.Series(prix_titre[rng.integers(0, len(prix_titre), nb)])], sep=' ')
+    montant = np.where(rng.random(nb) < 0.6, rng.integers(1, 100, nb) * 1e6, 0.0)
+    return pd.DataFrame({
+        'id': np.arange(nb).astype(str),
+        'marketplace_listing_title': titres,
+        'listing_price/amount': montant,
+        'listing_price/formatted_amount': np.where(montant > 0, 'CFA' + pd.Series(montant).map('{:,.0f}'.format), None),
+        'location/reverse_geocode/city': 'Lomé',
+        'listingUrl': 'https://www.facebook.com/marketplace/item/' + pd.Series(np.arange(nb)).astype(str),
+        'is_live': True,
+        'is_sold': False,
+    })
+
+
+def benchmark(nb=1_000_000, max_workers=None):
+    """Durée de l'extraction parallèle pour 1, 2, 4... workers (jusqu'au nombre de cœurs)"""
+    import tempfile
+    import pandas as pd
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+
+    max_workers = max_workers or os.cpu_count()
+    dossier = tempfile.mkdtemp(prefix='id_immobilier_parallele_')
+    chemin = os.path.join(dossier, 'dump_synthetique.csv')
+    generer_dump(nb).to_csv(chemin, index=False)
+    df = pd.read_csv(chemin)
+    os.remove(chemin)
+    os.rmdir(dossier)
+
+    print("=" * 70)
+    print(f"⏱️  PARALLÉLISME INTRA-FICHIER - {nb:,} lignes, {os.cpu_count()} cœur(s)")
+    print("=" * 70)
+    cleaner = IDImmobilierCleanerV2()
+    niveaux = sorted({1, max_workers} | {2 ** k for k in range(1, 8) if 2 ** k < max_workers})
+    reference = None
+    for workers in niveaux:
+        debut = time.perf_counter()
+        extraire_en_parallele(cleaner, df, workers)
+        duree = time.perf_counter() - debut
+        reference = reference or duree
+        print(f"   {workers:>3} worker(s): {duree:7.2f} s  {nb / duree:>10,.0f} lignes/s  "
+              f"accélération x{reference / duree:.2f}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du nettoyage parallèle en mémoire partagée")
+    parser.add_argument('--lignes', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=None, help="Nombre maximal de workers")
+    args = parser.parse_args()
+    benchmark(args.lignes, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+PIPELINE LECTURE → NETTOYAGE → ÉCRITURE - PROJET ID IMMOBILIER
+Les trois étapes du traitement d'un gros dump tournent en même temps :
+- Lecture : un thread produit les morceaux bruts (CSV, JSON/JSONL Apify, autre source)
+- Nettoyage : nettoyer_dataset dans un thread, ou un pool de processus (workers > 1)
+- Écriture : un thread par sortie (CSV écrit au fil de l'eau, Excel à la fin)
+Les files entre étapes sont bornées : une étape trop rapide attend la suivante
+(contre-pression) au lieu d'accumuler les morceaux en mémoire. La fin du flux est
+signalée par un marqueur ; une erreur dans une étape arrête les autres et est
+relancée dans l'appelant.
+
+Chaque étape mesure son temps de travail et ses attentes (file d'entrée vide,
+file de sortie pleine) : l'étape la plus occupée est le goulot d'étranglement.
+
+    python id_immobilier_cli.py clean gros_dump.csv --pipeline --workers 4
+"""
+
+import contextlib
+import io
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Fin du flux (transmis d'étape en étape)
+FIN = object()
+
+# Morceaux en attente au plus entre deux étapes
+PROFONDEUR_FILE = 4
+
+# Période de vérification de l'arrêt pendant une attente sur une file (s)
+ATTENTE_ARRET = 0.1
+
+
+class ArretPipeline(Exception):
+    """Une autre étape a échoué : abandon de l'étape courante"""
+
+
+class MesuresEtape:
+    """Temps de travail, d'attente amont/aval et volume traité par une étape"""
+
+    def __init__(self, nom):
+        self.nom = nom
+        self.occupe_s = 0.0
+        self.attente_entree_s = 0.0
+        self.attente_sortie_s = 0.0
+        self.morceaux = 0
+        self.lignes = 0
+        self._debut = None
+        self.duree_s = 0.0
+
+    def demarrer(self):
+        self._debut = time.perf_counter()
+
+    def terminer(self):
+        self.duree_s = time.perf_counter() - self._debut
+
+    @contextlib.contextmanager
+    def travail(self):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.occupe_s += time.perf_counter() - debut
+
+    def utilisation(self):
+        return self.occupe_s / self.duree_s if self.duree_s else 0.0
+
+
+class Pipeline:
+    """Étapes reliées par des files bornées, arrêt et erreurs partagés"""
+
+    def __init__(self, profondeur=PROFONDEUR_FILE):
+        self.profondeur = profondeur
+        self.arret = threading.Event()
+        self.erreurs = []
+        self.mesures = {}
+        self._threads = []
+
+    def file(self):
+        return queue.Queue(maxsize=self.profondeur)
+
+    def deposer(self, file, element, mesures):
+        """put bloquant (contre-pression) mais interrompu si le pipeline s'arrête"""
+        debut = time.perf_counter()
+        try:
+            while True:
+                if self.arret.is_set():
+                    raise ArretPipeline()
+                try:
+                    file.put(element, timeout=ATTENTE_ARRET)
+                    return
+                except queue.Full:
+                    continue
+        finally:
+            mesures.attente_sortie_s += time.perf_counter() - debut
+
+    def prendre(self, file, mesures):
+        """get bloquant, interrompu si le pipeline s'arrête"""
+        debut = time.perf_counter()
+        try:
+            while True:
+                if self.arret.is_set():
+                    raise ArretPipeline()
+                try:
+                    return file.get(timeout=ATTENTE_ARRET)
+                except queue.Empty:
+                    continue
+        finally:
+            mesures.attente_entree_s += time.perf_counter() - debut
+
+    def etape(self, nom, fonction, *args):
+        """Lancer `fonction(mesures, *args)` dans un thread ; toute erreur arrête le pipeline"""
+        mesures = self.mesures[nom] = MesuresEtape(nom)
+
+        def executer():
+            mesures.demarrer()
+            try:
+                fonction(mesures, *args)
+            except ArretPipeline:
+                pass
+            except BaseException as e:
+                self.erreurs.append((nom, e))
+                self.arret.set()
+            finally:
+                mesures.terminer()
+
+        thread = threading.Thread(target=executer, name=f'pipeline-{nom}', daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def attendre(self):
+        """Attendre toutes les étapes ; relancer la première erreur survenue"""
+        try:
+            for thread in self._threads:
+                while thread.is_alive():
+                    thread.join(ATTENTE_ARRET)
+        except KeyboardInterrupt:
+            self.arret.set()
+            raise
+        if self.erreurs:
+            nom, erreur = self.erreurs[0]
+            raise RuntimeError(f"Échec de l'étape « {nom} » du pipeline: {erreur}") from erreur
+
+    def afficher(self, duree_s):
+        print(f"\n{'étape':<16}{'morceaux':>9}{'lignes':>10}{'travail':>10}"
+              f"{'att. entrée':>13}{'att. sortie':>13}{'utilisation':>13}")
+        for m in self.mesures.values():
+            print(f"{m.nom:<16}{m.morceaux:>9}{m.lignes:>10}{m.occupe_s:>9.2f}s"
+                  f"{m.attente_entree_s:>12.2f}s{m.attente_sortie_s:>12.2f}s{m.utilisation():>12.0%}")
+        goulot = max(self.mesures.values(), key=MesuresEtape.utilisation)
+        print(f"\n🐢 Goulot d'étranglement: {goulot.nom} ({goulot.utilisation():.0%} occupé) "
+              f"- durée totale {duree_s:.2f} s")
+
+
+# ============================================
+# ÉTAPES
+# ============================================
+
+def _lire(mesures, pipeline, lecteur, sortie):
+    iterateur = iter(lecteur)
+    while True:
+        with mesures.travail():
+            morceau = next(iterateur, FIN)
+        if morceau is FIN:
+            break
+        mesures.morceaux += 1
+        mesures.lignes += len(morceau)
+        pipeline.deposer(sortie, morceau, mesures)
+    pipeline.deposer(sortie, FIN, mesures)
+
+
+def _diffuser(pipeline, sorties, element, mesures):
+    for sortie in sorties:
+        pipeline.deposer(sortie, element, mesures)
+
+
+def _nettoyer_thread(mesures, pipeline, cleaner, entree, sorties):
+    while True:
+        morceau = pipeline.prendre(entree, mesures)
+        if morceau is FIN:
+            break
+        with mesures.travail(), contextlib.redirect_stdout(io.StringIO()):
+            df_valide = cleaner.nettoyer_dataset(morceau, sauvegarder_tables=False)
+        mesures.morceaux += 1
+        mesures.lignes += len(df_valide)
+        _diffuser(pipeline, sorties, df_valide, mesures)
+    _diffuser(pipeline, sorties, FIN, mesures)
+
+
+_CLEANER_PROCESSUS = {}
+
+
+def _initialiser_processus(options):
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+    cleaner = IDImmobilierCleanerV2(**options)
+    # Annonces apprises renvoyées au parent, seul à enregistrer les tables
+    cleaner._tables_surface().journaliser()
+    _CLEANER_PROCESSUS['cleaner'] = cleaner
+
+
+def _nettoyer_morceau(morceau):
+    """(données valides, état du worker : profilage, budget, annonces apprises)"""
+    cleaner = _CLEANER_PROCESSUS['cleaner']
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_valide = cleaner.nettoyer_dataset(morceau, sauvegarder_tables=False)
+    return df_valide, cleaner.etat_worker()
+
+
+def _nettoyer_processus(mesures, pipeline, cleaner, workers, entree, sorties):
+    """
+    Morceaux confiés à un pool de processus, au plus `workers + profondeur` en cours ;
+    les résultats sont transmis dans l'ordre de lecture, les mesures et annonces
+    apprises de chaque worker fusionnées dans `cleaner`
+    """
+    options = cleaner.options_workers()
+    en_cours = deque()
+    fin_lecture = False
+    with ProcessPoolExecutor(workers, initializer=_initialiser_processus, initargs=(options,)) as pool:
+        try:
+            while not fin_lecture or en_cours:
+                if not fin_lecture and len(en_cours) < workers + pipeline.profondeur:
+                    morceau = pipeline.prendre(entree, mesures)
+                    if morceau is FIN:
+                        fin_lecture = True
+                    else:
+                        en_cours.append(pool.submit(_nettoyer_morceau, morceau))
+                    continue
+                # Attente du plus ancien résultat : temps de nettoyage vu par le pipeline
+                with mesures.travail():
+                    df_valide, etat = en_cours.popleft().result()
+                    cleaner.fusionner_worker(etat)
+                mesures.morceaux += 1
+                mesures.lignes += len(df_valide)
+                _diffuser(pipeline, sorties, df_valide, mesures)
+        finally:
+            for future in en_cours:
+                future.cancel()
+    _diffuser(pipeline, sorties, FIN, mesures)
+
+
+def _ecrire_csv(mesures, pipeline, chemin, entree, resultat):
+    """CSV complété morceau par morceau (en-tête et BOM au premier), renommé à la fin du flux"""
+    from id_immobilier_FINAL import COLONNES_BDD
+
+    temporaire = chemin + '.tmp'
+    premier = True
+    try:
+        with open(temporaire, 'w', encoding='utf-8-sig', newline='') as f:
+            while True:
+                df_valide = pipeline.prendre(entree, mesures)
+                if df_valide is FIN:
+                    break
+                with mesures.travail():
+                    if len(df_valide) > 0:
+                        df_valide[COLONNES_BDD].to_csv(f, index=False, header=premier)
+                        premier = False
+                mesures.morceaux += 1
+                mesures.lignes += len(df_valide)
+            if premier:
+                f.write(','.join(COLONNES_BDD) + '\n')
+    except BaseException:
+        # Pas d'export partiel laissé derrière une erreur
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+    os.replace(temporaire, chemin)
+    resultat.append(chemin)
+
+
+def _ecrire_excel(mesures, pipeline, chemin, entree, resultat):
+    """Excel : un classeur ne s'écrit pas par morceaux, écriture unique en fin de flux"""
+    import pandas as pd
+    from id_immobilier_FINAL import COLONNES_BDD, ecrire_excel
+
+    morceaux = []
+    while True:
+        df_valide = pipeline.prendre(entree, mesures)
+        if df_valide is FIN:
+            break
+        if len(df_valide) > 0:
+            morceaux.append(df_valide)
+        mesures.morceaux += 1
+        mesures.lignes += len(df_valide)
+    if morceaux:
+        with mesures.travail():
+            resultat.append(ecrire_excel(pd.concat(morceaux, ignore_index=True)[COLONNES_BDD], chemin))
+
+
+def executer_pipeline(cleaner, source, formats=('csv',), dossier='.', taille_morceau=5000,
+                      workers=None, profondeur=PROFONDEUR_FILE, adaptateur=None):
+    """
+    Nettoyer `source` et écrire les exports en pipeline
+    Retourne (fichiers écrits, mesures par étape)
+    """
+    from id_immobilier_FINAL import chemin_export
+
+    pipeline = Pipeline(profondeur)
+    lecteur = cleaner.lire_morceaux(source, taille_morceau, adaptateur)
+    horodatage = time.strftime('%Y%m%d_%H%M%S')
+
+    print("=" * 70)
+    print(f"🔀 PIPELINE LECTURE → NETTOYAGE → ÉCRITURE "
+          f"({workers or 1} worker(s), files de {profondeur} morceaux)")
+    print("=" * 70)
+
+    debut = time.perf_counter()
+    lus = pipeline.file()
+    for format in formats:
+        if format not in ('csv', 'excel'):
+            raise ValueError(f"Format d'export inconnu: {format}")
+    files_sortie = {format: pipeline.file() for format in formats}
+    fichiers = []
+    pipeline.etape('lecture', _lire, pipeline, lecteur, lus)
+    sorties = list(files_sortie.values())
+    if workers and workers > 1:
+        pipeline.etape('nettoyage', _nettoyer_processus, pipeline, cleaner, workers, lus, sorties)
+    else:
+        pipeline.etape('nettoyage', _nettoyer_thread, pipeline, cleaner, lus, sorties)
+    for format, entree in files_sortie.items():
+        if format == 'csv':
+            pipeline.etape('écriture csv', _ecrire_csv, pipeline,
+                           chemin_export('csv', dossier, horodatage), entree, fichiers)
+        else:
+            pipeline.etape('écriture excel', _ecrire_excel, pipeline,
+                           chemin_export('excel', dossier, horodatage), entree, fichiers)
+
+    pipeline.attendre()
+    duree = time.perf_counter() - debut
+
+    nb_lignes = pipeline.mesures['lecture'].lignes
+    nb_valides = pipeline.mesures['nettoyage'].lignes
+    if nb_lignes > 0:
+        print(f"   ✓ {nb_valides}/{nb_lignes} lignes valides ({nb_valides / nb_lignes * 100:.1f}%, "
+              f"{nb_lignes / duree:,.0f} lignes/s)")
+    for fichier in fichiers:
+        print(f"✅ Export: {fichier}")
+    if cleaner.profileur is not None:
+        cleaner.profileur.afficher()
+    if cleaner.budget is not None:
+        cleaner.budget.afficher()
+    if cleaner.tables_surface is not None:
+        cleaner.tables_surface.sauvegarder()
+    pipeline.afficher(duree)
+    print("=" * 70)
+    return fichiers, pipeline.mesures
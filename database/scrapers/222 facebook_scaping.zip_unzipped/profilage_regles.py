@@ -0,0 +1,88 @@
+"""
+PROFILAGE DES RÈGLES D'EXTRACTION - PROJET ID IMMOBILIER
+Compte, pour chaque règle (patterns de surface, tentatives de prix) :
+- Le nombre d'essais et de succès (taux de réussite)
+- Le temps cumulé en nanosecondes
+Le rapport classe les règles par coût total pour décider de l'ordre ou du retrait.
+"""
+
+from collections import defaultdict
+
+
+class ProfileurRegles:
+    """Compteurs par (famille, règle) ; activé via IDImmobilierCleanerV2(profilage=True)"""
+
+    def __init__(self):
+        # (famille, règle) -> [essais, succès, nanosecondes]
+        self.compteurs = defaultdict(lambda: [0, 0, 0])
+        self.ordre = {}
+
+    def mesurer(self, famille, regle, duree_ns, succes):
+        """Enregistrer un essai de règle"""
+        compteur = self.compteurs[(famille, regle)]
+        compteur[0] += 1
+        compteur[1] += succes
+        compteur[2] += duree_ns
+        self.ordre.setdefault((famille, regle), len(self.ordre))
+
+    def etat(self):
+        """Compteurs transmissibles entre processus (sans le defaultdict)"""
+        return {'compteurs': dict(self.compteurs), 'ordre': dict(self.ordre)}
+
+    def fusionner(self, etat):
+        """Ajouter les compteurs d'un autre profileur (worker), voir etat()"""
+        for cle in sorted(etat['ordre'], key=etat['ordre'].get):
+            self.ordre.setdefault(cle, len(self.ordre))
+        for cle, (essais, succes, ns) in etat['compteurs'].items():
+            compteur = self.compteurs[cle]
+            compteur[0] += essais
+            compteur[1] += succes
+            compteur[2] += ns
+
+    def reinitialiser(self):
+        self.compteurs.clear()
+        self.ordre.clear()
+
+    def rapport(self):
+        """
+        Tableau classé par coût total décroissant (à égalité, dans l'ordre d'essai des règles)
+        Colonnes : essais, succès, taux, temps total (ms), coût par essai (µs), coût par succès (µs)
+        """
+        import pandas as pd
+
+        lignes = []
+        for (famille, regle), (essais, succes, ns) in self.compteurs.items():
+            lignes.append({
+                'famille': famille,
+                'regle': regle,
+                'position': self.ordre[(famille, regle)],
+                'essais': essais,
+                'succes': succes,
+                'taux_succes_%': round(succes / essais * 100, 1) if essais else 0.0,
+                'temps_total_ms': round(ns / 1e6, 3),
+                'cout_essai_us': round(ns / essais / 1e3, 2) if essais else 0.0,
+                'cout_succes_us': round(ns / succes / 1e3, 2) if succes else None
+            })
+
+        if not lignes:
+            return pd.DataFrame()
+        return (pd.DataFrame(lignes)
+                .sort_values(['temps_total_ms', 'position'], ascending=[False, True], kind='stable')
+                .drop(columns='position')
+                .reset_index(drop=True))
+
+    def afficher(self):
+        """Rapport console (même présentation que les statistiques du nettoyage)"""
+        print("\n" + "=" * 70)
+        print("⏱️  PROFILAGE DES RÈGLES D'EXTRACTION")
+        print("=" * 70)
+        rapport = self.rapport()
+        if len(rapport) == 0:
+            print("Aucune mesure")
+        else:
+            print(rapport.to_string(index=False))
+            morts = rapport[rapport['succes'] == 0]
+            if len(morts) > 0:
+                print(f"\n⚠️  Règles jamais déclenchées: {', '.join(morts['famille'] + '/' + morts['regle'])}")
+        print("=" * 70)
+        return rapport
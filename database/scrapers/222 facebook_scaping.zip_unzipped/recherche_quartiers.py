@@ -0,0 +1,213 @@
+"""
+RECHERCHE FLOUE DES QUARTIERS - PROJET ID IMMOBILIER
+Index SymSpell (suppressions précalculées) sur la liste des quartiers :
+- Tolère les fautes de frappe à distance d'édition bornée
+- Regroupe toutes les variantes sous un nom canonique unique
+- Retourne un score de confiance pour chaque correspondance
+"""
+
+import re
+import unicodedata
+
+
+# Variantes orthographiques qui ne se réduisent pas au nom canonique
+# par simple suppression des accents, espaces ou tirets
+ALIAS_QUARTIERS = {
+    'adewi': 'adéwui',
+    'akodeséwa': 'akodesséwa',
+    'adetikopé': 'adeticopé',
+    'adetikope': 'adeticopé',
+    'cacavelli': 'cacavéli',
+    'xédranawoe': 'hédzranawoé',
+    'xedranawoe': 'hédzranawoé',
+    'atikoume': 'attikoumé',
+    'atikoumé': 'attikoumé',
+    'nyekonakpo': 'nyékonakpoé',
+    'octavio': 'octaviano',
+    'lome 2': 'lomé-2',
+    'lome ii': 'lomé-2',
+}
+
+# Nombre maximal de mots consécutifs du titre comparés à un quartier
+# ("tokoin gbadago", "quartier administratif", ...)
+MAX_MOTS_NGRAMME = 3
+
+# Mots outils jamais comparés aux quartiers ("à klikamé" ne doit pas devenir "aklikame")
+MOTS_OUTILS = {
+    'a', 'au', 'aux', 'd', 'de', 'des', 'du', 'en', 'et', 'l', 'la', 'le',
+    'les', 'non', 'loin', 'pres', 'sur', 'un', 'une', 'avec', 'vers', 'cote'
+}
+
+
+def normaliser(texte):
+    """Minuscules, sans accents"""
+    if not texte:
+        return ''
+    nfd = unicodedata.normalize('NFD', str(texte).lower())
+    return ''.join(c for c in nfd if not unicodedata.combining(c))
+
+
+def cle_flexible(texte):
+    """Clé de comparaison : sans accents, espaces ni tirets (bè-kpota = bekpota)"""
+    return re.sub(r'[\s\-]+', '', normaliser(texte))
+
+
+def distance_bornee(a, b, max_dist):
+    """
+    Distance de Damerau-Levenshtein (transpositions adjacentes)
+    Retourne max_dist + 1 dès que la borne est dépassée
+    """
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+
+    precedente = None
+    ligne_prec = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        ligne = [i] + [0] * len(b)
+        minimum_ligne = ligne[0]
+        for j in range(1, len(b) + 1):
+            cout = 0 if a[i - 1] == b[j - 1] else 1
+            ligne[j] = min(ligne_prec[j] + 1, ligne[j - 1] + 1, ligne_prec[j - 1] + cout)
+            if (precedente is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                ligne[j] = min(ligne[j], precedente[j - 2] + 1)
+            minimum_ligne = min(minimum_ligne, ligne[j])
+        if minimum_ligne > max_dist:
+            return max_dist + 1
+        precedente, ligne_prec = ligne_prec, ligne
+
+    return ligne_prec[-1] if ligne_prec[-1] <= max_dist else max_dist + 1
+
+
+class IndexQuartiers:
+    """
+    Index SymSpell des quartiers de Lomé
+    Chaque variante connue pointe vers un nom canonique ; la recherche d'un mot
+    ne génère que ses suppressions (pas de comparaison avec toute la liste)
+    """
+
+    def __init__(self, quartiers, alias=None):
+        self.canoniques = self._construire_canoniques(quartiers, alias or ALIAS_QUARTIERS)
+        self.suppressions = {}
+
+        for cle in self.canoniques:
+            for variante in self._suppressions(cle, self.distance_max(cle)):
+                self.suppressions.setdefault(variante, set()).add(cle)
+
+    def exporter(self):
+        """Tables de l'index sérialisables en JSON (jeu de règles précompilé)"""
+        return {
+            'canoniques': self.canoniques,
+            'suppressions': {variante: sorted(cles) for variante, cles in self.suppressions.items()},
+        }
+
+    @classmethod
+    def depuis_export(cls, donnees):
+        """Reconstruire l'index depuis exporter() sans recalculer les suppressions"""
+        index = cls.__new__(cls)
+        index.canoniques = donnees['canoniques']
+        index.suppressions = {variante: set(cles) for variante, cles in donnees['suppressions'].items()}
+        return index
+
+    @staticmethod
+    def distance_max(cle):
+        """Tolérance selon la longueur : aucune faute sur les noms très courts (bè, vo)"""
+        if len(cle) <= 4:
+            return 0
+        if len(cle) <= 7:
+            return 1
+        return 2
+
+    @staticmethod
+    def _construire_canoniques(quartiers, alias):
+        """
+        Associe chaque clé flexible à un nom canonique
+        Entre variantes d'une même clé, on garde la forme accentuée puis avec tiret
+        """
+        groupes = {}
+        for quartier in quartiers:
+            quartier = quartier.lower().strip()
+            cible = alias.get(quartier, quartier)
+            groupes.setdefault(cle_flexible(cible), set()).add(cible)
+
+        canoniques = {}
+        for cle, formes in groupes.items():
+            canoniques[cle] = max(
+                sorted(formes),
+                key=lambda f: (sum(1 for c in f if ord(c) > 127), '-' in f)
+            )
+
+        # Les alias eux-mêmes doivent être reconnus tels quels
+        for variante, cible in alias.items():
+            cle_cible = cle_flexible(cible)
+            if cle_cible in canoniques:
+                canoniques.setdefault(cle_flexible(variante), canoniques[cle_cible])
+
+        return canoniques
+
+    @staticmethod
+    def _suppressions(mot, profondeur):
+        """Ensemble des chaînes obtenues en supprimant jusqu'à `profondeur` caractères"""
+        resultat = {mot}
+        courant = {mot}
+        for _ in range(profondeur):
+            suivant = set()
+            for m in courant:
+                for i in range(len(m)):
+                    suivant.add(m[:i] + m[i + 1:])
+            resultat |= suivant
+            courant = suivant
+        return resultat
+
+    def rechercher_mot(self, mot):
+        """
+        Chercher une clé (déjà flexible) dans l'index
+        Retourne (nom canonique, confiance) ou (None, 0.0)
+        """
+        if mot in self.canoniques:
+            return self.canoniques[mot], 1.0
+
+        profondeur = self.distance_max(mot)
+        if profondeur == 0:
+            return None, 0.0
+
+        candidats = set()
+        for variante in self._suppressions(mot, profondeur):
+            candidats |= self.suppressions.get(variante, set())
+
+        meilleur, meilleure_dist = None, profondeur + 1
+        for cle in sorted(candidats):
+            limite = min(profondeur, self.distance_max(cle))
+            dist = distance_bornee(mot, cle, limite)
+            if dist <= limite and dist < meilleure_dist:
+                meilleur, meilleure_dist = cle, dist
+
+        if meilleur is None:
+            return None, 0.0
+
+        confiance = 1 - meilleure_dist / max(len(mot), len(meilleur))
+        return self.canoniques[meilleur], round(confiance, 3)
+
+    def rechercher(self, titre):
+        """
+        Chercher un quartier dans un titre complet
+        Compare les mots et groupes de mots consécutifs ; garde la meilleure confiance
+        """
+        mots = [m for m in re.split(r'[^a-z0-9]+', normaliser(titre))
+                if m and m not in MOTS_OUTILS and not (len(m) == 1 and m.isalpha())]
+
+        meilleur, meilleure_confiance = None, 0.0
+        for taille in range(MAX_MOTS_NGRAMME, 0, -1):
+            for debut in range(len(mots) - taille + 1):
+                cle = ''.join(mots[debut:debut + taille])
+                quartier, confiance = self.rechercher_mot(cle)
+                if quartier and confiance > meilleure_confiance:
+                    meilleur, meilleure_confiance = quartier, confiance
+                    if confiance == 1.0:
+                        return meilleur, 1.0
+
+        return meilleur, meilleure_confiance
+
+    def canonique(self, quartier):
+        """Nom canonique d'une variante connue (ou la variante elle-même)"""
+        return self.canoniques.get(cle_flexible(quartier), quartier)
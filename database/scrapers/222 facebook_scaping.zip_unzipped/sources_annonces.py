@@ -0,0 +1,217 @@
+"""
+SOURCES MULTIPLES - PROJET ID IMMOBILIER
+Un seul nettoyeur (IDImmobilierCleanerV2) pour tous les sites d'annonces :
+- Un adaptateur par source ramène son schéma brut aux colonnes Marketplace que lit
+  le nettoyeur (titre, prix, ville, URL, statuts...) ; surface, prix, quartier et
+  type sont ensuite extraits par le même code pour toutes les sources
+- Chaque fichier est nettoyé dans son propre processus, les sources en parallèle
+- Les résultats sont fusionnés dans un seul export aux colonnes de biens_immobiliers,
+  avec le débit de chaque source
+
+Nouvelle source : un fichier JSON décrivant l'adaptateur
+    {"nom": "immoask", "source": "ImmoAsk", "detection": ["ref", "titre_annonce"],
+     "correspondances": {"ref": "id", "titre_annonce": "marketplace_listing_title",
+                         "prix": "listing_price/amount", "lien": "listingUrl"}}
+
+    python sources_annonces.py dump_marketplace.csv dump_immoask.csv --adaptateur immoask.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+# Colonnes lues directement par nettoyer_dataset (et non via row.get)
+COLONNES_REQUISES = ['id', 'listingUrl']
+
+# Coordonnées conservées telles quelles quand la source les fournit
+COLONNES_COORDONNEES = ['latitude', 'longitude']
+
+
+class AdaptateurSource:
+    """Correspondance colonnes brutes -> colonnes Marketplace pour une source"""
+
+    def __init__(self, nom, source, detection, correspondances=None):
+        self.nom = nom
+        self.source = source
+        self.detection = set(detection)
+        self.correspondances = dict(correspondances or {})
+
+    def reconnait(self, colonnes):
+        """La source produit-elle ce fichier ? (colonnes caractéristiques présentes)"""
+        return self.detection <= set(colonnes)
+
+    def adapter(self, morceau):
+        """Renommer les colonnes et compléter celles que le nettoyeur exige"""
+        morceau = morceau.rename(columns=self.correspondances)
+        for colonne in COLONNES_REQUISES:
+            if colonne not in morceau.columns:
+                morceau[colonne] = None
+        return morceau
+
+    def lire(self, chemin, niveaux_champs, taille_morceau=5000):
+        """Morceaux adaptés d'un CSV ; seules les colonnes utiles sont lues"""
+        import pandas as pd
+        from ingestion_apify import champs_utilises
+
+        utiles = set(champs_utilises(niveaux_champs)) | set(COLONNES_COORDONNEES)
+        lecteur = pd.read_csv(chemin, chunksize=taille_morceau,
+                              usecols=lambda c: self.correspondances.get(c, c) in utiles)
+        for morceau in lecteur:
+            yield self.adapter(morceau)
+
+
+# Sources connues. Le dump Marketplace « historique » est déjà au bon format ;
+# l'acteur Apify facebook-marketplace-scraper produit des noms en camelCase
+# et fournit les coordonnées de l'annonce.
+ADAPTATEURS = {
+    'marketplace': AdaptateurSource(
+        'marketplace', 'Facebook Marketplace',
+        detection=['id', 'marketplace_listing_title'],
+    ),
+    'marketplace_detaille': AdaptateurSource(
+        'marketplace_detaille', 'Facebook Marketplace',
+        detection=['id', 'listingTitle'],
+        correspondances={
+            'listingTitle': 'marketplace_listing_title',
+            'listingPrice/amount': 'listing_price/amount',
+            'listingPrice/formatted_amount_zeros_stripped': 'listing_price/formatted_amount',
+            'location/reverse_geocode_detailed/city': 'location/reverse_geocode/city',
+            'location/reverse_geocode_detailed/state': 'location/reverse_geocode/state',
+            'location/latitude': 'latitude',
+            'location/longitude': 'longitude',
+            'itemUrl': 'listingUrl',
+            'primaryListingPhoto/photo_image_url': 'primary_listing_photo/photo_image_url',
+            'listingCategoryId': 'marketplace_listing_category_id',
+            'isSold': 'is_sold',
+            'isLive': 'is_live',
+            'isPending': 'is_pending',
+            'isHidden': 'is_hidden',
+        },
+    ),
+}
+
+
+def charger_adaptateur(chemin):
+    """Adaptateur décrit dans un fichier JSON (nom, source, detection, correspondances)"""
+    with open(chemin, encoding='utf-8') as f:
+        config = json.load(f)
+    return AdaptateurSource(config['nom'], config['source'], config['detection'],
+                            config.get('correspondances'))
+
+
+def detecter_adaptateur(chemin, adaptateurs):
+    """Premier adaptateur qui reconnaît l'en-tête du fichier (None sinon)"""
+    import pandas as pd
+    colonnes = pd.read_csv(chemin, nrows=0).columns
+    for adaptateur in adaptateurs.values():
+        if adaptateur.reconnait(colonnes):
+            return adaptateur
+    return None
+
+
+def nettoyer_fichier(chemin, adaptateur, taille_morceau=5000):
+    """Nettoyer un fichier d'une source (exécuté dans un processus du pool)"""
+    from id_immobilier_FINAL import COLONNES_BDD, IDImmobilierCleanerV2
+
+    debut = time.perf_counter()
+    cleaner = IDImmobilierCleanerV2(source=adaptateur.source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_valide, nb_lignes = cleaner.nettoyer_par_morceaux(chemin, taille_morceau, adaptateur=adaptateur)
+    if len(df_valide) > 0:
+        df_valide = df_valide[COLONNES_BDD]
+    return df_valide, nb_lignes, time.perf_counter() - debut
+
+
+def nettoyer_sources(fichiers, adaptateurs=None, workers=None, taille_morceau=5000):
+    """
+    Nettoyer des dumps de plusieurs sources en parallèle et fusionner les résultats
+    Retourne (DataFrame fusionné aux colonnes BDD, mesures par source)
+    """
+    import pandas as pd
+
+    adaptateurs = adaptateurs or ADAPTATEURS
+    taches = []
+    for chemin in fichiers:
+        adaptateur = detecter_adaptateur(chemin, adaptateurs)
+        if adaptateur is None:
+            print(f"   ⚠️ {os.path.basename(chemin)}: aucune source reconnue, ignoré")
+            continue
+        taches.append((chemin, adaptateur))
+
+    print("=" * 70)
+    print(f"🌐 NETTOYAGE MULTI-SOURCES - {len(taches)} fichier(s)")
+    print("=" * 70)
+
+    debut = time.perf_counter()
+    # Résultats rangés par position du fichier dans `fichiers`, pas par ordre de fin
+    resultats, mesures = [None] * len(taches), {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(nettoyer_fichier, chemin, adaptateur, taille_morceau): i
+                   for i, (chemin, adaptateur) in enumerate(taches)}
+        for future in as_completed(futures):
+            i = futures[future]
+            chemin, adaptateur = taches[i]
+            try:
+                df_valide, nb_lignes, duree = future.result()
+            except Exception as e:
+                print(f"   ⚠️ {os.path.basename(chemin)} ({adaptateur.nom}): {e}")
+                continue
+            mesure = mesures.setdefault(adaptateur.nom, {'fichiers': 0, 'lignes': 0, 'valides': 0, 'duree_s': 0.0})
+            mesure['fichiers'] += 1
+            mesure['lignes'] += nb_lignes
+            mesure['valides'] += len(df_valide)
+            mesure['duree_s'] += duree
+            resultats[i] = df_valide
+            print(f"   ✓ {os.path.basename(chemin)} [{adaptateur.nom}]: "
+                  f"{len(df_valide)}/{nb_lignes} valides en {duree:.2f} s")
+    total_s = time.perf_counter() - debut
+
+    resultats = [df for df in resultats if df is not None and len(df) > 0]
+    df_fusion = pd.concat(resultats, ignore_index=True) if resultats else pd.DataFrame()
+    if len(df_fusion) > 0:
+        # Une annonce vue dans plusieurs dumps d'une même source : version du dernier
+        # fichier de la liste gardée (dumps passés du plus ancien au plus récent)
+        df_fusion = df_fusion.drop_duplicates(subset=['source', 'id_bien'], keep='last')
+
+    print(f"\n{'source':<22}{'fichiers':>9}{'lignes':>9}{'valides':>9}{'lignes/s':>12}")
+    for nom, mesure in sorted(mesures.items()):
+        debit = mesure['lignes'] / mesure['duree_s'] if mesure['duree_s'] else 0.0
+        print(f"{nom:<22}{mesure['fichiers']:>9}{mesure['lignes']:>9}{mesure['valides']:>9}{debit:>12,.0f}")
+        mesure['lignes_par_s'] = round(debit, 1)
+    nb_lignes = sum(m['lignes'] for m in mesures.values())
+    print(f"\n⏱️  Total: {nb_lignes} lignes en {total_s:.2f} s "
+          f"({nb_lignes / total_s if total_s else 0:,.0f} lignes/s), {len(df_fusion)} biens fusionnés")
+    print("=" * 70)
+    return df_fusion, mesures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nettoyage multi-sources ID Immobilier")
+    parser.add_argument('fichiers', nargs='+',
+                        help="Dumps CSV (source détectée par l'en-tête), du plus ancien au plus récent")
+    parser.add_argument('--adaptateur', action='append', default=[], metavar='JSON',
+                        help="Adaptateur supplémentaire (répétable)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--morceau', type=int, default=5000)
+    parser.add_argument('--format', choices=['csv', 'excel'], default='csv')
+    parser.add_argument('--dossier', default='.')
+    args = parser.parse_args()
+
+    adaptateurs = dict(ADAPTATEURS)
+    for chemin in args.adaptateur:
+        adaptateur = charger_adaptateur(chemin)
+        adaptateurs[adaptateur.nom] = adaptateur
+
+    df_fusion, _ = nettoyer_sources(args.fichiers, adaptateurs, args.workers, args.morceau)
+    if len(df_fusion) > 0:
+        from id_immobilier_FINAL import IDImmobilierCleanerV2
+        IDImmobilierCleanerV2().exporter_pour_bdd(df_fusion, format=args.format, dossier=args.dossier)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+WORKER DE NETTOYAGE - PROJET ID IMMOBILIER
+Consomme la file `jobs` de Laravel (migration create_jobs_table) :
+- Réservation atomique des jobs (reserved_at / attempts)
+- Pool de workers concurrents (un processus par worker)
+- Nouvelles tentatives avec délai, puis écriture dans `failed_jobs`
+
+Format du payload attendu (poussé côté Laravel avec Queue::pushRaw) :
+    {"uuid": "...", "displayName": "IDImmobilier\\\\NettoyageScraper",
+     "maxTries": 3, "backoff": 10,
+     "data": {"fichier": "/chemin/dump.csv", "formats": ["csv"]}}
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import queue as queue_std
+import shutil
+import signal
+import sqlite3
+import tempfile
+import time
+import traceback
+import uuid
+
+
+# Schéma SQLite équivalent à database/migrations/0001_01_01_000002_create_jobs_table.php
+SCHEMA_JOBS = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue VARCHAR NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    reserved_at INTEGER,
+    available_at INTEGER NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue_index ON jobs (queue);
+
+CREATE TABLE IF NOT EXISTS failed_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid VARCHAR NOT NULL UNIQUE,
+    connection TEXT NOT NULL,
+    queue TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    exception TEXT NOT NULL,
+    failed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Valeurs par défaut alignées sur config/queue.php (connexion 'database')
+QUEUE_DEFAUT = 'default'
+RETRY_AFTER = 90
+MAX_TENTATIVES = 3
+DELAI_NOUVELLE_TENTATIVE = 10
+
+
+class FileJobs:
+    """Accès à la table `jobs` d'une base SQLite Laravel"""
+
+    def __init__(self, chemin_db, queue=QUEUE_DEFAUT, retry_after=RETRY_AFTER):
+        self.chemin_db = chemin_db
+        self.queue = queue
+        self.retry_after = retry_after
+        self.conn = sqlite3.connect(chemin_db, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+
+    def creer_schema(self):
+        """Créer les tables (base de test uniquement, en production : php artisan migrate)"""
+        self.conn.executescript(SCHEMA_JOBS)
+
+    def publier(self, fichier, formats=('csv',), max_tentatives=MAX_TENTATIVES,
+                delai=DELAI_NOUVELLE_TENTATIVE):
+        """Ajouter un job de nettoyage dans la file"""
+        maintenant = int(time.time())
+        payload = {
+            'uuid': str(uuid.uuid4()),
+            'displayName': 'IDImmobilier\\NettoyageScraper',
+            'maxTries': max_tentatives,
+            'backoff': delai,
+            'data': {'fichier': fichier, 'formats': list(formats)}
+        }
+        curseur = self.conn.execute(
+            "INSERT INTO jobs (queue, payload, attempts, reserved_at, available_at, created_at) "
+            "VALUES (?, ?, 0, NULL, ?, ?)",
+            (self.queue, json.dumps(payload), maintenant, maintenant)
+        )
+        return curseur.lastrowid
+
+    def reserver(self):
+        """
+        Réserver atomiquement le prochain job disponible
+        Un job réservé depuis plus de retry_after secondes est considéré abandonné
+        """
+        maintenant = int(time.time())
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            job = self.conn.execute(
+                "SELECT * FROM jobs WHERE queue = ? AND ("
+                "(reserved_at IS NULL AND available_at <= ?) OR reserved_at <= ?"
+                ") ORDER BY id LIMIT 1",
+                (self.queue, maintenant, maintenant - self.retry_after)
+            ).fetchone()
+            if job is None:
+                self.conn.execute('COMMIT')
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET reserved_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (maintenant, job['id'])
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+        job = dict(job)
+        job['attempts'] += 1
+        job['reserved_at'] = maintenant
+        return job
+
+    def supprimer(self, job):
+        """Job terminé avec succès"""
+        self.conn.execute("DELETE FROM jobs WHERE id = ?", (job['id'],))
+
+    def relacher(self, job, delai):
+        """Remettre le job dans la file pour une nouvelle tentative"""
+        self.conn.execute(
+            "UPDATE jobs SET reserved_at = NULL, available_at = ? WHERE id = ?",
+            (int(time.time()) + delai, job['id'])
+        )
+
+    def echouer(self, job, exception, payload=None):
+        """
+        Déplacer le job vers failed_jobs (dans une seule transaction)
+        `payload` : payload déjà décodé, None s'il est illisible (uuid généré)
+        """
+        identifiant = payload.get('uuid') if isinstance(payload, dict) else None
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO failed_jobs (uuid, connection, queue, payload, exception) "
+                "VALUES (?, 'database', ?, ?, ?)",
+                (identifiant or str(uuid.uuid4()), job['queue'], job['payload'], exception)
+            )
+            self.conn.execute("DELETE FROM jobs WHERE id = ?", (job['id'],))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def taille(self):
+        """Nombre de jobs restant dans la file"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE queue = ?", (self.queue,)
+        ).fetchone()[0]
+
+    def fermer(self):
+        self.conn.close()
+
+
+def traiter_job(job, dossier_sortie, cleaner=None, chemin_cache=None):
+    """
+    Nettoyer le fichier référencé par le job et exporter les résultats
+    Si `chemin_cache` est fourni, les statistiques sont publiées dans la table cache
+    """
+    import pandas as pd
+    from id_immobilier_FINAL import IDImmobilierCleanerV2
+
+    data = json.loads(job['payload'])['data']
+    cleaner = cleaner or IDImmobilierCleanerV2()
+
+    dossier_job = os.path.join(dossier_sortie, f"job_{job['id']}")
+    os.makedirs(dossier_job, exist_ok=True)
+
+    # Le nettoyeur affiche un rapport détaillé : on le garde pour le journal du job
+    sortie = io.StringIO()
+    with contextlib.redirect_stdout(sortie):
+        df = pd.read_csv(data['fichier'])
+        df_clean = cleaner.nettoyer_dataset(df)
+        fichiers = [
+            cleaner.exporter_pour_bdd(df_clean, format=f, dossier=dossier_job)
+            for f in data.get('formats', ['csv'])
+        ] if len(df_clean) > 0 else []
+
+    with open(os.path.join(dossier_job, 'rapport.txt'), 'w', encoding='utf-8') as f:
+        f.write(sortie.getvalue())
+
+    resultat = {'lignes': len(df), 'valides': len(df_clean), 'fichiers': fichiers}
+    if chemin_cache and len(df_clean) > 0:
+        from cache_statistiques import publier_statistiques
+        resultat['version_cache'] = publier_statistiques(chemin_cache, df_clean, len(df))
+
+    return resultat
+
+
+class WorkerNettoyage:
+    """Boucle de consommation d'un worker (équivalent de php artisan queue:work)"""
+
+    def __init__(self, chemin_db, dossier_sortie, queue=QUEUE_DEFAUT,
+                 intervalle=3, retry_after=RETRY_AFTER, traitement=traiter_job,
+                 publier_cache=False):
+        self.file = FileJobs(chemin_db, queue=queue, retry_after=retry_after)
+        self.dossier_sortie = dossier_sortie
+        # Les statistiques sont publiées dans la même base que la file (table cache)
+        self.chemin_cache = chemin_db if publier_cache else None
+        self.intervalle = intervalle
+        self.traitement = traitement
+        self.arret_demande = False
+        self.stats = {'traites': 0, 'relaches': 0, 'echoues': 0}
+
+    def arreter(self, *_):
+        """Arrêt propre : le job en cours se termine avant la sortie"""
+        self.arret_demande = True
+
+    def executer_un(self):
+        """Traiter un job ; retourne False si la file est vide"""
+        job = self.file.reserver()
+        if job is None:
+            return False
+
+        try:
+            payload = json.loads(job['payload'])
+            if not isinstance(payload, dict):
+                raise ValueError(f"payload du job {job['id']} : objet JSON attendu")
+        except ValueError:
+            # Payload illisible : aucune nouvelle tentative ne peut réussir
+            self.file.echouer(job, traceback.format_exc())
+            self.stats['echoues'] += 1
+            return True
+
+        max_tentatives = payload.get('maxTries', MAX_TENTATIVES)
+        if job['attempts'] > max_tentatives:
+            # Job repris après retry_after (worker tué en plein traitement) alors que ses
+            # tentatives sont épuisées : échec sans le relancer, comme Laravel
+            self.file.echouer(job, f"MaxAttemptsExceededException: {payload.get('displayName', 'job')} "
+                                   f"a été tenté trop de fois ({job['attempts'] - 1}/{max_tentatives})",
+                              payload)
+            self.stats['echoues'] += 1
+            return True
+
+        try:
+            resultat = self.traitement(job, self.dossier_sortie, chemin_cache=self.chemin_cache)
+        except Exception:
+            erreur = traceback.format_exc()
+            if job['attempts'] < max_tentatives:
+                self.file.relacher(job, payload.get('backoff', DELAI_NOUVELLE_TENTATIVE))
+                self.stats['relaches'] += 1
+            else:
+                self.file.echouer(job, erreur, payload)
+                self.stats['echoues'] += 1
+            return True
+
+        self.file.supprimer(job)
+        self.stats['traites'] += 1
+        print(f"   ✓ Job {job['id']}: {resultat['valides']}/{resultat['lignes']} valides "
+              f"-> {', '.join(resultat['fichiers']) or 'aucun export'}")
+        return True
+
+    def executer(self, arret_si_vide=False, max_jobs=None):
+        """Boucle principale (polling de la table jobs)"""
+        while not self.arret_demande:
+            if max_jobs is not None and self.stats['traites'] >= max_jobs:
+                break
+            if not self.executer_un():
+                if arret_si_vide:
+                    break
+                time.sleep(self.intervalle)
+        self.file.fermer()
+        return self.stats
+
+
+def _processus_worker(chemin_db, dossier_sortie, queue, intervalle, arret_si_vide,
+                      publier_cache, resultats):
+    """Point d'entrée d'un processus du pool"""
+    worker = WorkerNettoyage(chemin_db, dossier_sortie, queue=queue, intervalle=intervalle,
+                             publier_cache=publier_cache)
+    signal.signal(signal.SIGTERM, worker.arreter)
+    signal.signal(signal.SIGINT, worker.arreter)
+    with contextlib.redirect_stdout(io.StringIO()) if arret_si_vide else contextlib.nullcontext():
+        resultats.put((os.getpid(), worker.executer(arret_si_vide=arret_si_vide)))
+
+
+def lancer_pool(chemin_db, dossier_sortie, nb_workers=4, queue=QUEUE_DEFAUT,
+                intervalle=3, arret_si_vide=False, publier_cache=False, attente=1.0):
+    """
+    Lancer `nb_workers` processus sur la même file ; retourne les stats cumulées
+    Les résultats sont attendus par tranches de `attente` secondes : un worker mort sans
+    avoir publié ses stats (OOM, crash d'une extension C) est signalé au lieu de bloquer
+    le pool indéfiniment ('morts' dans les stats)
+    """
+    resultats = multiprocessing.Queue()
+    processus = [
+        multiprocessing.Process(
+            target=_processus_worker,
+            args=(chemin_db, dossier_sortie, queue, intervalle, arret_si_vide,
+                  publier_cache, resultats)
+        )
+        for _ in range(nb_workers)
+    ]
+    for p in processus:
+        p.start()
+
+    stats, morts = [], 0
+    en_attente = {p.pid: p for p in processus}
+    try:
+        while en_attente:
+            try:
+                pid, stats_worker = resultats.get(timeout=attente)
+            except queue_std.Empty:
+                # Code de sortie 0 : stats déjà publiées, encore en transit dans la queue
+                for pid, p in list(en_attente.items()):
+                    if p.exitcode not in (None, 0):
+                        print(f"   💀 Worker {pid} mort sans résultat (code de sortie {p.exitcode})")
+                        del en_attente[pid]
+                        morts += 1
+                continue
+            en_attente.pop(pid, None)
+            stats.append(stats_worker)
+    except KeyboardInterrupt:
+        for p in processus:
+            p.terminate()
+        raise
+    for p in processus:
+        p.join()
+
+    cumul = {cle: sum(s[cle] for s in stats) for cle in ('traites', 'relaches', 'echoues')}
+    cumul['morts'] = morts
+    return cumul
+
+
+# ============================================
+# BENCHMARK DE DÉBIT
+# ============================================
+
+def benchmark_debit(fichier_csv, nb_jobs=40, nb_workers=(1, 2, 4)):
+    """
+    Mesurer le débit (jobs/s) du pool sur une base SQLite locale
+    Chaque configuration repart d'une file pleine de `nb_jobs` jobs identiques
+    """
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK WORKERS - {nb_jobs} jobs sur {os.path.basename(fichier_csv)}")
+    print("=" * 70)
+
+    resultats = {}
+    for n in nb_workers:
+        dossier = tempfile.mkdtemp(prefix='id_immobilier_jobs_')
+        try:
+            chemin_db = os.path.join(dossier, 'database.sqlite')
+            file = FileJobs(chemin_db)
+            file.creer_schema()
+            for _ in range(nb_jobs):
+                file.publier(os.path.abspath(fichier_csv))
+
+            debut = time.perf_counter()
+            stats = lancer_pool(chemin_db, dossier, nb_workers=n, arret_si_vide=True)
+            duree = time.perf_counter() - debut
+
+            assert stats['traites'] == nb_jobs and file.taille() == 0, stats
+            file.fermer()
+        finally:
+            shutil.rmtree(dossier, ignore_errors=True)
+
+        resultats[n] = nb_jobs / duree
+        print(f"   {n:>2} worker(s): {duree:6.2f} s  ->  {resultats[n]:6.1f} jobs/s")
+
+    print("=" * 70)
+    return resultats
+
+
+def main():
+    """Lancer le pool de workers ou le benchmark"""
+    parser = argparse.ArgumentParser(description="Worker de nettoyage ID Immobilier (file Laravel)")
+    parser.add_argument('--db', default='database/database.sqlite', help="Base SQLite Laravel")
+    parser.add_argument('--sortie', default='storage/app/private/nettoyage', help="Dossier des exports")
+    parser.add_argument('--queue', default=QUEUE_DEFAUT)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--sleep', type=int, default=3, help="Attente (s) quand la file est vide")
+    parser.add_argument('--cache', action='store_true',
+                        help="Publier les statistiques de chaque job dans la table cache")
+    parser.add_argument('--benchmark', metavar='CSV', help="Mesurer le débit sur ce fichier")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_debit(args.benchmark, nb_workers=sorted({1, 2, args.workers}))
+        return
+
+    os.makedirs(args.sortie, exist_ok=True)
+    print(f"🚀 {args.workers} worker(s) sur la file '{args.queue}' ({args.db})")
+    stats = lancer_pool(args.db, args.sortie, nb_workers=args.workers,
+                        queue=args.queue, intervalle=args.sleep, publier_cache=args.cache)
+    print(f"✅ Arrêt: {stats}")
+
+
+if __name__ == "__main__":
+    main()
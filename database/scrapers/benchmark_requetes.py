@@ -0,0 +1,191 @@
+"""
+BENCHMARK DES REQUÊTES - PROJET ID IMMOBILIER
+Mesure les requêtes standard du projet (analyse par quartier, filtres de type,
+fourchettes de prix au m², annonces actives, périodes de collecte) sur une base
+SQLite locale remplie, sans puis avec les index de schema_biens_immobiliers :
+- Base remplie depuis un export nettoyé (--csv) ou avec des annonces synthétiques
+- Latence médiane de chaque requête, accélération, index retenu par SQLite
+  (EXPLAIN QUERY PLAN)
+
+Utilisation :
+    python benchmark_requetes.py --lignes 500000
+    python benchmark_requetes.py --csv id_immobilier_clean_20260212_002735.csv
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from clean_data_scrapers import COLONNES_SQL, IDImmobilierCleaner, schema_biens_immobiliers
+
+
+# Paramètre remplacé par le quartier le plus fréquent des données chargées
+# (orthographe de l'export, V1 'Agoe' comme V2 'Agoè')
+QUARTIER_FREQUENT = object()
+
+# Requêtes standard : nom -> (SQL, paramètres)
+REQUETES_STANDARD = {
+    'analyse_par_quartier': (
+        "SELECT quartier, AVG(prix_m2), MIN(prix_m2), MAX(prix_m2), COUNT(*), "
+        "AVG(surface_m2), AVG(prix_fcfa) FROM biens_immobiliers "
+        "WHERE quartier != 'Non spécifié' GROUP BY quartier", ()),
+    'prix_m2_un_quartier': (
+        "SELECT AVG(prix_m2), COUNT(*) FROM biens_immobiliers WHERE quartier = ?",
+        (QUARTIER_FREQUENT,)),
+    'terrains_vente_fourchette': (
+        "SELECT COUNT(*), AVG(prix_m2) FROM biens_immobiliers "
+        "WHERE type_offre = 'Vente' AND type_bien = 'Terrain' AND prix_m2 BETWEEN ? AND ?",
+        (10000, 20000)),
+    'repartition_types': (
+        "SELECT type_offre, type_bien, COUNT(*), AVG(prix_m2) FROM biens_immobiliers "
+        "GROUP BY type_offre, type_bien", ()),
+    'actives_quartier_moins_cheres': (
+        "SELECT id_bien, prix_m2 FROM biens_immobiliers WHERE statut = 'Active' AND quartier = ? "
+        "ORDER BY prix_m2 LIMIT 20", (QUARTIER_FREQUENT,)),
+    'fourchette_prix_m2': (
+        "SELECT COUNT(*) FROM biens_immobiliers WHERE prix_m2 BETWEEN ? AND ?", (50000, 60000)),
+    'anomalies_prix_m2': (
+        "SELECT id_bien, quartier, prix_m2 FROM biens_immobiliers WHERE prix_m2 > ? "
+        "ORDER BY prix_m2 DESC LIMIT 10", (150000,)),
+    'collectes_recentes': (
+        "SELECT COUNT(*), AVG(prix_m2) FROM biens_immobiliers WHERE date_collecte >= ?",
+        ('2026-11-01',)),
+}
+
+
+def generer_biens(nb, graine=0):
+    """Biens nettoyés synthétiques aux colonnes de biens_immobiliers"""
+    rng = np.random.default_rng(graine)
+    # Noms tels que les écrit extraire_quartier
+    quartiers = np.array(list(dict.fromkeys(
+        q.capitalize() for q in IDImmobilierCleaner().quartiers_lome)) + ['Non spécifié'])
+    types_bien = np.array(['Terrain', 'Villa', 'Maison', 'Appartement', 'Immeuble', 'Commercial'])
+    surface = np.round(np.exp(rng.normal(6.0, 0.6, nb)), 1)
+    prix_m2 = np.round(np.exp(rng.normal(9.8, 0.6, nb)), 2)
+    dates = pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 365, nb), unit='D')
+    return pd.DataFrame({
+        'id_bien': np.arange(nb).astype(str),
+        'titre_complet': 'Terrain 1 lot',
+        'type_bien': types_bien[rng.choice(len(types_bien), nb, p=[0.55, 0.15, 0.1, 0.12, 0.04, 0.04])],
+        'type_offre': np.where(rng.random(nb) < 0.8, 'Vente', 'Location'),
+        'ville': 'Lomé',
+        'quartier': quartiers[rng.integers(0, len(quartiers), nb)],
+        'surface_m2': surface,
+        'prix_fcfa': np.round(surface * prix_m2, 0),
+        'prix_m2': prix_m2,
+        'latitude': None,
+        'longitude': None,
+        'source': 'Facebook Marketplace',
+        'date_publication': None,
+        'date_collecte': dates.strftime('%Y-%m-%d'),
+        'url_annonce': 'https://www.facebook.com/marketplace/item/' + pd.Series(np.arange(nb)).astype(str),
+        'url_photo': None,
+        'statut': np.where(rng.random(nb) < 0.85, 'Active', 'Vendue'),
+    })
+
+
+def quartier_frequent(df):
+    """Quartier identifié le plus fréquent ('Non spécifié' si aucun)"""
+    quartiers = df.loc[df['quartier'] != 'Non spécifié', 'quartier'].value_counts()
+    return quartiers.index[0] if len(quartiers) else 'Non spécifié'
+
+
+def requetes_pour(df):
+    """REQUETES_STANDARD avec les paramètres QUARTIER_FREQUENT remplacés pour `df`"""
+    quartier = quartier_frequent(df)
+    return {nom: (sql, tuple(quartier if p is QUARTIER_FREQUENT else p for p in parametres))
+            for nom, (sql, parametres) in REQUETES_STANDARD.items()}
+
+
+def remplir_base(chemin_db, df):
+    """Table sans index secondaires, remplie en une transaction"""
+    conn = sqlite3.connect(chemin_db)
+    conn.executescript(schema_biens_immobiliers('sqlite', index=False))
+    colonnes = [nom for nom, _ in COLONNES_SQL]
+    lignes = df[colonnes].astype(object).where(df[colonnes].notna(), None).itertuples(index=False, name=None)
+    with conn:
+        conn.executemany(f"INSERT INTO biens_immobiliers VALUES ({', '.join('?' * len(colonnes))})", lignes)
+    return conn
+
+
+def plan(conn, sql, parametres):
+    """Index utilisés d'après EXPLAIN QUERY PLAN ('table' si parcours complet)"""
+    details = [ligne[-1] for ligne in conn.execute('EXPLAIN QUERY PLAN ' + sql, parametres)]
+    index = [d.split(' INDEX ')[1].split(' ')[0] for d in details if ' INDEX ' in d]
+    return ', '.join(index) if index else 'table'
+
+
+def mesurer(conn, requetes, repetitions):
+    """Latence médiane (ms) et plan de chaque requête"""
+    resultats = {}
+    for nom, (sql, parametres) in requetes.items():
+        conn.execute(sql, parametres).fetchall()   # page cache chaud
+        durees = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            conn.execute(sql, parametres).fetchall()
+            durees.append((time.perf_counter() - debut) * 1000)
+        resultats[nom] = (float(np.median(durees)), plan(conn, sql, parametres))
+    return resultats
+
+
+def benchmark(df, repetitions=20):
+    """Requêtes standard sans puis avec les index ; retourne {requête: (sans, avec)} en ms"""
+    dossier = tempfile.mkdtemp(prefix='id_immobilier_requetes_')
+    chemin_db = os.path.join(dossier, 'biens.sqlite')
+    requetes = requetes_pour(df)
+    try:
+        debut = time.perf_counter()
+        conn = remplir_base(chemin_db, df)
+        duree_remplissage = time.perf_counter() - debut
+        sans_index = mesurer(conn, requetes, repetitions)
+
+        debut = time.perf_counter()
+        conn.executescript(schema_biens_immobiliers('sqlite', index=True))
+        conn.execute('ANALYZE')
+        duree_index = time.perf_counter() - debut
+        avec_index = mesurer(conn, requetes, repetitions)
+        conn.close()
+        taille_mo = os.path.getsize(chemin_db) / 1e6
+    finally:
+        for fichier in os.listdir(dossier):
+            os.remove(os.path.join(dossier, fichier))
+        os.rmdir(dossier)
+
+    print("=" * 90)
+    print(f"⏱️  REQUÊTES STANDARD - {len(df):,} biens (SQLite {sqlite3.sqlite_version}, "
+          f"médiane de {repetitions} exécutions)")
+    print("=" * 90)
+    print(f"   Remplissage {duree_remplissage:.1f} s, création des index + ANALYZE {duree_index:.1f} s, "
+          f"base finale {taille_mo:.0f} Mo")
+    print(f"   Quartier des requêtes par quartier: {quartier_frequent(df)}\n")
+    print(f"{'requête':<32}{'sans index':>12}{'avec index':>12}{'gain':>8}  index utilisé")
+    for nom in REQUETES_STANDARD:
+        sans, _ = sans_index[nom]
+        avec, index = avec_index[nom]
+        print(f"{nom:<32}{sans:>10.2f}ms{avec:>10.2f}ms{sans / avec if avec else 0:>7.1f}x  {index}")
+    print("=" * 90)
+    return {nom: (sans_index[nom][0], avec_index[nom][0]) for nom in REQUETES_STANDARD}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des requêtes sur biens_immobiliers")
+    parser.add_argument('--csv', help="Export nettoyé à charger (sinon données synthétiques)")
+    parser.add_argument('--lignes', type=int, default=200000, help="Nombre de biens synthétiques")
+    parser.add_argument('--repetitions', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.csv:
+        df = pd.read_csv(args.csv, encoding='utf-8-sig')
+    else:
+        df = generer_biens(args.lignes)
+    benchmark(df, args.repetitions)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,92 @@ import re
 from datetime import datetime
 import json
 
+from resume_statistique import resumer
+
+
+# ============================================
+# SCHÉMA SQL : TABLE + INDEX
+# ============================================
+
+# Colonnes de biens_immobiliers et leur type SQL
+COLONNES_SQL = [
+    ('id_bien', 'VARCHAR(50) NOT NULL'),
+    ('titre_complet', 'TEXT'),
+    ('type_bien', 'VARCHAR(50)'),
+    ('type_offre', 'VARCHAR(20)'),
+    ('ville', 'VARCHAR(100)'),
+    ('quartier', 'VARCHAR(100)'),
+    ('surface_m2', 'FLOAT'),
+    ('prix_fcfa', 'DECIMAL(15,2)'),
+    ('prix_m2', 'DECIMAL(10,2)'),
+    ('latitude', 'DECIMAL(10,8)'),
+    ('longitude', 'DECIMAL(11,8)'),
+    ('source', 'VARCHAR(50)'),
+    ('date_publication', 'DATE'),
+    ('date_collecte', 'DATE'),
+    ('url_annonce', 'TEXT'),
+    ('url_photo', 'TEXT'),
+    ('statut', 'VARCHAR(20)'),
+]
+
+# Index choisis pour les requêtes du projet (voir benchmark_requetes.py) :
+# égalités d'abord, puis la colonne de plage ou de tri, puis les colonnes lues
+# (index couvrant : la requête est servie sans lire la table)
+INDEX_BIENS = [
+    # analyser_par_quartier : GROUP BY quartier sur prix_m2, surface_m2, prix_fcfa
+    ('idx_biens_quartier_prix_m2', ['quartier', 'prix_m2', 'surface_m2', 'prix_fcfa']),
+    # Filtres de type (terrains à vendre...) + fourchette de prix au m²
+    ('idx_biens_offre_type_prix_m2', ['type_offre', 'type_bien', 'prix_m2']),
+    # Annonces actives d'un quartier
+    ('idx_biens_statut_quartier', ['statut', 'quartier', 'prix_m2']),
+    # Fourchettes de prix au m² toutes catégories (anomalies, histogrammes)
+    ('idx_biens_prix_m2', ['prix_m2']),
+    # Filtres par période de collecte (inutile si la table est partitionnée) ;
+    # prix_m2 inclus : sans lui, une période large coûte plus cher qu'un parcours de table
+    ('idx_biens_date_collecte', ['date_collecte', 'prix_m2']),
+]
+
+
+def schema_biens_immobiliers(dialecte='sqlite', index=True, partitions=None):
+    """
+    CREATE TABLE biens_immobiliers (+ index)
+    dialecte 'sqlite' : CREATE INDEX IF NOT EXISTS séparés
+    dialecte 'mysql'  : index déclarés dans la table ; `partitions` (liste de mois
+    'AAAA-MM') active le partitionnement par date_collecte (RANGE COLUMNS). MySQL
+    exige alors date_collecte dans la clé primaire : (id_bien, date_collecte).
+    """
+    if partitions and dialecte != 'mysql':
+        raise ValueError("Partitionnement par date_collecte : dialecte 'mysql' uniquement")
+
+    lignes = [f"    {nom} {type_sql}" for nom, type_sql in COLONNES_SQL]
+    if partitions:
+        lignes = [l.replace('date_collecte DATE', 'date_collecte DATE NOT NULL') for l in lignes]
+        lignes.append("    PRIMARY KEY (id_bien, date_collecte)")
+    else:
+        lignes.append("    PRIMARY KEY (id_bien)")
+
+    index_actifs = [(nom, cols) for nom, cols in INDEX_BIENS
+                    if index and not (partitions and cols[0] == 'date_collecte')]
+    if dialecte == 'mysql':
+        lignes += [f"    INDEX {nom} ({', '.join(cols)})" for nom, cols in index_actifs]
+
+    sql = "CREATE TABLE IF NOT EXISTS biens_immobiliers (\n" + ",\n".join(lignes) + "\n)"
+    if partitions:
+        # Une partition par mois : 'p2026_02' contient les collectes de février 2026
+        definitions = []
+        for mois in sorted(set(partitions)):
+            annee, numero = (int(x) for x in mois.split('-'))
+            suivant = f"{annee + numero // 12}-{numero % 12 + 1:02d}-01"
+            definitions.append(f"    PARTITION p{annee}_{numero:02d} VALUES LESS THAN ('{suivant}')")
+        definitions.append("    PARTITION p_futur VALUES LESS THAN (MAXVALUE)")
+        sql += "\nPARTITION BY RANGE COLUMNS (date_collecte) (\n" + ",\n".join(definitions) + "\n)"
+    sql += ";\n"
+
+    if dialecte == 'sqlite':
+        for nom, cols in index_actifs:
+            sql += f"CREATE INDEX IF NOT EXISTS {nom} ON biens_immobiliers ({', '.join(cols)});\n"
+    return sql
+
 
 class IDImmobilierCleaner:
     """
@@ -23,6 +109,9 @@ class IDImmobilierCleaner:
         # Configuration
         self.surface_lot_standard = 350  # 1 lot standard au Togo ≈ 350 m²
         
+        # Statistiques du dernier nettoyage (resume_statistique.py), pour les rapports et exports
+        self.resume = None
+        
         # Liste des quartiers de Lomé (à compléter)
         self.quartiers_lome = [
             'adakpamé', 'adidogomé', 'akodesséwa', 'adeticopé', 'akodessewa',
@@ -359,20 +448,23 @@ class IDImmobilierCleaner:
         print("📊 STATISTIQUES FINALES")
         print("="*60)
         
+        # Calculées une fois, réutilisées par les analyses et exports
+        self.resume = resumer(df_valide, len(df))
+        
         if len(df_valide) > 0:
-            print(f"Prix moyen au m²:     {df_valide['prix_m2'].mean():,.0f} FCFA")
-            print(f"Prix médian au m²:    {df_valide['prix_m2'].median():,.0f} FCFA")
-            print(f"Surface moyenne:      {df_valide['surface_m2'].mean():.0f} m²")
-            print(f"Prix moyen total:     {df_valide['prix_fcfa'].mean():,.0f} FCFA")
+            print(f"Prix moyen au m²:     {self.resume['prix_m2'].moyenne:,.0f} FCFA")
+            print(f"Prix médian au m²:    {self.resume['prix_m2'].mediane:,.0f} FCFA")
+            print(f"Surface moyenne:      {self.resume['surface_m2'].moyenne:.0f} m²")
+            print(f"Prix moyen total:     {self.resume['prix_fcfa'].moyenne:,.0f} FCFA")
             
             print(f"\n📍 Répartition par type de bien:")
-            print(df_valide['type_bien'].value_counts())
+            print(pd.Series(self.resume.repartitions['type_bien'], name='count').rename_axis('type_bien'))
             
             print(f"\n📋 Répartition par type d'offre:")
-            print(df_valide['type_offre'].value_counts())
+            print(pd.Series(self.resume.repartitions['type_offre'], name='count').rename_axis('type_offre'))
             
             print(f"\n🏙️ Top 10 quartiers:")
-            quartiers = df_valide[df_valide['quartier'] != 'Non spécifié']['quartier'].value_counts().head(10)
+            quartiers = self.resume.tableau_quartiers(10, par='nb')['Nb Annonces'].astype(int).rename('count')
             print(quartiers)
         else:
             print("⚠️ Aucune donnée valide après nettoyage")
@@ -385,10 +477,12 @@ class IDImmobilierCleaner:
     # EXPORT POUR BASE DE DONNÉES
     # ============================================
     
-    def exporter_pour_bdd(self, df_clean, format='csv'):
+    def exporter_pour_bdd(self, df_clean, format='csv', depot=None, resume=None):
         """
         Exporter selon la structure de la base de données
         Structure SQL définie dans le TDR
+        `depot` : DepotExports (depot_exports.py), export écrit seulement si les données ont changé
+        `resume` : ResumeStatistique de df_clean déjà calculé (feuille Statistiques)
         """
         
         # Colonnes finales selon la structure SQL
@@ -415,77 +509,74 @@ class IDImmobilierCleaner:
         # Sélectionner uniquement les colonnes de la BDD
         df_export = df_clean[colonnes_bdd].copy()
         
-        # Générer timestamp pour le nom de fichier
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        if format == 'csv':
-            filename = f'id_immobilier_clean_{timestamp}.csv'
-            df_export.to_csv(filename, index=False, encoding='utf-8-sig')
-            print(f"\n✅ Export CSV: {filename}")
-        
-        elif format == 'excel':
-            filename = f'id_immobilier_clean_{timestamp}.xlsx'
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                # Feuille 1: Données nettoyées
-                df_export.to_excel(writer, sheet_name='Données', index=False)
-                
-                # Feuille 2: Statistiques
-                stats = self.generer_statistiques(df_clean)
-                stats.to_excel(writer, sheet_name='Statistiques')
-            
-            print(f"\n✅ Export Excel: {filename}")
-        
-        elif format == 'json':
-            filename = f'id_immobilier_clean_{timestamp}.json'
-            df_export.to_json(filename, orient='records', force_ascii=False, indent=2)
-            print(f"\n✅ Export JSON: {filename}")
-        
-        elif format == 'sql':
-            filename = f'id_immobilier_insert_{timestamp}.sql'
-            self.generer_insert_sql(df_export, filename)
-            print(f"\n✅ Export SQL: {filename}")
-        
+        def ecrire(df, filename):
+            if format == 'csv':
+                df.to_csv(filename, index=False, encoding='utf-8-sig')
+            elif format == 'excel':
+                with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+                    # Feuille 1: Données nettoyées
+                    df.to_excel(writer, sheet_name='Données', index=False)
+                    
+                    # Feuille 2: Statistiques
+                    stats = self.generer_statistiques(df_clean, resume)
+                    stats.to_excel(writer, sheet_name='Statistiques')
+            elif format == 'json':
+                df.to_json(filename, orient='records', force_ascii=False, indent=2)
+            elif format == 'sql':
+                self.generer_insert_sql(df, filename)
+        
+        if depot is not None:
+            # Dépôt adressé par contenu : rien n'est réécrit si les données n'ont pas changé
+            filename, nouveau = depot.deposer(df_export, format, ecrire)
+            if not nouveau:
+                print(f"\n⏭️ Export {format.upper()} inchangé, non réécrit: {filename}")
+                return filename
+        else:
+            # Générer timestamp pour le nom de fichier
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            extension = {'excel': 'xlsx'}.get(format, format)
+            prefixe = 'id_immobilier_insert' if format == 'sql' else 'id_immobilier_clean'
+            filename = f'{prefixe}_{timestamp}.{extension}'
+            ecrire(df_export, filename)
+        
+        print(f"\n✅ Export {format.upper()}: {filename}")
         return filename
     
-    def generer_statistiques(self, df):
-        """Générer des statistiques pour Excel"""
+    def generer_statistiques(self, df, resume=None):
+        """Générer des statistiques pour Excel (lues dans le ResumeStatistique de df)"""
+        if resume is None:
+            resume = resumer(df)
+        types_bien = resume.repartitions.get('type_bien', {})
+        types_offre = resume.repartitions.get('type_offre', {})
         stats = {
-            'Total lignes': len(df),
-            'Prix moyen (FCFA)': df['prix_fcfa'].mean(),
-            'Prix médian (FCFA)': df['prix_fcfa'].median(),
-            'Prix moyen au m² (FCFA)': df['prix_m2'].mean(),
-            'Surface moyenne (m²)': df['surface_m2'].mean(),
-            'Terrains': (df['type_bien'] == 'Terrain').sum(),
-            'Ventes': (df['type_offre'] == 'Vente').sum(),
-            'Locations': (df['type_offre'] == 'Location').sum()
+            'Total lignes': resume.nb_valides,
+            'Prix moyen (FCFA)': resume['prix_fcfa'].moyenne,
+            'Prix médian (FCFA)': resume['prix_fcfa'].mediane,
+            'Prix moyen au m² (FCFA)': resume['prix_m2'].moyenne,
+            'Surface moyenne (m²)': resume['surface_m2'].moyenne,
+            'Terrains': types_bien.get('Terrain', 0),
+            'Ventes': types_offre.get('Vente', 0),
+            'Locations': types_offre.get('Location', 0)
         }
         return pd.DataFrame([stats]).T.rename(columns={0: 'Valeur'})
     
-    def generer_insert_sql(self, df, filename):
-        """Générer des requêtes INSERT SQL"""
+    def generer_insert_sql(self, df, filename, dialecte='sqlite', index=True, partitionner=False):
+        """
+        Générer des requêtes INSERT SQL
+        Schéma avec index (voir INDEX_BIENS) ; partitionner=True : partitions mensuelles
+        par date_collecte couvrant les dates des données (MySQL)
+        """
+        partitions = None
+        if partitionner:
+            dialecte = 'mysql'
+            partitions = sorted(pd.to_datetime(df['date_collecte'].dropna()).dt.strftime('%Y-%m').unique())
+        
         with open(filename, 'w', encoding='utf-8') as f:
             f.write("-- Script SQL pour ID Immobilier\n")
             f.write("-- Généré le: {}\n\n".format(datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
             
-            f.write("CREATE TABLE IF NOT EXISTS biens_immobiliers (\n")
-            f.write("    id_bien VARCHAR(50) PRIMARY KEY,\n")
-            f.write("    titre_complet TEXT,\n")
-            f.write("    type_bien VARCHAR(50),\n")
-            f.write("    type_offre VARCHAR(20),\n")
-            f.write("    ville VARCHAR(100),\n")
-            f.write("    quartier VARCHAR(100),\n")
-            f.write("    surface_m2 FLOAT,\n")
-            f.write("    prix_fcfa DECIMAL(15,2),\n")
-            f.write("    prix_m2 DECIMAL(10,2),\n")
-            f.write("    latitude DECIMAL(10,8),\n")
-            f.write("    longitude DECIMAL(11,8),\n")
-            f.write("    source VARCHAR(50),\n")
-            f.write("    date_publication DATE,\n")
-            f.write("    date_collecte DATE,\n")
-            f.write("    url_annonce TEXT,\n")
-            f.write("    url_photo TEXT,\n")
-            f.write("    statut VARCHAR(20)\n")
-            f.write(");\n\n")
+            f.write(schema_biens_immobiliers(dialecte, index=index, partitions=partitions))
+            f.write("\n")
             
             for _, row in df.iterrows():
                 values = []
@@ -506,23 +597,17 @@ class IDImmobilierCleaner:
     # ANALYSES COMPLÉMENTAIRES
     # ============================================
     
-    def analyser_par_quartier(self, df):
+    def analyser_par_quartier(self, df, resume=None):
         """Analyse détaillée par quartier (pour l'indice immobilier)"""
         print("\n" + "="*60)
         print("📍 ANALYSE PAR QUARTIER")
         print("="*60)
         
-        analyse = df[df['quartier'] != 'Non spécifié'].groupby('quartier').agg({
-            'prix_m2': ['mean', 'median', 'min', 'max', 'count'],
-            'surface_m2': 'mean',
-            'prix_fcfa': 'mean'
-        }).round(0)
-        
-        analyse.columns = ['Prix/m² Moyen', 'Prix/m² Médian', 'Prix/m² Min', 
-                          'Prix/m² Max', 'Nb Annonces', 'Surface Moy', 'Prix Moyen']
+        if resume is None:
+            resume = resumer(df)
         
-        # Trier par prix au m² décroissant
-        analyse = analyse.sort_values('Prix/m² Moyen', ascending=False)
+        # Trié par prix au m² décroissant
+        analyse = resume.tableau_quartiers()
         
         print(analyse)
         return analyse
@@ -562,6 +647,12 @@ def main():
     """
     Fonction principale pour nettoyer les données Facebook Marketplace
     """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Nettoyage ID Immobilier")
+    parser.add_argument('--depot', metavar='DOSSIER',
+                        help="Dépôt adressé par contenu : exports inchangés non réécrits")
+    args = parser.parse_args()
     
     print("="*60)
     print("🏠 PROJET ID IMMOBILIER - NETTOYAGE DES DONNÉES")
@@ -582,7 +673,7 @@ def main():
     # 4. Analyses complémentaires
     if len(df_clean) > 0:
         # Analyse par quartier
-        analyse_quartier = cleaner.analyser_par_quartier(df_clean)
+        analyse_quartier = cleaner.analyser_par_quartier(df_clean, cleaner.resume)
         
         # Détection des anomalies
         anomalies = cleaner.detecter_anomalies(df_clean)
@@ -592,18 +683,27 @@ def main():
         print("💾 EXPORTS")
         print("="*60)
         
-        cleaner.exporter_pour_bdd(df_clean, format='csv')
-        cleaner.exporter_pour_bdd(df_clean, format='excel')
-        cleaner.exporter_pour_bdd(df_clean, format='json')
-        cleaner.exporter_pour_bdd(df_clean, format='sql')
+        depot = None
+        if args.depot:
+            # Module de la version optimisée (dossier voisin), chargé seulement avec --depot
+            import os
+            import sys
+            sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         '222 facebook_scaping.zip_unzipped'))
+            from depot_exports import DepotExports
+            depot = DepotExports(args.depot)
+        cleaner.exporter_pour_bdd(df_clean, format='csv', depot=depot)
+        cleaner.exporter_pour_bdd(df_clean, format='excel', depot=depot, resume=cleaner.resume)
+        cleaner.exporter_pour_bdd(df_clean, format='json', depot=depot)
+        cleaner.exporter_pour_bdd(df_clean, format='sql', depot=depot)
         
         # 6. Résumé final
         print("\n" + "="*60)
         print("✅ NETTOYAGE TERMINÉ")
         print("="*60)
         print(f"📊 Données valides: {len(df_clean)}/{len(df)} ({len(df_clean)/len(df)*100:.1f}%)")
-        print(f"📍 Quartiers identifiés: {(df_clean['quartier'] != 'Non spécifié').sum()}")
-        print(f"💰 Prix moyen au m²: {df_clean['prix_m2'].mean():,.0f} FCFA")
+        print(f"📍 Quartiers identifiés: {cleaner.resume.quartiers_trouves}")
+        print(f"💰 Prix moyen au m²: {cleaner.resume['prix_m2'].moyenne:,.0f} FCFA")
         print("="*60)
     
     else:
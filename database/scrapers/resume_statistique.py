@@ -0,0 +1,399 @@
+"""
+RÉSUMÉ STATISTIQUE EN UNE PASSE - PROJET ID IMMOBILIER
+Un seul moteur pour les statistiques des rapports des deux nettoyeurs (résultats de
+nettoyer_dataset, TOP 10 des quartiers, generer_statistiques / analyser_par_quartier
+de la V1, feuille Excel Statistiques, statistiques publiées en cache et en JSON) :
+- Colonnes de regroupement factorisées une fois (quartier, type_bien, type_offre)
+- Comptes et sommes par groupe avec np.bincount, min/max avec ufunc.reduceat
+- Médianes par groupe lues dans un seul tri (groupe, prix au m²)
+- Résultat typé ResumeStatistique, consommé par tous les rapports
+Placé à côté de clean_data_scrapers.py ; la V2 l'importe depuis ce dossier parent
+(voir DOSSIER_COMMUN dans id_immobilier_FINAL.py).
+
+Utilisation :
+    python resume_statistique.py id_immobilier_optimise_20260212_002735.csv --json stats.json
+    python resume_statistique.py --benchmark 1000000
+"""
+
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+NON_SPECIFIE = 'Non spécifié'
+COLONNES_NUMERIQUES = ('prix_m2', 'surface_m2', 'prix_fcfa')
+COLONNES_REPARTITION = ('type_bien', 'type_offre')
+# Colonne triée dans chaque groupe (médianes par quartier)
+COLONNE_MEDIANE = 'prix_m2'
+COLONNES_TABLEAU = ['Prix/m² Moyen', 'Prix/m² Médian', 'Prix/m² Min', 'Prix/m² Max',
+                    'Nb Annonces', 'Surface Moy', 'Prix Moyen']
+
+# Quartiers des annonces synthétiques (noms canoniques de recherche_quartiers.ALIAS_QUARTIERS)
+QUARTIERS_SYNTHETIQUES = ['adeticopé', 'adéwui', 'akodesséwa', 'attikoumé', 'cacavéli',
+                          'hédzranawoé', 'lomé-2', 'nyékonakpoé', 'octaviano']
+
+
+@dataclass
+class StatsColonne:
+    """Agrégats d'une colonne numérique (valeurs manquantes ignorées)"""
+    nb: int
+    somme: float
+    minimum: float
+    maximum: float
+    mediane: float = math.nan
+
+    @property
+    def moyenne(self):
+        return self.somme / self.nb if self.nb else math.nan
+
+
+@dataclass
+class StatsQuartier:
+    """Agrégats d'un quartier"""
+    nb_annonces: int
+    colonnes: Dict[str, StatsColonne]
+
+    def __getitem__(self, colonne):
+        return self.colonnes[colonne]
+
+
+@dataclass
+class ResumeStatistique:
+    """Statistiques d'un jeu d'annonces valides, calculées une fois par resumer()"""
+    nb_lignes: int
+    nb_valides: int
+    nb_non_specifie: int
+    globales: Dict[str, StatsColonne]
+    quartiers: Dict[str, StatsQuartier] = field(default_factory=dict)
+    repartitions: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def taux_validite(self):
+        return self.nb_valides / self.nb_lignes * 100 if self.nb_lignes else math.nan
+
+    @property
+    def quartiers_trouves(self):
+        """Annonces dont le quartier est identifié"""
+        return self.nb_valides - self.nb_non_specifie
+
+    def __getitem__(self, colonne):
+        return self.globales[colonne]
+
+    # ---------- Rapports ----------
+
+    def tableau_quartiers(self, n=None, par='prix_m2'):
+        """
+        Tableau par quartier (colonnes d'analyser_par_quartier), arrondi ;
+        trié par prix au m² moyen décroissant (par='prix_m2') ou par nombre d'annonces (par='nb')
+        """
+        lignes = {
+            quartier: {
+                'Prix/m² Moyen': s['prix_m2'].moyenne,
+                'Prix/m² Médian': s['prix_m2'].mediane,
+                'Prix/m² Min': s['prix_m2'].minimum,
+                'Prix/m² Max': s['prix_m2'].maximum,
+                'Nb Annonces': s.nb_annonces,
+                'Surface Moy': s['surface_m2'].moyenne,
+                'Prix Moyen': s['prix_fcfa'].moyenne,
+            }
+            for quartier, s in self.quartiers.items()
+        }
+        tableau = pd.DataFrame.from_dict(lignes, orient='index', columns=COLONNES_TABLEAU).round(0)
+        tableau.index.name = 'quartier'
+        if par == 'nb' and len(tableau):
+            # Égalités dans l'ordre alphabétique des quartiers
+            tableau = tableau.sort_index().sort_values('Nb Annonces', ascending=False, kind='stable')
+        return tableau if n is None else tableau.head(n)
+
+    def feuille_statistiques(self):
+        """Feuille Statistiques du classeur Excel (une colonne 'Valeur')"""
+        valeurs = {
+            'Total lignes': self.nb_valides,
+            'Prix moyen (FCFA)': self['prix_fcfa'].moyenne,
+            'Prix médian (FCFA)': self['prix_fcfa'].mediane,
+            'Prix moyen au m² (FCFA)': self['prix_m2'].moyenne,
+            'Prix médian au m² (FCFA)': self['prix_m2'].mediane,
+            'Surface moyenne (m²)': self['surface_m2'].moyenne,
+            'Quartiers trouvés': self.quartiers_trouves,
+            'Nb quartiers': len(self.quartiers),
+        }
+        for colonne, comptes in self.repartitions.items():
+            for modalite, nb in comptes.items():
+                valeurs[f'{colonne}: {modalite}'] = nb
+        return pd.DataFrame({'Valeur': pd.Series(valeurs, dtype=object)})
+
+    def en_dict(self):
+        """Statistiques publiées (cache Laravel, JSON) : {resume, quartiers, types_bien, types_offre}"""
+        quartiers = {
+            quartier: {
+                'prix_m2_moyen': _nombre(s['prix_m2'].moyenne),
+                'prix_m2_median': _nombre(s['prix_m2'].mediane),
+                'prix_m2_min': _nombre(s['prix_m2'].minimum),
+                'prix_m2_max': _nombre(s['prix_m2'].maximum),
+                'nb_annonces': s.nb_annonces,
+                'surface_moyenne': _nombre(s['surface_m2'].moyenne),
+                'prix_moyen': _nombre(s['prix_fcfa'].moyenne)
+            }
+            for quartier, s in self.quartiers.items()
+        }
+        resume = {
+            'nb_valides': self.nb_valides,
+            'nb_lignes': self.nb_lignes,
+            'taux_validite': _nombre(self.taux_validite, 1),
+            'prix_m2_moyen': _nombre(self['prix_m2'].moyenne),
+            'prix_m2_median': _nombre(self['prix_m2'].mediane),
+            'surface_moyenne': _nombre(self['surface_m2'].moyenne),
+            'prix_moyen': _nombre(self['prix_fcfa'].moyenne),
+            'nb_quartiers': len(quartiers),
+            'calcule_le': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        sortie = {'resume': resume, 'quartiers': quartiers}
+        for colonne, comptes in self.repartitions.items():
+            sortie[colonne.replace('type_', 'types_')] = dict(comptes)
+        return sortie
+
+    def ecrire_json(self, chemin):
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump(self.en_dict(), f, indent=2, ensure_ascii=False)
+        return chemin
+
+
+def _nombre(valeur, decimales=0):
+    """Arrondir une statistique (None si absente)"""
+    if valeur is None or (isinstance(valeur, float) and math.isnan(valeur)):
+        return None
+    return round(float(valeur), decimales)
+
+
+def _colonne(df, nom):
+    """Valeurs float64 d'une colonne (NaN si absente ou non numérique)"""
+    if nom not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[nom], errors='coerce').to_numpy(dtype=float)
+
+
+def _factoriser(serie):
+    """Codes 0..k-1 et modalités ; les valeurs manquantes vont dans un groupe k écarté"""
+    codes, modalites = pd.factorize(serie, sort=True)
+    codes = codes.astype(np.intp)
+    codes[codes < 0] = len(modalites)
+    return codes, modalites
+
+
+def _stats_groupees(codes, nb_groupes, colonnes):
+    """
+    Agrégats par groupe de chaque colonne : {nom: (nb, somme, min, max, médiane)}
+    Un seul ordre (groupe, colonne médiane) ; les autres colonnes sont relues dans
+    le même ordre pour min/max par reduceat (les groupes sont contigus)
+    """
+    comptes = np.bincount(codes, minlength=nb_groupes)
+    non_vides = np.flatnonzero(comptes)
+    debuts = np.concatenate(([0], np.cumsum(comptes)[:-1]))[non_vides]
+    # Tri des valeurs (NaN en fin) puis tri stable des codes, par base en 16 bits :
+    # même ordre que np.lexsort, 3x plus rapide
+    par_valeur = np.argsort(colonnes[COLONNE_MEDIANE])
+    type_codes = np.int16 if nb_groupes <= np.iinfo(np.int16).max else np.intp
+    ordre = par_valeur[np.argsort(codes[par_valeur].astype(type_codes), kind='stable')]
+
+    resultats = {}
+    for nom, valeurs in colonnes.items():
+        presentes = ~np.isnan(valeurs)
+        nb = np.bincount(codes, weights=presentes, minlength=nb_groupes).astype(np.int64)
+        somme = np.bincount(codes, weights=np.where(presentes, valeurs, 0.0), minlength=nb_groupes)
+        minimum = np.full(nb_groupes, np.nan)
+        maximum = np.full(nb_groupes, np.nan)
+        mediane = np.full(nb_groupes, np.nan)
+        if len(non_vides):
+            groupees = valeurs[ordre]
+            minimum[non_vides] = np.fmin.reduceat(groupees, debuts)
+            maximum[non_vides] = np.fmax.reduceat(groupees, debuts)
+            if nom == COLONNE_MEDIANE:
+                # Triées dans chaque groupe, NaN en fin de groupe
+                nb_g = nb[non_vides]
+                avec = nb_g > 0
+                bas = debuts[avec] + (nb_g[avec] - 1) // 2
+                haut = debuts[avec] + nb_g[avec] // 2
+                mediane[non_vides[avec]] = (groupees[bas] + groupees[haut]) / 2
+        resultats[nom] = (nb, somme, minimum, maximum, mediane)
+    return resultats
+
+
+def _comptes(serie):
+    """Comptes par modalité, décroissants (ordre de value_counts)"""
+    codes, modalites = pd.factorize(serie)
+    comptes = np.bincount(codes[codes >= 0], minlength=len(modalites))
+    ordre = np.argsort(-comptes, kind='stable')
+    return {str(modalites[i]): int(comptes[i]) for i in ordre}
+
+
+def resumer(df_valide, nb_lignes_initiales=None):
+    """Calculer le ResumeStatistique d'annonces valides (une passe par colonne)"""
+    colonnes = {nom: _colonne(df_valide, nom) for nom in COLONNES_NUMERIQUES}
+    if 'quartier' in df_valide:
+        codes, modalites = _factoriser(df_valide['quartier'])
+    else:
+        codes, modalites = np.zeros(len(df_valide), dtype=np.intp), pd.Index([])
+    nb_groupes = len(modalites) + 1
+    groupes = _stats_groupees(codes, nb_groupes, colonnes)
+    comptes = np.bincount(codes, minlength=nb_groupes)
+
+    # Globales : sommes des groupes ; médiane par sélection (np.nanmedian, sans tri complet)
+    globales = {}
+    for nom, (nb, somme, minimum, maximum, _) in groupes.items():
+        total = int(nb.sum())
+        globales[nom] = StatsColonne(
+            nb=total, somme=float(somme.sum()),
+            minimum=float(np.nanmin(minimum)) if total else math.nan,
+            maximum=float(np.nanmax(maximum)) if total else math.nan,
+            mediane=float(np.nanmedian(colonnes[nom])) if total else math.nan)
+
+    # Quartiers identifiés, par prix au m² moyen décroissant
+    non_specifie = modalites.get_loc(NON_SPECIFIE) if NON_SPECIFIE in modalites else -1
+    quartiers = {}
+    for code, quartier in enumerate(modalites):
+        if code == non_specifie:
+            continue
+        quartiers[str(quartier)] = StatsQuartier(
+            nb_annonces=int(groupes[COLONNE_MEDIANE][0][code]),
+            colonnes={nom: StatsColonne(int(nb[code]), float(somme[code]), float(minimum[code]),
+                                        float(maximum[code]), float(mediane[code]))
+                      for nom, (nb, somme, minimum, maximum, mediane) in groupes.items()})
+    quartiers = dict(sorted(quartiers.items(), key=lambda kv: -_tri(kv[1]['prix_m2'].moyenne)))
+
+    return ResumeStatistique(
+        nb_lignes=nb_lignes_initiales if nb_lignes_initiales is not None else len(df_valide),
+        nb_valides=len(df_valide),
+        nb_non_specifie=int(comptes[non_specifie]) if non_specifie >= 0 else 0,
+        globales=globales,
+        quartiers=quartiers,
+        repartitions={nom: _comptes(df_valide[nom]) for nom in COLONNES_REPARTITION if nom in df_valide})
+
+
+def _tri(valeur):
+    """Clé de tri : les moyennes absentes en dernier"""
+    return -math.inf if math.isnan(valeur) else valeur
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def _reference_pandas(df):
+    """Les calculs d'origine (un parcours par indicateur) pour comparaison"""
+    df_quartiers = df[df['quartier'] != NON_SPECIFIE]
+    par_quartier = df_quartiers.groupby('quartier').agg({
+        'prix_m2': ['mean', 'median', 'min', 'max', 'count'],
+        'surface_m2': 'mean',
+        'prix_fcfa': 'mean'
+    })
+    return {
+        'prix_m2_moyen': df['prix_m2'].mean(),
+        'prix_m2_median': df['prix_m2'].median(),
+        'prix_fcfa_median': df['prix_fcfa'].median(),
+        'surface_moyenne': df['surface_m2'].mean(),
+        'quartiers_trouves': (df['quartier'] != NON_SPECIFIE).sum(),
+        'types_bien': df['type_bien'].value_counts(),
+        'types_offre': df['type_offre'].value_counts(),
+        'terrains': (df['type_bien'] == 'Terrain').sum(),
+        'par_quartier': par_quartier,
+        'top': df_quartiers.groupby('quartier')['prix_m2'].agg(['mean', 'count'])
+        .sort_values('count', ascending=False).head(10),
+    }
+
+
+def generer_annonces(nb, graine=0):
+    """Annonces valides synthétiques (quartiers, types, prix au m² log-normaux)"""
+    rng = np.random.default_rng(graine)
+    quartiers = np.array(QUARTIERS_SYNTHETIQUES + [NON_SPECIFIE])
+    types_bien = np.array(['Terrain', 'Villa', 'Maison', 'Appartement', 'Immeuble', 'Commercial'])
+    surface = np.round(np.exp(rng.normal(6.0, 0.6, nb)), 1)
+    prix_m2 = np.round(np.exp(rng.normal(9.8, 0.6, nb)), 2)
+    return pd.DataFrame({
+        'type_bien': types_bien[rng.choice(len(types_bien), nb, p=[0.55, 0.15, 0.1, 0.12, 0.04, 0.04])],
+        'type_offre': np.where(rng.random(nb) < 0.8, 'Vente', 'Location'),
+        'quartier': quartiers[rng.integers(0, len(quartiers), nb)],
+        'surface_m2': surface,
+        'prix_fcfa': np.round(surface * prix_m2, 0),
+        'prix_m2': prix_m2,
+    })
+
+
+def _verifier(resume, reference):
+    """Écarts entre le moteur et les calculs pandas (liste vide si identiques)"""
+    ecarts = []
+    tableau = resume.tableau_quartiers()
+    attendu = reference['par_quartier']
+    for i, colonne in enumerate(COLONNES_TABLEAU):
+        obtenu = tableau[colonne].sort_index().to_numpy(dtype=float)
+        if not np.allclose(obtenu, attendu.iloc[:, i].round(0).to_numpy(dtype=float), atol=1):
+            ecarts.append(colonne)
+    valeurs = {
+        'prix_m2_moyen': resume['prix_m2'].moyenne,
+        'prix_m2_median': resume['prix_m2'].mediane,
+        'prix_fcfa_median': resume['prix_fcfa'].mediane,
+        'surface_moyenne': resume['surface_m2'].moyenne,
+        'quartiers_trouves': resume.quartiers_trouves,
+        'terrains': resume.repartitions['type_bien'].get('Terrain', 0),
+    }
+    ecarts += [nom for nom, valeur in valeurs.items() if not np.isclose(valeur, reference[nom])]
+    for nom in COLONNES_REPARTITION:
+        if resume.repartitions[nom] != reference[nom.replace('type_', 'types_')].to_dict():
+            ecarts.append(nom)
+    top = resume.tableau_quartiers(10, par='nb')['Nb Annonces'].to_numpy()
+    if not np.array_equal(top, reference['top']['count'].to_numpy()):
+        ecarts.append('top 10')
+    return ecarts
+
+
+def benchmark(nb=1000000, repetitions=3):
+    """Moteur en une passe contre les appels pandas séparés, avec contrôle des valeurs"""
+    df = generer_annonces(nb)
+    durees = {'pandas (appels séparés)': [], 'resumer (une passe)': []}
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        reference = _reference_pandas(df)
+        durees['pandas (appels séparés)'].append(time.perf_counter() - debut)
+        debut = time.perf_counter()
+        resume = resumer(df)
+        durees['resumer (une passe)'].append(time.perf_counter() - debut)
+    ecarts = _verifier(resume, reference)
+
+    print("=" * 70)
+    print(f"⏱️  STATISTIQUES - {nb:,} annonces, {len(resume.quartiers)} quartiers "
+          f"(meilleure de {repetitions} exécutions)")
+    print("=" * 70)
+    meilleures = {nom: min(d) for nom, d in durees.items()}
+    for nom, duree in meilleures.items():
+        print(f"   {nom:<28}{duree * 1000:>10.1f} ms")
+    gain = meilleures['pandas (appels séparés)'] / meilleures['resumer (une passe)']
+    print(f"   Gain: x{gain:.1f}")
+    print(f"   Valeurs identiques à pandas: {'✅ oui' if not ecarts else '❌ ' + ', '.join(ecarts)}")
+    print("=" * 70)
+    return meilleures
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Résumé statistique d'un export nettoyé")
+    parser.add_argument('fichier', nargs='?', help="Export CSV nettoyé")
+    parser.add_argument('--json', help="Écrire les statistiques en JSON")
+    parser.add_argument('--benchmark', type=int, nargs='?', const=1000000, metavar='N',
+                        help="Comparer au calcul pandas sur N annonces synthétiques")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    resume = resumer(pd.read_csv(args.fichier, encoding='utf-8-sig'))
+    print(resume.tableau_quartiers())
+    if args.json:
+        print(f"\n✅ Statistiques JSON: {resume.ecrire_json(args.json)}")
+
+
+if __name__ == "__main__":
+    main()